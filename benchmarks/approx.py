@@ -0,0 +1,143 @@
+"""
+Benchmark the approximate search lattice of the color groups.
+
+For each group, the lattice for the group's default delta E formula is
+built, then ``--count`` random 8-bit sRGB colors are searched for in both
+modes:
+
+* ``build``: seconds spent building the lattice.
+* ``bound``: its ``error_bound``, the largest error it can introduce.
+* ``ambiguous``: the fraction of its cells with more than one candidate.
+* ``exact`` and ``approx``: microseconds per :py:meth:`ColorGroup.closest`
+  call, with the results cache emptied before each one.
+* ``exact_many`` and ``approx_many``: microseconds per color of one
+  :py:meth:`ColorGroup.closest_many` call over all the colors.
+
+Run from the repository root::
+
+    python -m benchmarks.approx [--count N] [--bits B] [--json] [group ...]
+"""
+
+import argparse
+import importlib
+import json
+import time
+import typing
+
+import numpy
+
+from colors import base
+
+GROUPS = {
+    'xterm': 'Xterm',
+    'x11': 'X11',
+    'web': 'Web',
+    'wiki': 'Wiki',
+}
+"""Palette modules benchmarked, and the color group each defines."""
+
+
+def per_call(
+    group: typing.Type[base.ColorGroup],
+    colors: typing.Sequence[base.RGB24],
+    mode: str
+) -> float:
+    """Get the microseconds per uncached closest() call."""
+    elapsed = 0.0
+    for color in colors:
+        group.cache_clear()
+        start = time.perf_counter()
+        group.closest(color, mode=mode)
+        elapsed += time.perf_counter() - start
+    return elapsed / len(colors) * 1e6
+
+
+def per_color(
+    group: typing.Type[base.ColorGroup],
+    colors: base.ColorArray,
+    mode: str
+) -> float:
+    """Get the microseconds per color of one closest_many() call."""
+    start = time.perf_counter()
+    group.closest_many(colors, indices=True, mode=mode)
+    return (time.perf_counter() - start) / len(colors) * 1e6
+
+
+def run(
+    modules: typing.Iterable[str],
+    count: int,
+    bits: int
+) -> typing.Dict[str, typing.Dict[str, float]]:
+    """
+    Build the lattice of each group and time searches with it.
+
+    Returns:
+        Per module, the measurements described in the module documentation.
+    """
+    packed = numpy.random.default_rng(0).integers(
+        0,
+        1 << 24,
+        size=count,
+        dtype=numpy.uint32
+    )
+    colors = [base.RGB24(value) for value in packed.tolist()]
+    array = base.ColorArray.from_packed(packed)
+    results = {}
+    for module in modules:
+        group = getattr(
+            importlib.import_module(f'colors.{module}'),
+            GROUPS[module]
+        )
+        # Warm up the Lab matrix and spatial index the exact search uses.
+        group.closest_many(array[:1])
+        start = time.perf_counter()
+        lattice = group.build_approx_lattice(bits=bits)
+        results[module] = {
+            'build': time.perf_counter() - start,
+            'bound': lattice.error_bound,
+            'ambiguous': lattice.ambiguous,
+            'exact': per_call(group, colors, 'exact'),
+            'approx': per_call(group, colors, 'approx'),
+            'exact_many': per_color(group, array, 'exact'),
+            'approx_many': per_color(group, array, 'approx'),
+        }
+        group.cache_clear()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('modules', nargs='*', default=list(GROUPS))
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--bits', type=int, default=base.APPROX_BITS)
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='print the results as JSON'
+    )
+    options = parser.parse_args()
+    unknown = set(options.modules) - set(GROUPS)
+    if unknown:
+        parser.error(f'unknown modules: {", ".join(sorted(unknown))}')
+
+    results = run(options.modules, options.count, options.bits)
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return
+    columns = ('build', 'bound', 'ambiguous', 'exact', 'approx',
+               'exact_many', 'approx_many')
+    print(f'{"":>8} ' + ' '.join(f'{name:>11}' for name in columns))
+    for module, entry in results.items():
+        print(
+            f'{module:>8} {entry["build"]:>10.1f}s {entry["bound"]:>11.3f} '
+            f'{entry["ambiguous"]:>11.1%} '
+            + ' '.join(
+                f'{entry[name]:>9.1f}us'
+                for name in columns[3:]
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark color construction through the ColorMeta flyweight.
+
+Compares the precompiled per-class key function used by
+:py:meth:`colors.base.ColorMeta.__call__` with the previous approach of
+inspecting and binding the constructor signature on every call.
+
+Run from the repository root::
+
+    python -m benchmarks.construction [--count N] [--repeat R]
+"""
+
+import argparse
+import inspect
+import timeit
+import typing
+
+import colormath.color_objects
+
+from colors import base
+
+
+def legacy_key(cls: type, args: tuple, kwargs: dict) -> tuple:
+    """Build a flyweight key the way ColorMeta did before key functions."""
+    sig = inspect.signature(cls.__new__)
+    ba = sig.bind(*args, **kwargs)
+    ba.apply_defaults()
+    return ba.args + tuple(ba.kwargs.items())
+
+
+def legacy_call(cls: type, *args, **kwargs) -> base.BaseColor:
+    """Construct a color through the flyweight using :py:func:`legacy_key`."""
+    arguments = legacy_key(cls, args, kwargs)
+    try:
+        return cls.instances[arguments]
+    except KeyError:
+        cls.instances[arguments] = type.__call__(cls, *args, **kwargs)
+        return cls.instances[arguments]
+
+
+def run(count: int, repeat: int) -> typing.Dict[str, float]:
+    """
+    Time constructing ``count`` colors, best of ``repeat`` runs.
+
+    Half of the constructions hit the flyweight registry (the same
+    colormath object again) and half create new instances.
+
+    Returns:
+        Constructions per second for each approach.
+    """
+    values = [
+        colormath.color_objects.sRGBColor(
+            index % 256,
+            (index // 256) % 256,
+            0,
+            is_upscaled=True
+        )
+        for index in range(count // 2)
+    ]
+    values = values + values
+
+    def construct(call: typing.Callable) -> typing.Callable[[], None]:
+        def body() -> None:
+            base.sRGBColor.instances.clear()
+            for value in values:
+                call(value)
+        return body
+
+    results = {}
+    for name, call in (
+        ('legacy', lambda value: legacy_call(base.sRGBColor, value)),
+        ('compiled', base.sRGBColor),
+    ):
+        best = min(timeit.repeat(construct(call), number=1, repeat=repeat))
+        results[name] = len(values) / best
+    base.sRGBColor.instances.clear()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+
+    results = run(options.count, options.repeat)
+    for name, rate in results.items():
+        print(f'{name:>8}: {rate:12,.0f} constructions/s')
+    print(f' speedup: {results["compiled"] / results["legacy"]:12.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Benchmark the memory used by each color instance.
+
+Color classes declare ``__slots__`` instead of keeping an instance
+``__dict__``. This checks that no instance of a registered color class has
+a ``__dict__``, then reports the memory of ``--count`` distinct sRGB colors
+at each stage of their use:
+
+* ``created``: colors created from 8-bit levels, holding their packed
+  value only.
+* ``read``: after reading their levels, ``hex`` and ``value_tuple``.
+* ``converted``: after also converting them to Lab and HSV.
+
+``getsizeof`` is :py:func:`sys.getsizeof` of one color object alone (plus
+its ``__dict__``, if it has one), and ``traced`` the memory
+:py:mod:`tracemalloc` sees allocated per color, including its colormath
+object, cached values, conversions and its entry in the instance registry.
+Both are in bytes.
+
+The same stages are measured for :py:class:`LegacyColor`, a stand-in for
+the colors as they were before they had ``__slots__``: an instance
+``__dict__`` holding the colormath object, a ``__values`` dict, the
+name-mangled level caches and the conversions, kept in a plain dict
+registry. ``saved`` is how much less the slotted colors take per color.
+
+Run from the repository root::
+
+    python -m benchmarks.memory [--count N] [--json]
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+import typing
+
+import colormath.color_conversions
+import colormath.color_objects
+
+from colors import base
+
+
+def check_slots() -> None:
+    """
+    Check that no color instance has a ``__dict__``.
+
+    Raises:
+        AssertionError: A registered color class, or one of its
+            conversions of an sRGB color, has an instance ``__dict__``.
+    """
+    color = base.RGBColor(12, 34, 56)
+    instances = [color] + [
+        getattr(color, attr_name)
+        for attr_name in base.ColorMeta._ColorMeta__class_registry
+    ]
+    for instance in instances:
+        assert not hasattr(instance, '__dict__'), (
+            f'{type(instance).__name__} instances have a __dict__'
+        )
+
+
+class LegacyColor:
+    """
+    A color laid out as before :py:class:`base.BaseColor` had slots.
+
+    Only what the benchmark uses is kept: the colormath object and the
+    ``__values`` cache set in ``__init__``, the level caches set by the
+    properties, and the conversions stored in the instance ``__dict__``.
+    """
+
+    instances: typing.Dict[tuple, 'LegacyColor'] = {}
+    """The flyweight registry, keyed by the constructor arguments."""
+
+    def __init__(self, color: colormath.color_objects.ColorBase) -> None:
+        """Initialize with a given colormath object instance."""
+        self.__color = color
+        self.__values: typing.Dict[str, typing.Any] = {}
+
+    @classmethod
+    def create(cls, color: colormath.color_objects.ColorBase) -> 'LegacyColor':
+        """Get the registered instance for ``color``, as ColorMeta did."""
+        try:
+            return cls.instances[(color,)]
+        except KeyError:
+            cls.instances[(color,)] = instance = cls(color)
+            return instance
+
+    def _get_value(self, name: str, function: bool = False) -> typing.Any:
+        """Get a specific value from the colormath object."""
+        try:
+            return self.__values[name]
+        except KeyError:
+            orig = getattr(self.__color, name)
+            self.__values[name] = orig() if function else orig
+            return self.__values[name]
+
+    def _level(self, name: str) -> int:
+        """Get and cache an 8-bit level in a name-mangled attribute."""
+        attrs = vars(self)
+        key = f'_sRGBColor__{name}'
+        try:
+            return attrs[key]
+        except KeyError:
+            attrs[key] = int(self._get_value(f'rgb_{name[0]}') * 255)
+            return attrs[key]
+
+    def convert(self, attr_name: str, color_class: type) -> 'LegacyColor':
+        """Get and cache a conversion in the instance ``__dict__``."""
+        attrs = vars(self)
+        try:
+            return attrs[attr_name]
+        except KeyError:
+            attrs[attr_name] = LegacyColor.create(
+                colormath.color_conversions.convert_color(
+                    self.__color,
+                    color_class
+                )
+            )
+            return attrs[attr_name]
+
+
+def legacy_rgb(red: int, green: int, blue: int) -> LegacyColor:
+    """Create a legacy color from 8-bit levels, as RGBColor did."""
+    return LegacyColor.create(
+        colormath.color_objects.sRGBColor(red, green, blue, is_upscaled=True)
+    )
+
+
+def read_current(color: base.sRGBColor) -> None:
+    """Read the levels, hex code and value tuple of a color."""
+    color.red, color.green, color.blue
+    color.hex, color.value_tuple
+
+
+def convert_current(color: base.sRGBColor) -> None:
+    """Convert a color to Lab and HSV."""
+    color.lab, color.hsv
+
+
+def read_legacy(color: LegacyColor) -> None:
+    """Read the levels, hex code and value tuple of a legacy color."""
+    color._level('red'), color._level('green'), color._level('blue')
+    color._get_value('get_rgb_hex', function=True)
+    color._get_value('get_upscaled_value_tuple', function=True)
+
+
+def convert_legacy(color: LegacyColor) -> None:
+    """Convert a legacy color to Lab and HSV."""
+    color.convert('lab', colormath.color_objects.LabColor)
+    color.convert('hsv', colormath.color_objects.HSVColor)
+
+
+def sizeof(color: typing.Any) -> int:
+    """Get the size of a color object and of its ``__dict__``, if any."""
+    size = sys.getsizeof(color)
+    if hasattr(color, '__dict__'):
+        size += sys.getsizeof(vars(color))
+    return size
+
+
+def measure_stages(
+    count: int,
+    create: typing.Callable[[int, int, int], typing.Any],
+    read: typing.Callable[[typing.Any], None],
+    convert: typing.Callable[[typing.Any], None]
+) -> typing.Dict[str, typing.Dict[str, float]]:
+    """
+    Measure the memory of ``count`` distinct colors at each stage.
+
+    Returns:
+        The ``getsizeof`` and ``traced`` bytes per color of each stage.
+    """
+    stages = {}
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        colors = [
+            create(index >> 16, (index >> 8) & 0xff, index & 0xff)
+            for index in range(count)
+        ]
+
+        def record(stage: str) -> None:
+            traced = tracemalloc.get_traced_memory()[0] - start
+            stages[stage] = {
+                'getsizeof': sizeof(colors[-1]),
+                # Do not count the list holding the colors.
+                'traced': (traced - sys.getsizeof(colors)) / count,
+            }
+
+        record('created')
+        for color in colors:
+            read(color)
+        record('read')
+        for color in colors:
+            convert(color)
+        record('converted')
+    finally:
+        tracemalloc.stop()
+    return stages
+
+
+def measure(count: int) -> typing.Dict[str, typing.Dict[str, float]]:
+    """
+    Measure the memory of ``count`` distinct sRGB colors at each stage.
+
+    Returns:
+        Per stage, the ``getsizeof`` and ``traced`` bytes per color of the
+        slotted colors, those of :py:class:`LegacyColor` (as
+        ``legacy_getsizeof`` and ``legacy_traced``) and the traced bytes
+        saved per color.
+    """
+    registry = base.sRGBColor.instances
+    maxsize = registry.maxsize
+    registry.maxsize = None
+    registry.clear()
+    try:
+        stages = measure_stages(
+            count,
+            base.RGBColor,
+            read_current,
+            convert_current
+        )
+    finally:
+        registry.clear()
+        registry.maxsize = maxsize
+    try:
+        legacy = measure_stages(count, legacy_rgb, read_legacy, convert_legacy)
+    finally:
+        LegacyColor.instances.clear()
+    for stage, sizes in stages.items():
+        sizes['legacy_getsizeof'] = legacy[stage]['getsizeof']
+        sizes['legacy_traced'] = legacy[stage]['traced']
+        sizes['saved'] = legacy[stage]['traced'] - sizes['traced']
+    return stages
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='print the results as JSON'
+    )
+    options = parser.parse_args()
+
+    check_slots()
+    results = measure(options.count)
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return
+    columns = ('getsizeof', 'traced', 'legacy_getsizeof', 'legacy_traced')
+    print(f'{"":>10} {"getsizeof":>10} {"traced":>10} {"legacy":>10} '
+          f'{"legacy":>10} {"saved":>10}')
+    for stage, sizes in results.items():
+        cells = ' '.join(f'{sizes[name]:>10.0f}' for name in columns)
+        saved = sizes['saved'] / sizes['legacy_traced']
+        print(f'{stage:>10} {cells} {saved:>10.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark import time and first-use latency of the color groups.
+
+Every measurement runs in a fresh interpreter, so nothing is shared between
+runs: not imported modules, not cached members or Lab matrices. Each run
+times, in order:
+
+* ``colormath``: importing colormath (and numpy, which it imports).
+* ``base``: importing :py:mod:`colors.base` on top of it.
+* ``module``: importing the palette module, i.e. defining its members.
+* ``lab``: the first Lab conversion of the members (the group's Lab
+  matrix, which every search starts with).
+* ``closest``: the rest of the first :py:meth:`ColorGroup.closest` call.
+* ``members``: creating the ``value`` of every member afterwards, which
+  searches do not need.
+
+``process`` is the wall time of the whole subprocess as seen from outside,
+and ``python`` that of an interpreter doing nothing, for reference. Times
+are medians over the runs, in milliseconds.
+
+Run from the repository root::
+
+    python -m benchmarks.startup [--repeat R] [--json] [module ...]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import typing
+
+GROUPS = {
+    'ansi': 'ANSI',
+    'html': 'HTML',
+    'web': 'Web',
+    'x11': 'X11',
+    'xterm': 'Xterm',
+    'md': 'MaterialDesign',
+    'wiki': 'Wiki',
+    'crayola': 'Crayola',
+}
+"""Palette modules timed, and the color group each defines."""
+
+PHASES = ('colormath', 'base', 'module', 'lab', 'closest', 'members')
+"""Phases timed within each run, in order."""
+
+CHILD = '''
+import importlib, json, sys, time
+clock = time.perf_counter
+times = {}
+start = clock()
+import colormath.color_conversions, colormath.color_objects
+times['colormath'] = clock() - start
+start = clock()
+from colors import base
+times['base'] = clock() - start
+result = {'times': times}
+if len(sys.argv) > 1:
+    start = clock()
+    try:
+        module = importlib.import_module('colors.' + sys.argv[1])
+    except Exception as exc:
+        result['error'] = f'{type(exc).__name__}: {exc}'
+    else:
+        times['module'] = clock() - start
+        group = getattr(module, sys.argv[2])
+        start = clock()
+        group._lab_matrix()
+        times['lab'] = clock() - start
+        color = base.sRGBColor.from_hex('#3a7bd5')
+        start = clock()
+        group.closest(color)
+        times['closest'] = clock() - start
+        start = clock()
+        for member in group:
+            member.value
+        times['members'] = clock() - start
+print(json.dumps(result))
+'''
+"""Code run in each subprocess; arguments are the module and group name."""
+
+
+def run_once(*args: str) -> typing.Dict[str, typing.Any]:
+    """
+    Time one fresh interpreter running :py:data:`CHILD` with ``args``.
+
+    Returns:
+        The child's report, with its phase times and the process wall time
+        in milliseconds.
+    """
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, *args],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    elapsed = time.perf_counter() - start
+    result = json.loads(output)
+    result['times'] = {
+        name: 1000 * value for name, value in result['times'].items()
+    }
+    result['times']['process'] = 1000 * elapsed
+    return result
+
+
+def python_baseline(repeat: int) -> float:
+    """Get the median wall time of an interpreter doing nothing, in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        samples.append(1000 * (time.perf_counter() - start))
+    return statistics.median(samples)
+
+
+def run(
+    modules: typing.Iterable[str],
+    repeat: int
+) -> typing.Dict[str, typing.Any]:
+    """
+    Time ``colors.base`` alone, then each palette module, ``repeat`` times.
+
+    Returns:
+        Per target (``'base'`` or a module name), the median time of each
+        phase, or the error that stopped the import.
+    """
+    results: typing.Dict[str, typing.Any] = {
+        'python': python_baseline(repeat),
+    }
+    targets = [('base', ())] + [
+        (module, (module, GROUPS[module])) for module in modules
+    ]
+    for target, args in targets:
+        runs = [run_once(*args) for _ in range(repeat)]
+        entry: typing.Dict[str, typing.Any] = {
+            name: statistics.median(run['times'][name] for run in runs)
+            for name in ('process',) + PHASES
+            if name in runs[0]['times']
+        }
+        if 'error' in runs[0]:
+            entry['error'] = runs[0]['error']
+        results[target] = entry
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('modules', nargs='*', default=list(GROUPS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='print the results as JSON'
+    )
+    options = parser.parse_args()
+    unknown = set(options.modules) - set(GROUPS)
+    if unknown:
+        parser.error(f'unknown modules: {", ".join(sorted(unknown))}')
+
+    results = run(options.modules, options.repeat)
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = ('process',) + PHASES
+    print(f'python: {results["python"]:.1f} ms')
+    print(f'{"":>8} ' + ' '.join(f'{name:>9}' for name in columns))
+    for target, entry in results.items():
+        if target == 'python':
+            continue
+        cells = ' '.join(
+            f'{entry[name]:9.1f}' if name in entry else f'{"-":>9}'
+            for name in columns
+        )
+        note = entry.get('error', '')
+        print(f'{target:>8} {cells}  {note}')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,25 +4,61 @@ Encapsulates a simple Pythonic method to translate colors between systems.
 Largely designed to make it a little easier to use a color name from a system
 like `X11` colors, and have them translate over to the closest corresponding
 `xterm` color index.
+
+The names below are loaded lazily: ``import colors`` imports nothing else,
+and each color group (with all its members) is only built the first time it
+is used, e.g. ``colors.X11``.
 """
 
-# __all__ = (
-#     'sRGBColor',
-#     'HSVColor',
-#     'HSLColor',
-#     'ANSI',
-#     'HTML',
-#     'Web',
-#     'Wiki',
-#     'Xterm',
-#     'MaterialDesign',
-# )
-
-# from .base import sRGBColor, HSVColor, HSLColor
-# from .ansi import ANSI
-# from .html import HTML
-# from .web import Web
-# from .xterm import Xterm
-# from .x11 import X11
-# from .md import MaterialDesign
-# from .wiki import Wiki
+import importlib
+
+__all__ = (
+    'sRGBColor',
+    'HSVColor',
+    'HSLColor',
+    'RGB24',
+    'ColorArray',
+    'ANSI',
+    'HTML',
+    'Web',
+    'Wiki',
+    'Xterm',
+    'X11',
+    'MaterialDesign',
+    'Crayola',
+)
+
+_EXPORTS = {
+    'sRGBColor': 'base',
+    'HSVColor': 'base',
+    'HSLColor': 'base',
+    'RGB24': 'base',
+    'ColorArray': 'base',
+    'ANSI': 'ansi',
+    'HTML': 'html',
+    'Web': 'web',
+    'Wiki': 'wiki',
+    'Xterm': 'xterm',
+    'X11': 'x11',
+    'MaterialDesign': 'md',
+    'Crayola': 'crayola',
+}
+"""Module defining each exported name."""
+
+
+def __getattr__(name: str) -> object:
+    """Import an exported name on first access."""
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}'
+        ) from None
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    """List the module's attributes, including the lazily loaded ones."""
+    return sorted(set(globals()) | set(__all__))
@@ -3,12 +3,67 @@
 import enum
 import functools
 import inspect
+import operator
+import os
+import threading
 import typing
 
 import colormath
-import colormath.color_conversions
-import colormath.color_diff
 import colormath.color_objects
+import numpy
+
+from colors import cache
+from colors import convert
+from colors import diff
+from colors import index
+from colors import lut
+
+
+INDEX_THRESHOLD = 1024
+"""
+Group size above which batches of closest searches use the spatial index.
+
+Single colors always do: walking the tree in plain floats costs less than
+one numpy call over the group.
+"""
+
+RADIUS_INDEX_THRESHOLD = 4096
+"""
+Group size above which closest_k and within searches use the spatial index.
+
+They compare every member inside a Lab radius with the vectorized formula,
+which only pays off once the group is much larger than that radius holds.
+"""
+
+TIE_TOLERANCE = 1e-9
+"""
+Relative difference below which two distances are a tie.
+
+Searches pick the lowest-indexed member among those tied with the closest
+one. Distances computed in different ways (vectorized or in plain floats,
+against the whole group or a few members) can differ in their last bits,
+so exact ties would otherwise be broken differently by different paths.
+"""
+
+APPROX_BITS = 5
+"""Bits per channel of the lattice used by ``mode='approx'`` searches."""
+
+APPROX_TOLERANCE = 0.5
+"""
+Delta E above which the lattice's corner candidates are checked exactly.
+
+See :py:class:`lut.Lattice`; this is also, for the bundled groups, about the
+largest error ``mode='approx'`` searches make.
+"""
+
+MODES = ('exact', 'approx')
+"""Search modes accepted by :py:meth:`ColorGroup.closest`."""
+
+INSTANCE_CACHE_SIZE = 1024
+"""Most unused instances of each color class kept for reuse."""
+
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+"""Characters allowed in hex codes, as in :py:func:`convert.parse_hex`."""
 
 
 class ColorMeta(type):
@@ -20,90 +75,255 @@ class ColorMeta(type):
     """
 
     __class_registry: typing.Dict[str, type] = {}
+    __space_slots: typing.Dict[type, int] = {}
 
     @property
-    def instances(cls):
-        """Class-specific instance registry to flywheel instances."""
+    def instances(cls) -> cache.InstanceRegistry:
+        """
+        Class-specific instance registry to flywheel instances.
+
+        Instances are only kept alive while in use or among the class's
+        :py:data:`INSTANCE_CACHE_SIZE` most recently used; use
+        ``instances.info()`` to inspect it, ``instances.clear()`` to empty
+        it and ``instances.maxsize`` to change the limit.
+        """
         try:
             return cls.__instances
         except AttributeError:
-            cls.__instances = {}
+            cls.__instances = cache.InstanceRegistry(INSTANCE_CACHE_SIZE)
             return cls.__instances
 
-    @staticmethod
-    def get_conversion(self, attr_name):
-        """Handle conversions as necessary otherwise get attribute."""
-        cls = type(self)
-        metacls = type(cls)
-        if attr_name in metacls.__class_registry:
-            attrs = vars(self)
-            try:
-                return attrs[attr_name]
-            except KeyError:
-                attr_class = metacls.__class_registry[attr_name]
-                color_class = getattr(
-                    colormath.color_objects,
-                    attr_class.__name__
-                )
-                color_val = colormath.color_conversions.convert_color(
-                    self._BaseColor__color,
-                    color_class
-                )
-                attrs[attr_name] = attr_class(color_val)
-                return attrs[attr_name]
-        else:
-            return super(cls, self).__getattribute__(attr_name)
-
     def __new__(metacls, name, bases, ns, attr_name, **kwds):
-        """Create new class definition."""
+        """
+        Create new class definition.
+
+        The class is registered under ``attr_name``, and a
+        :py:class:`Conversion` of that name is added to
+        :py:class:`BaseColor`, so every color converts to the new class.
+        """
         try:
             return metacls.__class_registry[attr_name]
         except KeyError:
             ns[f'_{metacls.__name__}__color_registry'] = {}
-            ns['__getattribute__'] = metacls.get_conversion
-            metacls.__class_registry[attr_name] = super().__new__(
-                metacls,
-                name,
-                bases,
-                ns
+            ns['_conversion_slot'] = len(metacls.__class_registry)
+            new_cls = super().__new__(metacls, name, bases, ns)
+            new_cls.__make_key = metacls.compile_key(new_cls.__new__)
+            metacls.__class_registry[attr_name] = new_cls
+            metacls.__space_slots[
+                getattr(colormath.color_objects, name)
+            ] = new_cls._conversion_slot
+            setattr(BaseColor, attr_name, Conversion(new_cls))
+            return new_cls
+
+    @staticmethod
+    def compile_key(
+        new: typing.Callable
+    ) -> typing.Callable[[tuple, dict], tuple]:
+        """
+        Build the function turning constructor arguments into a flyweight key.
+
+        The key is the arguments bound to the signature of ``new`` with the
+        defaults applied, with colormath objects replaced by their
+        :py:meth:`value_key`. The signature is only inspected here, once per
+        class. When it takes arbitrary arguments, binding cannot change
+        them, so the key is built directly from the arguments.
+        """
+        value_key = ColorMeta.value_key
+        sig = inspect.signature(new)
+        if all(
+            param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+            for param in sig.parameters.values()
+        ):
+            def make_key(args: tuple, kwargs: dict) -> tuple:
+                if len(args) == 1 and not kwargs:
+                    return (value_key(args[0]),)
+                return tuple(map(value_key, args)) + tuple(
+                    (name, value_key(value)) for name, value in kwargs.items()
+                )
+        else:
+            def make_key(args: tuple, kwargs: dict) -> tuple:
+                ba = sig.bind(*args, **kwargs)
+                ba.apply_defaults()
+                return tuple(map(value_key, ba.args)) + tuple(
+                    (name, value_key(value))
+                    for name, value in ba.kwargs.items()
+                )
+        return make_key
+
+    @staticmethod
+    def value_key(value: typing.Any) -> typing.Hashable:
+        """
+        Get the flyweight key of a constructor argument.
+
+        Colormath objects are compared by identity, so they are keyed by
+        their type (the color space), channel values, illuminant and
+        observer instead, along with the RGB space they convert through
+        (their ``_through_rgb_type``, set by conversions to other RGB
+        spaces). Equal colors built separately, for example with
+        :py:func:`RGBColor` and :py:meth:`sRGBColor.from_hex`, then share one
+        instance and its conversions. Other arguments are their own key.
+        """
+        if isinstance(value, colormath.color_objects.ColorBase):
+            return (
+                type(value),
+                value.get_value_tuple(),
+                getattr(value, 'illuminant', None),
+                getattr(value, 'observer', None),
+                value._through_rgb_type
             )
-            return metacls.__class_registry[attr_name]
+        return value
 
     def __call__(cls, *args, **kwargs):
         """Hijack instance creation for flywheeling."""
-        sig = inspect.signature(cls.__new__)
-        ba = sig.bind(*args, **kwargs)
-        ba.apply_defaults()
-        arguments = ba.args + tuple(ba.kwargs.items())
+        arguments = cls.__make_key(args, kwargs)
+        instances = cls.instances
         try:
-            return cls.instances[arguments]
+            return instances[arguments]
         except KeyError:
-            cls.instances[arguments] = super(type(cls), cls).__call__(
-                *args,
-                **kwargs
+            instance = super(type(cls), cls).__call__(*args, **kwargs)
+            instances[arguments] = instance
+            return instance
+
+
+class Conversion:
+    """
+    Non-data descriptor converting colors to one color class.
+
+    The converted color is computed on first access and stored in the
+    instance's :py:attr:`BaseColor.conversions` table, so later accesses
+    only index that table. Every other attribute of a color is looked up
+    by the interpreter without going through Python code.
+
+    When the instance has already been converted to a color space the
+    conversion passes through (such as ``xyz`` on the way from ``srgb`` to
+    ``lab``), the conversion starts from that color instead.
+    """
+
+    __slots__ = ('color_class', 'slot', 'target')
+
+    def __init__(self, color_class: type) -> None:
+        """Set up conversions to the given color class."""
+        self.color_class = color_class
+        self.slot = color_class._conversion_slot
+        self.target = getattr(colormath.color_objects, color_class.__name__)
+
+    def __get__(
+        self,
+        instance: typing.Optional['BaseColor'],
+        owner: typing.Optional[type] = None
+    ) -> typing.Any:
+        """Get the instance converted to the color class."""
+        if instance is None:
+            return self
+
+        conversions = instance.conversions
+        try:
+            converted = conversions[self.slot]
+        except IndexError:
+            conversions.extend([None] * (self.slot + 1 - len(conversions)))
+            converted = None
+        if converted is None:
+            color = instance._color
+            through_rgb = color._through_rgb_type
+            space_slots = ColorMeta._ColorMeta__space_slots
+            for space in reversed(
+                convert.intermediates(type(color), self.target, through_rgb)
+            ):
+                try:
+                    cached = conversions[space_slots[space]]
+                except (IndexError, KeyError):
+                    continue
+                if (
+                    cached is not None
+                    and type(cached._color) is space
+                ):
+                    color = cached._color
+                    break
+            converted = self.color_class(
+                convert.convert_color(color, self.target, through_rgb)
             )
-            return cls.instances[arguments]
+            conversions[self.slot] = converted
+        return converted
+
+    def __repr__(self) -> str:
+        """Get the string representation of the Conversion instance."""
+        return f'<Conversion({self.color_class.__name__})>'
 
 
 class BaseColor:
-    """Base class for color classes."""
+    """
+    Base class for color classes.
+
+    Color classes use ``__slots__`` rather than an instance ``__dict__``:
+    every value a property caches has its own slot, and converted colors
+    are kept in :py:attr:`conversions`, a table with one entry per color
+    class. Conversions are exposed as :py:class:`Conversion` attributes
+    named after each class's ``attr_name`` (``srgb``, ``lab``, ...).
+    """
+
+    __slots__ = ('__color', '__conversions', '__weakref__')
+
+    def __init__(
+        self,
+        color: typing.Optional[colormath.color_objects.ColorBase]
+    ) -> None:
+        """
+        Initialize with a given colormath object instance.
+
+        Without one (``None``), the object is created by
+        :py:meth:`_create_color` when it is first needed.
+        """
+        if color is not None:
+            self.__color = color
+        self.__conversions: typing.Optional[typing.List[typing.Any]] = None
+
+    @property
+    def _color(self) -> colormath.color_objects.ColorBase:
+        """Get the colormath object, creating it on first use if deferred."""
+        try:
+            return self.__color
+        except AttributeError:
+            self.__color = self._create_color()
+            return self.__color
+
+    def _create_color(self) -> colormath.color_objects.ColorBase:
+        """Create the colormath object of a color built without one."""
+        raise TypeError(f'{type(self).__name__} needs a colormath object')
 
-    def __init__(self, color: colormath.color_objects.ColorBase) -> None:
-        """Initialize with a given colormath object instance."""
-        self.__color = color
-        self.__values: typing.Dict[str, typing.Any] = {}
+    @property
+    def conversions(self) -> typing.List[typing.Any]:
+        """
+        Get the table of converted colors, indexed by color class.
+
+        Entries are ``None`` until the conversion is first requested.
+        """
+        if self.__conversions is None:
+            self.__conversions = [None] * len(
+                ColorMeta._ColorMeta__class_registry
+            )
+        return self.__conversions
+
+    def twin(self) -> 'BaseColor':
+        """
+        Get a distinct instance of the same color sharing its conversions.
+
+        The twin is not registered with the flyweight, so constructing the
+        color again still gives this instance.
+        """
+        twin = type.__call__(type(self), None)
+        try:
+            twin.__color = self.__color
+        except AttributeError:
+            pass
+        twin.__conversions = self.conversions
+        return twin
 
     def _get_value(self, name, function=False) -> typing.Any:
         """Get a specific value from the colormath object."""
-        try:
-            return self.__values[name]
-        except KeyError:
-            orig = getattr(self.__color, name)
-            if function:
-                self.__values[name] = orig()
-            else:
-                self.__values[name] = orig
-            return self.__values[name]
+        value = getattr(self._color, name)
+        if function:
+            return value()
+        return value
 
 
 class sRGBColor(
@@ -111,7 +331,24 @@ class sRGBColor(
     metaclass=ColorMeta,
     attr_name='srgb'
 ):
-    """Class that defines a red/green/blue (RGB) color."""
+    """
+    Class that defines a red/green/blue (RGB) color.
+
+    Colors created from 8-bit levels, with :py:func:`RGBColor` or
+    :py:meth:`from_packed`, keep their packed ``0xRRGGBB`` value and only
+    create their colormath object when it is first needed, such as for a
+    conversion. Color groups search their members by packed value, so
+    defining a group creates none.
+    """
+
+    __slots__ = (
+        '__packed',
+        '__red',
+        '__green',
+        '__blue',
+        '__hex',
+        '__value_tuple'
+    )
 
     @property
     def red(self) -> int:
@@ -176,12 +413,95 @@ class sRGBColor(
     @property
     def hex(self) -> str:
         """Get the html 6-digit hex code (#rrggbb)."""
-        return self._get_value('get_rgb_hex', function=True)
+        self.__hex: str
+        try:
+            return self.__hex
+        except AttributeError:
+            self.__hex = self._get_value('get_rgb_hex', function=True)
+            return self.__hex
 
     @property
     def value_tuple(self) -> typing.Tuple[int, int, int]:
         """Get the tuple containing (red, green, blue)."""
-        return self._get_value('get_upscaled_value_tuple', function=True)
+        self.__value_tuple: typing.Tuple[int, int, int]
+        try:
+            return self.__value_tuple
+        except AttributeError:
+            self.__value_tuple = self._get_value(
+                'get_upscaled_value_tuple',
+                function=True
+            )
+            return self.__value_tuple
+
+    @property
+    def _packed(self) -> typing.Optional[int]:
+        """Get the ``0xRRGGBB`` value, if the color is exactly 8-bit."""
+        self.__packed: typing.Optional[int]
+        try:
+            return self.__packed
+        except AttributeError:
+            packed: typing.Optional[int] = 0
+            values = self._color.get_value_tuple()
+            for level, value in zip(self.value_tuple, values):
+                if not 0 <= level <= 255 or level / 255 != value:
+                    packed = None
+                    break
+                packed = (packed << 8) | level
+            self.__packed = packed
+            return self.__packed
+
+    def _create_color(self) -> colormath.color_objects.sRGBColor:
+        """Create the colormath object from the packed value."""
+        packed = self.__packed
+        return colormath.color_objects.sRGBColor(
+            packed >> 16,
+            (packed >> 8) & 0xff,
+            packed & 0xff,
+            is_upscaled=True
+        )
+
+    def twin(self) -> 'sRGBColor':
+        """Get a distinct instance of the same color, see BaseColor.twin."""
+        twin = super().twin()
+        twin.__packed = self._packed
+        return twin
+
+    @classmethod
+    def from_packed(cls, value: int) -> 'sRGBColor':
+        """
+        Get the color of a packed ``0xRRGGBB`` value.
+
+        This is the same instance as the equal color created from a
+        colormath object, but until then, no colormath object is created.
+
+        Raises:
+            TypeError: The value is not an integer.
+            ValueError: The value is not a 24-bit integer.
+        """
+        value = operator.index(value)
+        if not 0 <= value <= 0xffffff:
+            raise ValueError(f'{value!r} is not a 24-bit RGB value')
+        red, green, blue = value >> 16, (value >> 8) & 0xff, value & 0xff
+        # The flyweight key of the equal colormath object; see
+        # ColorMeta.value_key.
+        key = ((
+            colormath.color_objects.sRGBColor,
+            (red / 255.0, green / 255.0, blue / 255.0),
+            None,
+            None,
+            None
+        ),)
+        instances = cls.instances
+        try:
+            return instances[key]
+        except KeyError:
+            color = type.__call__(cls, None)
+            color.__packed = value
+            color.__red = red
+            color.__green = green
+            color.__blue = blue
+            instances[key] = color
+            return color
 
     @classmethod
     def from_hex(cls, hex_str: str) -> 'sRGBColor':
@@ -190,13 +510,89 @@ class sRGBColor(
             colormath.color_objects.sRGBColor.new_from_rgb_hex(hex_str)
         )
 
+    @staticmethod
+    def from_hex_many(
+        hex_strs: typing.Union[typing.Sequence[str], bytes]
+    ) -> numpy.ndarray:
+        """
+        Convert many hex codes into packed ``0xRRGGBB`` values.
+
+        The codes are parsed at once by :py:func:`convert.parse_hex`, which
+        also takes 3-digit codes, without creating colors; use
+        :py:meth:`ColorArray.from_packed` or :py:class:`RGB24` to get
+        colors from the values.
+
+        Args:
+            hex_strs: The hex codes, as strings or as a bytes buffer with one
+                code per line.
+
+        Returns:
+            Array of the packed values.
+
+        Raises:
+            convert.RowError: Some codes are invalid. Its ``rows`` holds
+                the indexes of every invalid code, and its ``packed`` the
+                values parsed for the others (0 for the invalid ones).
+        """
+        packed, invalid = convert.parse_hex(hex_strs)
+        if invalid.any():
+            raise convert.RowError(
+                'invalid hex codes',
+                numpy.flatnonzero(invalid),
+                packed
+            )
+        return packed
+
+    @staticmethod
+    def to_hex_many(packed: numpy.ndarray) -> typing.List[str]:
+        """
+        Convert many packed ``0xRRGGBB`` values into html 6-digit hex codes.
+
+        Raises:
+            convert.RowError: Some values are not 24-bit integers; its
+                ``rows`` holds the indexes of every one of them.
+        """
+        return convert.format_hex(packed).tolist()
+
     def __repr__(self) -> str:
         """Get the string representation of the sRGBColor instance."""
         return f'<sRGBColor(r={self.r}, g={self.g}, b={self.b})>'
 
 
+def _pack_channels(red: int, green: int, blue: int) -> int:
+    """
+    Pack 8-bit color levels into a ``0xRRGGBB`` value.
+
+    Raises:
+        TypeError: A level is not an integer.
+        ValueError: A level is not from 0 to 255.
+    """
+    value = 0
+    for channel in (red, green, blue):
+        channel = operator.index(channel)
+        if not 0 <= channel <= 255:
+            raise ValueError(f'{channel!r} is not an 8-bit color level')
+        value = (value << 8) | channel
+    return value
+
+
 def RGBColor(red: int, green: int, blue: int) -> sRGBColor:
-    """Create sRGBColor instance for use in a Color Group."""
+    """
+    Create the sRGBColor with the given color levels (0-255).
+
+    Integer levels give the color of their packed value, see
+    :py:meth:`sRGBColor.from_packed`. Fractional levels are kept as given.
+
+    Raises:
+        ValueError: A level is not from 0 to 255.
+    """
+    try:
+        return sRGBColor.from_packed(_pack_channels(red, green, blue))
+    except TypeError:
+        pass
+    for channel in (red, green, blue):
+        if not 0 <= channel <= 255:
+            raise ValueError(f'{channel!r} is not an 8-bit color level')
     return sRGBColor(
         colormath.color_objects.sRGBColor(red, green, blue, is_upscaled=True)
     )
@@ -209,6 +605,8 @@ class HSVColor(
 ):
     """Class that defines a hue/saturation/value (HSV) color."""
 
+    __slots__ = ('__hue', '__saturation', '__value', '__value_tuple')
+
     @property
     def hue(self) -> int:
         """Get the color's hue angle (0-360)."""
@@ -291,6 +689,8 @@ class HSLColor(
 ):
     """Class that defines a hue/saturation/lightness (HSL) color."""
 
+    __slots__ = ('__hue', '__saturation', '__lightness', '__value_tuple')
+
     @property
     def hue(self) -> int:
         """Get the color's hue angle (0-360)."""
@@ -373,6 +773,13 @@ class LabColor(
 ):
     """Class that represents a CIE Lab color."""
 
+    __slots__ = (
+        '__lightness',
+        '__magenta_green',
+        '__yellow_blue',
+        '__value_tuple'
+    )
+
     @property
     def lightness(self) -> float:
         """Get the color's lighness level (0-100)."""
@@ -458,6 +865,8 @@ class LuvColor(
 ):
     """Class that represents a CIE Luv color."""
 
+    __slots__ = ('__lightness', '__u_axis', '__v_axis', '__value_tuple')
+
     @property
     def lightness(self) -> float:
         """Get the color's lighness level (0-100)."""
@@ -543,6 +952,8 @@ class LCHabColor(
 ):
     """Class that represents a CIE LCH color converted through CIE Lab."""
 
+    __slots__ = ('__lightness', '__chroma', '__hue', '__value_tuple')
+
     @property
     def lightness(self) -> float:
         """Get the color's lighness level (0-100)."""
@@ -628,6 +1039,8 @@ class LCHuvColor(
 ):
     """Class that represents a CIE LCH color converted through CIE Luv."""
 
+    __slots__ = ('__lightness', '__chroma', '__hue', '__value_tuple')
+
     @property
     def lightness(self) -> float:
         """Get the color's lighness level (0-100)."""
@@ -713,6 +1126,13 @@ class XYZColor(
 ):
     """Class that represents an XYZ color."""
 
+    __slots__ = (
+        '__x_coordinate',
+        '__y_coordinate',
+        '__z_coordinate',
+        '__value_tuple'
+    )
+
     @property
     def x_coordinate(self) -> float:
         """Get the color's x coordinate."""
@@ -798,6 +1218,13 @@ class xyYColor(
 ):
     """Class that represents a CIE xyY color."""
 
+    __slots__ = (
+        '__x_coordinate',
+        '__y_coordinate',
+        '__luminance',
+        '__value_tuple'
+    )
+
     @property
     def x_coordinate(self) -> float:
         """Get the color's x coordinate."""
@@ -883,6 +1310,8 @@ class AdobeRGBColor(
 ):
     """Class that represents an Adobe RGB color."""
 
+    __slots__ = ('__red', '__green', '__blue', '__hex', '__value_tuple')
+
     @property
     def red(self) -> int:
         """Get the red color level (0-255)."""
@@ -946,12 +1375,25 @@ class AdobeRGBColor(
     @property
     def hex(self) -> str:
         """Get the html 6-digit hex code (#rrggbb)."""
-        return self._get_value('get_rgb_hex', function=True)
+        self.__hex: str
+        try:
+            return self.__hex
+        except AttributeError:
+            self.__hex = self._get_value('get_rgb_hex', function=True)
+            return self.__hex
 
     @property
     def value_tuple(self) -> typing.Tuple[int, int, int]:
         """Get the tuple containing (red, green, blue)."""
-        return self._get_value('get_upscaled_value_tuple', function=True)
+        self.__value_tuple: typing.Tuple[int, int, int]
+        try:
+            return self.__value_tuple
+        except AttributeError:
+            self.__value_tuple = self._get_value(
+                'get_upscaled_value_tuple',
+                function=True
+            )
+            return self.__value_tuple
 
     @classmethod
     def from_hex(cls, hex_str: str) -> 'AdobeRGBColor':
@@ -972,6 +1414,8 @@ class AppleRGBColor(
 ):
     """Class that represents an Adobe RGB color."""
 
+    __slots__ = ('__red', '__green', '__blue', '__hex', '__value_tuple')
+
     @property
     def red(self) -> int:
         """Get the red color level (0-255)."""
@@ -1035,12 +1479,25 @@ class AppleRGBColor(
     @property
     def hex(self) -> str:
         """Get the html 6-digit hex code (#rrggbb)."""
-        return self._get_value('get_rgb_hex', function=True)
+        self.__hex: str
+        try:
+            return self.__hex
+        except AttributeError:
+            self.__hex = self._get_value('get_rgb_hex', function=True)
+            return self.__hex
 
     @property
     def value_tuple(self) -> typing.Tuple[int, int, int]:
         """Get the tuple containing (red, green, blue)."""
-        return self._get_value('get_upscaled_value_tuple', function=True)
+        self.__value_tuple: typing.Tuple[int, int, int]
+        try:
+            return self.__value_tuple
+        except AttributeError:
+            self.__value_tuple = self._get_value(
+                'get_upscaled_value_tuple',
+                function=True
+            )
+            return self.__value_tuple
 
     @classmethod
     def from_hex(cls, hex_str: str) -> 'AppleRGBColor':
@@ -1061,6 +1518,8 @@ class CMYColor(
 ):
     """Class that represents a CMY color."""
 
+    __slots__ = ('__cyan', '__magenta', '__yellow', '__value_tuple')
+
     @property
     def cyan(self) -> float:
         """Get the cyan color level."""
@@ -1146,6 +1605,8 @@ class CMYKColor(
 ):
     """Class that represents a CMYK color."""
 
+    __slots__ = ('__cyan', '__magenta', '__yellow', '__black', '__value_tuple')
+
     @property
     def cyan(self) -> float:
         """Get the cyan color level."""
@@ -1251,6 +1712,13 @@ class IPTColor(
 ):
     """Class that represents an IPT color."""
 
+    __slots__ = (
+        '__i_coordinate',
+        '__p_coordinate',
+        '__t_coordinate',
+        '__value_tuple'
+    )
+
     @property
     def i_coordinate(self) -> float:
         """Get the color's i coordinate."""
@@ -1329,6 +1797,533 @@ class IPTColor(
         return f'<IPTColor(i={self.i}, p={self.p}, t={self.t})>'
 
 
+def _conversion_properties(
+    method: str,
+    keyword: str = 'name'
+) -> typing.Callable[[type], type]:
+    """
+    Make a class decorator adding a property per registered color class.
+
+    Each property is named after a class's ``attr_name`` (``srgb``, ``lab``,
+    ...) and calls the decorated class's ``method`` with that name as the
+    ``keyword`` argument. Attributes the class defines itself are kept.
+    """
+    def decorate(cls: type) -> type:
+        for attr_name in ColorMeta._ColorMeta__class_registry:
+            if attr_name not in vars(cls):
+                setattr(cls, attr_name, property(functools.partial(
+                    getattr(cls, method),
+                    **{keyword: attr_name}
+                )))
+        return cls
+    return decorate
+
+
+@_conversion_properties('get_conv_attr')
+class RGB24:
+    """
+    Lightweight 8-bit sRGB color backed by a packed ``0xRRGGBB`` integer.
+
+    Unlike :py:class:`sRGBColor`, no colormath object is built until the
+    color is converted to another color space. Instances are interned: the
+    same value always gives the same object, held in a table preallocated
+    in pages of 65536 colors (one page per red and green high bits) the
+    first time a color in the page is created. Interned colors are never
+    freed. Colors hash like their integer value, so they make cheap cache
+    keys.
+
+    The channels match those of the :py:class:`sRGBColor` of the same
+    value (:py:attr:`srgb`), and every color space conversion (``lab``,
+    ``hsv``, ...) goes through it.
+    """
+
+    __slots__ = ('__value',)
+
+    __pages: typing.List[typing.Optional[typing.List['RGB24']]] = [None] * 256
+    __lock = threading.Lock()
+
+    def __new__(cls, value: int) -> 'RGB24':
+        """
+        Get the interned color for a packed ``0xRRGGBB`` value.
+
+        Raises:
+            TypeError: The value is not an integer.
+            ValueError: The value is not a 24-bit integer.
+        """
+        value = operator.index(value)
+        if not 0 <= value <= 0xffffff:
+            raise ValueError(f'{value!r} is not a 24-bit RGB value')
+        page = cls.__pages[value >> 16]
+        if page is not None:
+            color = page[value & 0xffff]
+            if color is not None:
+                return color
+
+        with cls.__lock:
+            page = cls.__pages[value >> 16]
+            if page is None:
+                page = cls.__pages[value >> 16] = [None] * 0x10000
+            color = page[value & 0xffff]
+            if color is None:
+                color = super().__new__(cls)
+                color.__value = value
+                page[value & 0xffff] = color
+            return color
+
+    @property
+    def value(self) -> int:
+        """Get the packed ``0xRRGGBB`` value."""
+        return self.__value
+
+    @property
+    def red(self) -> int:
+        """Get the red color level (0-255)."""
+        return self.__value >> 16
+
+    @property
+    def r(self) -> int:
+        """Get the red color level (0-255)."""
+        return self.__value >> 16
+
+    @property
+    def green(self) -> int:
+        """Get the green color level (0-255)."""
+        return (self.__value >> 8) & 0xff
+
+    @property
+    def g(self) -> int:
+        """Get the green color level (0-255)."""
+        return (self.__value >> 8) & 0xff
+
+    @property
+    def blue(self) -> int:
+        """Get the blue color level (0-255)."""
+        return self.__value & 0xff
+
+    @property
+    def b(self) -> int:
+        """Get the blue color level (0-255)."""
+        return self.__value & 0xff
+
+    @property
+    def hex(self) -> str:
+        """Get the html 6-digit hex code (#rrggbb)."""
+        return f'#{self.__value:06x}'
+
+    @property
+    def value_tuple(self) -> typing.Tuple[int, int, int]:
+        """Get the tuple containing (red, green, blue)."""
+        value = self.__value
+        return (value >> 16, (value >> 8) & 0xff, value & 0xff)
+
+    @property
+    def srgb(self) -> sRGBColor:
+        """Get the :py:class:`sRGBColor` of the same value."""
+        return sRGBColor.from_packed(self.__value)
+
+    @staticmethod
+    def get_conv_attr(self, name):
+        """Get attribute for conversion from the sRGBColor of the value."""
+        return getattr(self.srgb, name)
+
+    @classmethod
+    def from_rgb(cls, red: int, green: int, blue: int) -> 'RGB24':
+        """
+        Get the color with the given color levels (0-255).
+
+        Raises:
+            TypeError: A level is not an integer.
+            ValueError: A level is not from 0 to 255.
+        """
+        return cls(_pack_channels(red, green, blue))
+
+    @classmethod
+    def from_hex(cls, hex_str: str) -> 'RGB24':
+        """
+        Convert a 6-digit (or 3-digit) hex code into a color.
+
+        Codes are read as by :py:func:`convert.parse_hex`: surrounding
+        whitespace and the ``#`` are optional, digits may be upper or lower
+        case, and each digit of a 3-digit code stands for itself repeated.
+
+        Raises:
+            ValueError: The code is not six or three hex digits.
+        """
+        digits = hex_str.strip()
+        if digits.startswith('#'):
+            digits = digits[1:]
+        if len(digits) not in (3, 6) or not _HEX_DIGITS.issuperset(digits):
+            raise ValueError(f'{hex_str!r} is not a 6-digit hex code')
+        if len(digits) == 3:
+            digits = ''.join(digit * 2 for digit in digits)
+        return cls(int(digits, 16))
+
+    def __eq__(self, other: typing.Any) -> bool:
+        """
+        Check whether two colors have the same packed value.
+
+        Only RGB24 colors compare by value. :py:class:`sRGBColor` colors
+        compare by identity, so that members sharing a color stay distinct
+        (see :py:meth:`BaseColor.twin`), and are never equal to an RGB24
+        color: compare :py:attr:`srgb` or the packed values instead.
+        """
+        if isinstance(other, RGB24):
+            return self.__value == other.__value
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Hash the color like its packed value."""
+        return hash(self.__value)
+
+    def __int__(self) -> int:
+        """Get the packed ``0xRRGGBB`` value."""
+        return self.__value
+
+    def __reduce__(self) -> typing.Tuple[type, typing.Tuple[int]]:
+        """Pickle the color by value, so unpickling interns it again."""
+        return (type(self), (self.__value,))
+
+    def __repr__(self) -> str:
+        """Get the string representation of the RGB24 instance."""
+        return f'<RGB24(r={self.r}, g={self.g}, b={self.b})>'
+
+
+@_conversion_properties('convert', 'space')
+class ColorArray:
+    """
+    Columnar array of many colors in one color space.
+
+    The colors are stored as a structure of arrays: :py:attr:`channels` has
+    one contiguous row per channel, in the order and units of the colormath
+    class of the space (sRGB channels from 0 to 1, and so on). Attributes
+    named after the color classes (``srgb``, ``lab``, ``hsv``, ...) convert
+    the whole array at once with :py:mod:`colors.convert`, giving the same
+    values as converting every color on its own, and return a new
+    ColorArray. Like the conversions of single colors, they are computed on
+    first access and kept.
+
+    The channels are read-only, so slicing gives views sharing them
+    without copying. Indexing with an integer gives a single color of the
+    space, and indexing with an integer or boolean array gives a copy.
+    """
+
+    __slots__ = (
+        '__space',
+        '__channels',
+        '__source',
+        '__illuminant',
+        '__observer',
+        '__through_rgb',
+        '__conversions',
+    )
+
+    def __init__(
+        self,
+        values: numpy.ndarray,
+        space: typing.Union[str, type] = 'srgb',
+        illuminant: typing.Optional[str] = None,
+        observer: typing.Optional[str] = None
+    ) -> None:
+        """
+        Create an array from channel values.
+
+        Args:
+            values: ``(N, k)`` array of colors with the ``k`` channels of
+                the space's colormath class.
+            space: Color class of the colors, or its attribute name.
+            illuminant: Illuminant of the colors, for spaces that have one
+                (colormath's default, D50, when not given).
+            observer: Observer angle of the colors, for spaces that have one
+                (colormath's default, 2 degrees, when not given).
+
+        Raises:
+            ValueError: The space is unknown or the values do not have its
+                number of channels.
+        """
+        space = self.color_class(space)
+        source = getattr(colormath.color_objects, space.__name__)
+        values = numpy.asarray(values, dtype=float)
+        if values.ndim != 2 or values.shape[1] != len(source.VALUES):
+            raise ValueError(
+                f'{space.__name__} values must have shape '
+                f'(N, {len(source.VALUES)}), not {values.shape}'
+            )
+        if issubclass(source, colormath.color_objects.IlluminantMixin):
+            illuminant = (illuminant or 'd50').lower()
+            observer = str(observer or '2')
+        else:
+            illuminant = observer = None
+        self.__setup(
+            space,
+            numpy.array(values.T, order='C'),
+            source,
+            illuminant,
+            observer,
+            None
+        )
+
+    def __setup(
+        self,
+        space: type,
+        channels: numpy.ndarray,
+        source: type,
+        illuminant: typing.Optional[str],
+        observer: typing.Optional[str],
+        through_rgb: typing.Optional[type]
+    ) -> None:
+        """Set the state of a new array, making its channels read-only."""
+        channels.flags.writeable = False
+        self.__space = space
+        self.__channels = channels
+        self.__source = source
+        self.__illuminant = illuminant
+        self.__observer = observer
+        self.__through_rgb = through_rgb
+        # Conversions, keyed by the colormath class converted to.
+        self.__conversions: typing.Optional[
+            typing.Dict[type, 'ColorArray']
+        ] = None
+
+    @classmethod
+    def __derive(
+        cls,
+        space: type,
+        channels: numpy.ndarray,
+        source: type,
+        illuminant: typing.Optional[str],
+        observer: typing.Optional[str],
+        through_rgb: typing.Optional[type]
+    ) -> 'ColorArray':
+        """Create an array without validating or copying its channels."""
+        derived = object.__new__(cls)
+        derived.__setup(
+            space,
+            channels,
+            source,
+            illuminant,
+            observer,
+            through_rgb
+        )
+        return derived
+
+    @staticmethod
+    def color_class(space: typing.Union[str, type]) -> type:
+        """
+        Get a registered color class from itself or its attribute name.
+
+        Raises:
+            ValueError: The space is not a registered color class.
+        """
+        registry = ColorMeta._ColorMeta__class_registry
+        if isinstance(space, str):
+            try:
+                return registry[space]
+            except KeyError:
+                pass
+        elif space in registry.values():
+            return space
+        raise ValueError(
+            f'unknown color space {space!r}; expected one of '
+            f'{", ".join(registry)}'
+        )
+
+    @classmethod
+    def from_colors(
+        cls,
+        colors: typing.Iterable[
+            typing.Union['ColorGroup', 'BaseColor', 'RGB24']
+        ]
+    ) -> 'ColorArray':
+        """
+        Create an array from single colors sharing one color space.
+
+        :py:class:`RGB24` colors and group members count as
+        :py:class:`sRGBColor` colors.
+
+        Raises:
+            ValueError: The colors are in different color spaces, or relative
+                to different illuminants or observers.
+        """
+        values = []
+        kind = None
+        through_rgb = set()
+        for color in colors:
+            if isinstance(color, ColorGroup):
+                color = color._value_
+            if isinstance(color, RGB24):
+                color = color.srgb
+            value = color._color  # type: ignore
+            color_kind = (
+                type(color),
+                type(value),
+                getattr(value, 'illuminant', None),
+                getattr(value, 'observer', None)
+            )
+            if kind is None:
+                kind = color_kind
+            elif color_kind != kind:
+                raise ValueError('colors must all be in one color space')
+            through_rgb.add(value._through_rgb_type)
+            values.append(value.get_value_tuple())
+
+        if kind is None:
+            return cls(numpy.empty((0, 3)))
+        space, source, illuminant, observer = kind
+        # Colors converted to other RGB spaces are marked with the space to
+        # convert back through; keep the mark only when they all agree.
+        through_rgb = through_rgb.pop() if len(through_rgb) == 1 else None
+        array = numpy.array(values, dtype=float).reshape(len(values), -1)
+        return cls.__derive(
+            space,
+            numpy.array(array.T, order='C'),
+            source,
+            illuminant,
+            observer,
+            through_rgb
+        )
+
+    @classmethod
+    def from_packed(cls, packed: numpy.ndarray) -> 'ColorArray':
+        """Create an sRGB array from packed ``0xRRGGBB`` values."""
+        return cls(convert.unpack_rgb(packed) / 255)
+
+    @property
+    def space(self) -> type:
+        """Get the color class of the colors."""
+        return self.__space
+
+    @property
+    def channels(self) -> numpy.ndarray:
+        """Get the read-only ``(k, N)`` array of channels."""
+        return self.__channels
+
+    @property
+    def values(self) -> numpy.ndarray:
+        """Get the read-only ``(N, k)`` view of the colors."""
+        return self.__channels.T
+
+    @property
+    def illuminant(self) -> typing.Optional[str]:
+        """Get the illuminant of the colors, for spaces that have one."""
+        return self.__illuminant
+
+    @property
+    def observer(self) -> typing.Optional[str]:
+        """Get the observer angle of the colors, for spaces that have one."""
+        return self.__observer
+
+    def convert(self, space: typing.Union[str, type]) -> 'ColorArray':
+        """
+        Convert the colors to another color space.
+
+        Args:
+            space: Color class to convert to, or its attribute name.
+
+        Returns:
+            The converted colors. Conversions are kept, so converting to
+            the same space again gives the same array, and conversions
+            passing through a space already converted to (such as ``xyz``
+            on the way from ``srgb`` to ``lab``) start from there.
+        """
+        space = self.color_class(space)
+        target = getattr(colormath.color_objects, space.__name__)
+        if self.__conversions is None:
+            self.__conversions = {}
+        try:
+            return self.__conversions[target]
+        except KeyError:
+            pass
+
+        start = self
+        for intermediate in reversed(
+            convert.intermediates(self.__source, target, self.__through_rgb)
+        ):
+            cached = self.__conversions.get(intermediate)
+            if cached is not None and cached.__source is intermediate:
+                start = cached
+                break
+
+        through_rgb = self.__through_rgb
+        if convert.path(start.__source, target):
+            state = convert.convert(
+                start.values,
+                start.__source,
+                target,
+                start.__illuminant,
+                start.__observer,
+                through_rgb
+            )
+            channels = numpy.ascontiguousarray(state.values.T)
+            through_rgb = None
+        else:
+            state = convert.State(
+                self.values,
+                self.__source,
+                self.__illuminant,
+                self.__observer
+            )
+            channels = self.__channels
+        if (
+            issubclass(target, colormath.color_objects.BaseRGBColor)
+            and target is not colormath.color_objects.sRGBColor
+        ):
+            through_rgb = target
+
+        converted = self.__derive(
+            space,
+            channels,
+            state.space,
+            state.illuminant,
+            state.observer,
+            through_rgb
+        )
+        self.__conversions[target] = converted
+        return converted
+
+    def __len__(self) -> int:
+        """Get the number of colors."""
+        return self.__channels.shape[1]
+
+    def __iter__(self) -> typing.Iterator['BaseColor']:
+        """Iterate over the colors as single colors."""
+        for position in range(len(self)):
+            yield self[position]
+
+    def __getitem__(
+        self,
+        key: typing.Union[int, slice, numpy.ndarray]
+    ) -> typing.Union['BaseColor', 'ColorArray']:
+        """Get one color, or an array of the selected colors."""
+        try:
+            position = operator.index(key)
+        except TypeError:
+            return self.__derive(
+                self.__space,
+                self.__channels[:, key],
+                self.__source,
+                self.__illuminant,
+                self.__observer,
+                self.__through_rgb
+            )
+
+        values = self.__channels[:, position].tolist()
+        if self.__illuminant is None:
+            value = self.__source(*values)
+        else:
+            value = self.__source(
+                *values,
+                observer=self.__observer,
+                illuminant=self.__illuminant
+            )
+        if self.__through_rgb is not None:
+            value._through_rgb_type = self.__through_rgb
+        return self.__space(value)
+
+    def __repr__(self) -> str:
+        """Get the string representation of the ColorArray instance."""
+        return f'<ColorArray({self.__space.__name__}, {len(self)} colors)>'
+
+
 class ColorGroupMeta(enum.EnumMeta):
     """Metaclass for Color Groups."""
 
@@ -1337,8 +2332,46 @@ class ColorGroupMeta(enum.EnumMeta):
         """Get attribute for conversion from the enum value."""
         return getattr(self.value, name)
 
-    def __new__(metacls, name, bases, ns):
-        """Add all conversion properties to the new instance."""
+    @classmethod
+    def __prepare__(metacls, name, bases, **kwds):
+        """Create the class namespace, ignoring the group's options."""
+        return super().__prepare__(name, bases)
+
+    def __new__(
+        metacls,
+        name,
+        bases,
+        ns,
+        metric=None,
+        cache_size=None,
+        cache_policy=None
+    ):
+        """
+        Add all conversion properties to the new instance.
+
+        The group options are inherited from the base group when not given.
+
+        Args:
+            metric: Default delta E formula used to compare colors with the
+                group's members, as a name or :py:class:`diff.Metric` (CMC
+                for :py:class:`ColorGroup`).
+            cache_size: Most results kept by :py:meth:`ColorGroup.closest`
+                (4096 for :py:class:`ColorGroup`).
+            cache_policy: Eviction policy of the results cache, see
+                :py:class:`cache.ResultCache` (LRU for
+                :py:class:`ColorGroup`).
+        """
+        # Equal colors share one flyweight instance, which would turn every
+        # member after the first with the same color into an alias. Give
+        # those members a twin of the color so they stay members.
+        seen = set()
+        for member_name in ns._member_names:
+            value = ns[member_name]
+            if isinstance(value, BaseColor):
+                if id(value) in seen:
+                    dict.__setitem__(ns, member_name, value.twin())
+                seen.add(id(value))
+
         for attr_name in ColorMeta._ColorMeta__class_registry:
             ns[attr_name] = property(
                 functools.partial(
@@ -1346,12 +2379,28 @@ class ColorGroupMeta(enum.EnumMeta):
                     name=attr_name
                 )
             )
-        return super().__new__(
+        enum_class = super().__new__(
             metacls,
             name,
             bases,
             ns
         )
+        enum_class._metric = diff.get_metric(
+            metric or getattr(enum_class, '_metric', 'cmc')
+        )
+        parent_cache = getattr(enum_class, '_closest_cache', None)
+        if parent_cache is not None:
+            if cache_size is None:
+                cache_size = parent_cache.maxsize
+            cache_policy = cache_policy or parent_cache.policy
+        enum_class._closest_cache = cache.ResultCache(
+            4096 if cache_size is None else cache_size,
+            cache_policy or 'lru'
+        )
+        enum_class._lookup_table = None
+        enum_class._approx_lattices = {}
+        enum_class._translations = {}
+        return enum_class
 
 
 class ColorGroup(enum.Enum, metaclass=ColorGroupMeta):
@@ -1362,62 +2411,1129 @@ class ColorGroup(enum.Enum, metaclass=ColorGroupMeta):
     The purpose of these is to logically manage colors more easily, as well
     as provide a mechanism to convert a color from one system to the closest
     color of another system in a simple way.
+
+    Colors are compared using a delta E formula from :py:mod:`colors.diff`.
+    Each group has a default (CMC unless the group was defined with a
+    ``metric`` class keyword), and every search method takes a ``metric``
+    argument to override it.
+
+    Members defined with :py:func:`RGBColor` are found by their packed
+    values, so searches run off the group's arrays without creating the
+    colormath objects of the members' colors.
     """
 
+    def __reduce_ex__(self, protocol: int) -> tuple:
+        """Pickle the member by name rather than by its color."""
+        return getattr, (type(self), self._name_)
+
+    @classmethod
+    def _missing_(cls, value: typing.Any) -> typing.Optional['ColorGroup']:
+        """
+        Find the member with the color ``value``.
+
+        The enum lookup only finds members by their own color objects, so
+        this also takes the 8-bit colors with the same packed value: any
+        :py:class:`RGB24` or exactly 8-bit :py:class:`sRGBColor`. Among
+        members sharing the color, the one whose ``value`` is ``value``
+        itself is preferred, then the first.
+        """
+        if isinstance(value, ColorGroup):
+            return None
+        packed = cls._packed_value(value)
+        members = cls._value_members().get(packed, ())
+        for member in members:
+            if member.value is value:
+                return member
+        return members[0] if members else None
+
     @classmethod
-    @functools.lru_cache(maxsize=128)
     def closest(
         cls,
-        color: typing.Union['ColorGroup', 'BaseColor']
+        color: typing.Union['ColorGroup', 'BaseColor', 'RGB24'],
+        metric: typing.Union[str, diff.Metric, None] = None,
+        mode: str = 'exact'
+    ) -> 'ColorGroup':
+        """
+        Find the closest match in this color group to the given color.
+
+        Results are cached per group by the value of the color: its packed
+        ``0xRRGGBB`` value for 8-bit sRGB colors, otherwise its color space
+        and channel values (see :py:meth:`ColorMeta.value_key`). Equal
+        colors therefore share an entry even when they are different
+        objects. Entries also record which Lab cube was in use (see
+        :py:func:`convert.lab_cube_token`), since it changes the Lab values
+        of 8-bit colors. See :py:meth:`cache_info` and
+        :py:meth:`configure_cache`.
+
+        With ``mode='approx'``, 8-bit sRGB colors are only compared with the
+        few candidates kept for them by the lattice
+        :py:meth:`build_approx_lattice` attached for the formula, which may
+        pick a member further from the color than the best one by up to the
+        ``bounds`` entry of its cell. Until a lattice is built, and for other
+        colors, searches are exact. A single color is converted to Lab and
+        scored against its candidates in plain floats, which is about ten
+        times faster than an uncached exact search on Xterm.
+
+        Raises:
+            ValueError: The mode is not one of :py:data:`MODES`.
+        """
+        metric = cls._metric_for(metric)
+        cls._check_mode(mode)
+        table = cls._lookup_table
+        packed = cls._packed_value(color)
+        if packed is not None:
+            if table is not None and table.metric == metric.key:
+                return cls._members()[table[packed]]
+            lattice = cls._approx_lattices.get(metric.key)
+            if mode == 'approx' and lattice is not None:
+                row = cls._approx_row(packed, lattice, metric)
+                return cls._members()[cls._positions()[row]]
+            key = packed
+        else:
+            if isinstance(color, ColorGroup):
+                color = color._value_
+            key = ColorMeta.value_key(color._color)  # type: ignore
+
+        def find() -> 'ColorGroup':
+            row = cls._closest_rows(cls._lab_array([color]), metric)[0]
+            return cls._members()[cls._positions()[row]]
+
+        return cls._closest_cache.lookup(
+            (metric.key, convert.lab_cube_token(), key),
+            find
+        )
+
+    @classmethod
+    def cache_info(cls) -> cache.CacheInfo:
+        """Get the statistics of this group's :py:meth:`closest` cache."""
+        return cls._closest_cache.info()
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        """Empty this group's :py:meth:`closest` cache."""
+        cls._closest_cache.clear()
+
+    @classmethod
+    def configure_cache(
+        cls,
+        maxsize: typing.Optional[int] = 4096,
+        policy: str = 'lru'
+    ) -> None:
+        """
+        Replace this group's :py:meth:`closest` cache with an empty one.
+
+        Args:
+            maxsize: Most results kept, ``None`` for no limit, or 0 to
+                disable caching.
+            policy: Eviction policy, see :py:class:`cache.ResultCache`.
+        """
+        cls._closest_cache = cache.ResultCache(maxsize, policy)
+
+    @classmethod
+    def closest_many(
+        cls,
+        colors: typing.Union[
+            'ColorArray',
+            typing.Iterable[typing.Union['ColorGroup', 'BaseColor', 'RGB24']]
+        ],
+        indices: bool = False,
+        metric: typing.Union[str, diff.Metric, None] = None,
+        mode: str = 'exact'
+    ) -> typing.Union[typing.Tuple['ColorGroup', ...], numpy.ndarray]:
+        """
+        Find the closest match in this color group for each of many colors.
+
+        This gives the same results as calling :py:meth:`closest` on every
+        color, but compares the whole batch against the group's Lab matrix
+        at once rather than one member at a time. Groups larger than
+        :py:data:`INDEX_THRESHOLD` search the spatial index for each color
+        instead.
+
+        Args:
+            colors: The colors to match, as single colors or a
+                :py:class:`ColorArray`.
+            indices: Return an array of positions into ``list(cls)`` instead
+                of a tuple of members.
+            metric: Delta E formula to use instead of the group's default.
+            mode: ``'exact'``, or ``'approx'`` to use the group's lattice as
+                described in :py:meth:`closest`.
+
+        Returns:
+            The closest member (or its position) for each color, in order.
+
+        Raises:
+            ValueError: The mode is not one of :py:data:`MODES`.
+        """
+        metric = cls._metric_for(metric)
+        cls._check_mode(mode)
+        if not isinstance(colors, ColorArray):
+            colors = list(colors)
+        positions = numpy.empty(len(colors), dtype=numpy.intp)
+        pending = numpy.ones(len(colors), dtype=bool)
+        table = cls._lookup_table
+        use_table = table is not None and table.metric == metric.key
+        lattice = cls._approx_lattices.get(metric.key)
+        approx = mode == 'approx' and lattice is not None
+        if use_table or approx:
+            packed, pending = cls._packed_values(colors)
+            if not pending.all():
+                values = packed[~pending]
+                if use_table:
+                    positions[~pending] = table[values]
+                else:
+                    positions[~pending] = cls._positions()[
+                        cls._approx_rows(values, lattice, metric)
+                    ]
+
+        if pending.any():
+            if isinstance(colors, ColorArray):
+                labs = cls._lab_array(colors[pending])
+            else:
+                labs = cls._lab_array(
+                    color
+                    for color, flag in zip(colors, pending)
+                    if flag
+                )
+            positions[pending] = cls._positions()[
+                cls._closest_rows(labs, metric)
+            ]
+        if indices:
+            return positions
+        members = cls._members()
+        return tuple(members[position] for position in positions)
+
+    @classmethod
+    def closest_k(
+        cls,
+        color: typing.Union['ColorGroup', 'BaseColor', 'RGB24'],
+        k: int,
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> typing.Tuple[typing.Tuple['ColorGroup', float], ...]:
+        """
+        Find the ``k`` closest matches in this color group to the given color.
+
+        Args:
+            color: The color to match.
+            k: How many members to return. Groups with fewer members return
+                all of them.
+            metric: Delta E formula to use instead of the group's default.
+
+        Returns:
+            ``(member, distance)`` pairs, closest first. Members at the same
+            distance are ordered as they are in the group.
+
+        Raises:
+            ValueError: ``k`` is less than 1.
+        """
+        return cls.closest_k_many([color], k, metric=metric)[0]
+
+    @classmethod
+    def closest_k_many(
+        cls,
+        colors: typing.Union[
+            'ColorArray',
+            typing.Iterable[typing.Union['ColorGroup', 'BaseColor', 'RGB24']]
+        ],
+        k: int,
+        indices: bool = False,
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> typing.Union[
+        typing.Tuple[
+            typing.Tuple[typing.Tuple['ColorGroup', float], ...],
+            ...
+        ],
+        typing.Tuple[numpy.ndarray, numpy.ndarray]
+    ]:
+        """
+        Find the ``k`` closest matches in this color group for many colors.
+
+        Only the ``k`` best members of each color are sorted; the rest are
+        discarded with a partial selection.
+
+        Args:
+            colors: The colors to match, as single colors or a
+                :py:class:`ColorArray`.
+            k: How many members to return per color. Groups with fewer
+                members return all of them.
+            indices: Return ``(positions, distances)`` arrays of shape
+                ``(N, k)`` instead, with positions into ``list(cls)``.
+            metric: Delta E formula to use instead of the group's default.
+
+        Returns:
+            For each color, its ``(member, distance)`` pairs, closest first.
+
+        Raises:
+            ValueError: ``k`` is less than 1.
+        """
+        if k < 1:
+            raise ValueError(f'k must be at least 1, not {k}')
+
+        metric = cls._metric_for(metric)
+        labs = cls._lab_array(colors)
+        rows, distances = cls._closest_k_rows(labs, k, metric)
+        positions = cls._positions()[rows]
+        if indices:
+            return positions, distances
+        members = cls._members()
+        return tuple(
+            tuple(
+                (members[position], float(distance))
+                for position, distance in zip(row, row_distances)
+            )
+            for row, row_distances in zip(positions, distances)
+        )
+
+    @classmethod
+    def within(
+        cls,
+        color: typing.Union['ColorGroup', 'BaseColor', 'RGB24'],
+        max_delta_e: float,
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> typing.Tuple[typing.Tuple['ColorGroup', float], ...]:
+        """
+        Find every member of this color group close to the given color.
+
+        Args:
+            color: The color to match.
+            max_delta_e: Largest distance (inclusive) of the members to
+                return.
+            metric: Delta E formula to use instead of the group's default.
+
+        Returns:
+            ``(member, distance)`` pairs, closest first. Members at the same
+            distance are ordered as they are in the group.
+        """
+        return cls.within_many([color], max_delta_e, metric=metric)[0]
+
+    @classmethod
+    def within_many(
+        cls,
+        colors: typing.Union[
+            'ColorArray',
+            typing.Iterable[typing.Union['ColorGroup', 'BaseColor', 'RGB24']]
+        ],
+        max_delta_e: float,
+        indices: bool = False,
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> typing.Union[
+        typing.Tuple[
+            typing.Tuple[typing.Tuple['ColorGroup', float], ...],
+            ...
+        ],
+        typing.Tuple[typing.Tuple[numpy.ndarray, numpy.ndarray], ...]
+    ]:
+        """
+        Find every member of this color group close to each of many colors.
+
+        Large groups only compare the members that the spatial index finds
+        inside the equivalent Lab radius; smaller groups compare the whole
+        batch against the Lab matrix.
+
+        Args:
+            colors: The colors to match, as single colors or a
+                :py:class:`ColorArray`.
+            max_delta_e: Largest distance (inclusive) of the members to
+                return.
+            indices: Return a ``(positions, distances)`` pair of arrays per
+                color instead, with positions into ``list(cls)``.
+            metric: Delta E formula to use instead of the group's default.
+
+        Returns:
+            For each color, its ``(member, distance)`` pairs, closest first.
+        """
+        metric = cls._metric_for(metric)
+        labs = cls._lab_array(colors)
+        found = cls._within_rows(labs, max_delta_e, metric)
+        positions = cls._positions()
+        if indices:
+            return tuple(
+                (positions[rows], distances)
+                for rows, distances in found
+            )
+        members = cls._members()
+        return tuple(
+            tuple(
+                (members[position], float(distance))
+                for position, distance in zip(positions[rows], distances)
+            )
+            for rows, distances in found
+        )
+
+    @classmethod
+    def build_lookup_table(
+        cls,
+        directory: typing.Optional[str] = None,
+        workers: typing.Optional[int] = None,
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> lut.LookupTable:
+        """
+        Precompute the closest member for every 24-bit sRGB color.
+
+        The table is written to ``directory`` (by default
+        :py:func:`lut.cache_dir`) under a name that includes a hash of the
+        group's colors and the delta E formula, and attached to the group so
+        that :py:meth:`closest` and :py:meth:`closest_many` answer 8-bit sRGB
+        colors compared with that formula using a single array lookup.
+
+        Args:
+            directory: Where to store the table.
+            workers: Number of threads used to build the table.
+            metric: Delta E formula to use instead of the group's default.
+
+        Returns:
+            The attached table.
+        """
+        metric = cls._metric_for(metric)
+        dtype = numpy.uint8 if len(cls) <= 256 else numpy.uint16
+        cls._lookup_table = lut.LookupTable.build(
+            cls._lookup_table_path(directory, metric),
+            metric.key,
+            lambda labs: cls._positions()[cls._closest_rows(labs, metric)],
+            dtype,
+            workers
+        )
+        return cls._lookup_table
+
+    @classmethod
+    def use_lookup_table(
+        cls,
+        directory: typing.Optional[str] = None,
+        build: bool = False,
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> lut.LookupTable:
+        """
+        Attach a lookup table previously built for this group.
+
+        The file is not opened until the first lookup. A table built for a
+        group whose colors have since changed is never picked up, since its
+        name no longer matches.
+
+        Args:
+            directory: Where the table is stored.
+            build: Build the table if it does not exist yet.
+            metric: Delta E formula the table was built with, instead of the
+                group's default.
+
+        Returns:
+            The attached table.
+
+        Raises:
+            FileNotFoundError: The table does not exist and ``build`` is not
+                set.
+        """
+        metric = cls._metric_for(metric)
+        path = cls._lookup_table_path(directory, metric)
+        if not os.path.exists(path):
+            if build:
+                return cls.build_lookup_table(directory, metric=metric)
+            raise FileNotFoundError(path)
+        cls._lookup_table = lut.LookupTable(path, metric.key)
+        return cls._lookup_table
+
+    @classmethod
+    def translation(
+        cls,
+        other: typing.Type['ColorGroup'],
+        metric: typing.Union[str, diff.Metric, None] = None,
+        persist: bool = False,
+        directory: typing.Optional[str] = None
+    ) -> numpy.ndarray:
+        """
+        Get the closest member of another group for every member of this one.
+
+        The mapping is computed for the whole group at once the first time
+        it is needed and kept on this group, so translating single members
+        with :py:meth:`to` afterwards is an array lookup.
+
+        Args:
+            other: The group to translate to.
+            metric: Delta E formula to use instead of ``other``'s default.
+            persist: Load the mapping from disk, or save it there after
+                computing it. The file name identifies the colors of both
+                groups, so stale mappings are never picked up; a file that
+                is not a mapping between the two groups (e.g. a truncated
+                one) is computed and written again.
+            directory: Where persisted mappings are stored.
+
+        Returns:
+            A read-only array giving, for each position in ``list(cls)``, the
+            position in ``list(other)`` of the closest member, or -1 for
+            members without a color.
+        """
+        metric = other._metric_for(metric)
+        key = (other, metric.key)
+        try:
+            return cls._translations[key]
+        except KeyError:
+            pass
+
+        path = cls._translation_path(other, directory, metric)
+        mapping = None
+        if persist and os.path.exists(path):
+            mapping = cls._load_translation(path, other)
+        if mapping is None:
+            mapping = numpy.full(len(cls._members()), -1, dtype=numpy.intp)
+            mapping[cls._positions()] = other._positions()[
+                other._closest_rows(cls._lab_matrix(), metric)
+            ]
+            if persist:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                partial = f'{path}.{os.getpid()}.tmp.npy'
+                numpy.save(partial, mapping)
+                os.replace(partial, path)
+
+        mapping.flags.writeable = False
+        cls._translations[key] = mapping
+        return mapping
+
+    @classmethod
+    def _load_translation(
+        cls,
+        path: str,
+        other: typing.Type['ColorGroup']
+    ) -> typing.Optional[numpy.ndarray]:
+        """
+        Load a persisted mapping to another group.
+
+        Returns:
+            The mapping, or ``None`` if the file is not a complete mapping
+            of this group's members to positions in ``other``.
+        """
+        try:
+            mapping = numpy.load(path)
+        except (EOFError, OSError, ValueError):
+            return None
+        if (
+            mapping.shape != (len(cls._members()),)
+            or mapping.dtype.kind not in 'iu'
+            or (len(mapping) and not (
+                -1 <= mapping.min() and mapping.max() < len(other._members())
+            ))
+        ):
+            return None
+        return mapping.astype(numpy.intp, copy=False)
+
+    def to(
+        self,
+        other: typing.Type['ColorGroup'],
+        metric: typing.Union[str, diff.Metric, None] = None
     ) -> 'ColorGroup':
-        """Find the closest match in this color group to the given color."""
-        color_object = color.lab._BaseColor__color  # type: ignore
+        """
+        Get the closest member of another group to this member.
+
+        For example, ``X11.Firebrick.to(Xterm)``. See :py:meth:`translation`.
+
+        Raises:
+            ValueError: This member has no color.
+        """
+        cls = type(self)
+        position = cls.translation(other, metric)[cls._member_index()[self]]
+        if position < 0:
+            raise ValueError(f'{self} has no color to translate')
+        return other._members()[position]
+
+    @classmethod
+    def _translation_path(
+        cls,
+        other: typing.Type['ColorGroup'],
+        directory: typing.Optional[str],
+        metric: diff.Metric
+    ) -> str:
+        """Get the file name of this group's mapping to another group."""
+        key = lut.digest(
+            f'{other.__module__}.{other.__qualname__}',
+            cls._rgb_matrix().tobytes(),
+            other._rgb_matrix().tobytes(),
+            metric.key
+        )
+        path = os.path.join(
+            lut.cache_dir(),
+            f'{cls.__module__}.{cls.__qualname__}-to-'
+            f'{other.__qualname__}-{key}.npy'
+        )
+        if directory is None:
+            return path
+        return os.path.join(directory, os.path.basename(path))
+
+    @classmethod
+    def _lookup_table_path(
+        cls,
+        directory: typing.Optional[str],
+        metric: diff.Metric
+    ) -> str:
+        """Get the file name of this group's lookup table."""
+        key = lut.digest(cls._rgb_matrix().tobytes(), metric.key)
+        path = lut.LookupTable.default_path(cls, key)
+        if directory is None:
+            return path
+        return os.path.join(directory, os.path.basename(path))
+
+    @staticmethod
+    def _packed_value(
+        color: typing.Union['ColorGroup', 'BaseColor', 'RGB24']
+    ) -> typing.Optional[int]:
+        """Get the ``0xRRGGBB`` value of an exactly 8-bit sRGB color."""
+        if isinstance(color, ColorGroup):
+            color = color._value_
+        if isinstance(color, RGB24):
+            return color.value
+        if not isinstance(color, sRGBColor):
+            return None
+        return color._packed
+
+    @classmethod
+    def _packed_values(
+        cls,
+        colors: typing.Union[
+            'ColorArray',
+            typing.Sequence[typing.Union['ColorGroup', 'BaseColor', 'RGB24']]
+        ]
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Get the ``0xRRGGBB`` values of the exactly 8-bit sRGB colors.
+
+        Returns:
+            The packed values, and which colors are not 8-bit sRGB (whose
+            packed values are meaningless).
+        """
+        if not isinstance(colors, ColorArray):
+            packed = numpy.array(
+                [cls._packed_value(color) for color in colors],
+                dtype=object
+            )
+            pending = numpy.equal(packed, None)
+            packed = numpy.where(pending, 0, packed).astype(numpy.uint32)
+            return packed, pending
+
+        if not issubclass(colors.space, sRGBColor):
+            return (
+                numpy.zeros(len(colors), dtype=numpy.uint32),
+                numpy.ones(len(colors), dtype=bool)
+            )
+        upscaled = numpy.floor(0.5 + colors.values * 255)
+        exact = (
+            (upscaled >= 0)
+            & (upscaled <= 255)
+            & (upscaled / 255 == colors.values)
+        ).all(axis=1)
+        packed = convert.pack_rgb(numpy.where(exact[:, None], upscaled, 0))
+        return packed.astype(numpy.uint32), ~exact
+
+    @classmethod
+    def build_approx_lattice(
+        cls,
+        bits: int = APPROX_BITS,
+        metric: typing.Union[str, diff.Metric, None] = None,
+        tolerance: float = APPROX_TOLERANCE
+    ) -> lut.Lattice:
+        """
+        Compute the lattice used by ``mode='approx'`` searches.
+
+        The lattice is attached to the group for the delta E formula,
+        replacing any previous one. Building it takes about as long as
+        ``(2 ** bits + 1) ** 3`` exact searches, bounding the distance from
+        every cell to every member, and comparing the 8-bit colors of the
+        cells that bound leaves open with the members near them (see
+        ``python -m benchmarks.approx`` for the bundled groups). Its
+        ``bounds`` and ``error_bound`` give, in the formula used, the largest
+        error it introduces for this group in each cell and overall.
+
+        Args:
+            bits: Bits kept per channel; more bits give fewer ambiguous
+                cells, but a larger lattice.
+            metric: Delta E formula to use instead of the group's default.
+            tolerance: Largest error the corner answers of a cell may make
+                before they are replaced with exact ones.
+
+        Returns:
+            The attached lattice.
+
+        Raises:
+            ValueError: The formula has no lattice (CIEDE2000).
+        """
+        metric = cls._metric_for(metric)
+        lattice = lut.Lattice.build(
+            bits,
+            cls._lab_matrix(),
+            metric,
+            lambda labs: cls._closest_rows(labs, metric),
+            tolerance
+        )
+        cls._approx_lattices[metric.key] = lattice
+        return lattice
 
-        distances = {
-            colormath.color_diff.delta_e_cmc(
-                color_object,
-                item.lab._BaseColor__color  # type: ignore
-            ): item
-            for item in reversed(cls)
-        }
-        return distances[min(distances.keys())]  # type: ignore
+    @classmethod
+    def approx_lattice(
+        cls,
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> typing.Optional[lut.Lattice]:
+        """
+        Get the lattice attached for a delta E formula, if one was built.
+
+        Args:
+            metric: Delta E formula to use instead of the group's default.
+        """
+        return cls._approx_lattices.get(cls._metric_for(metric).key)
+
+    @classmethod
+    def _approx_row(
+        cls,
+        packed: int,
+        lattice: lut.Lattice,
+        metric: diff.Metric
+    ) -> int:
+        """Get the best lattice candidate row for one packed sRGB value."""
+        candidates = lattice.candidates[lattice.cell(packed)].tolist()
+        if candidates[0] == candidates[-1]:
+            return candidates[0]
+        lab = convert.rgb8_to_lab_single(packed)
+        return cls._closest_of_rows(lab, candidates, metric)
+
+    @classmethod
+    def _approx_rows(
+        cls,
+        packed: numpy.ndarray,
+        lattice: lut.Lattice,
+        metric: diff.Metric
+    ) -> numpy.ndarray:
+        """Get the best lattice candidate row for packed sRGB values."""
+        candidates = lattice[packed]
+        rows = candidates[:, 0].copy()
+        ambiguous = numpy.flatnonzero(candidates[:, 0] != candidates[:, -1])
+        if len(ambiguous):
+            # Candidates are sorted, so the first closest is the earliest
+            # member among equally close ones.
+            candidates = candidates[ambiguous]
+            labs = convert.rgb8_to_lab(convert.unpack_rgb(packed[ambiguous]))
+            distances = metric(labs, cls._lab_matrix()[candidates])
+            rows[ambiguous] = numpy.take_along_axis(
+                candidates,
+                cls._first_closest(distances)[:, None],
+                axis=1
+            )[:, 0]
+        return rows
+
+    @staticmethod
+    def _check_mode(mode: str) -> None:
+        """Make sure the search mode is known."""
+        if mode not in MODES:
+            raise ValueError(
+                f'unknown search mode {mode!r}; expected one of '
+                f'{", ".join(MODES)}'
+            )
+
+    @classmethod
+    def _metric_for(
+        cls,
+        metric: typing.Union[str, diff.Metric, None]
+    ) -> diff.Metric:
+        """Get the delta E formula to use, falling back on the default."""
+        if metric is None:
+            return cls._metric
+        return diff.get_metric(metric)
+
+    @classmethod
+    def _closest_indexed_row(
+        cls,
+        lab: numpy.ndarray,
+        metric: diff.Metric
+    ) -> int:
+        """
+        Get the Lab matrix row closest to a Lab color using the spatial index.
+
+        The Euclidean nearest member gives an upper bound on the distance of
+        the answer, which the metric's scale factor turns into a Lab radius
+        that must contain it. Only the members inside that radius are
+        compared with the full formula. Formulas without a plain float form
+        for the color (see :py:meth:`diff.Metric.single`) are compared
+        against every member.
+        """
+        lab = lab.reshape(1, 3)
+        matrix = cls._lab_matrix()
+        tree = cls.spatial_index()
+        _, nearest = tree.query(lab)
+        measured = metric.single(lab[0].tolist(), [matrix[nearest].tolist()])
+        if measured is None:
+            return int(cls._first_closest(metric(lab, matrix))[0])
+
+        (bound,), scale = measured
+        rows = tree.query_radius(lab, bound / scale * (1 + 1e-9) + 1e-9)
+        return cls._closest_of_rows(lab, rows.tolist(), metric)
+
+    @classmethod
+    def _closest_of_rows(
+        cls,
+        lab: typing.Union[numpy.ndarray, typing.Sequence[float]],
+        rows: typing.Sequence[int],
+        metric: diff.Metric
+    ) -> int:
+        """
+        Get the closest of some Lab matrix rows, in order, to a Lab color.
+
+        The rows are scored in plain floats where the metric allows it, and
+        the lowest one within :py:data:`TIE_TOLERANCE` of the closest wins,
+        as in :py:meth:`_first_closest`.
+        """
+        samples = cls._lab_rows()
+        # Members sharing a color tie exactly, so only the first can win.
+        first: typing.Dict[typing.Tuple[float, ...], int] = {}
+        for row in rows:
+            first.setdefault(samples[row], row)
+        rows = list(first.values())
+        if len(rows) == 1:
+            return rows[0]
+
+        if isinstance(lab, numpy.ndarray):
+            lab = lab.ravel().tolist()
+        measured = metric.single(lab, list(first))
+        if measured is None:
+            distances = metric(
+                numpy.array(lab, dtype=float).reshape(1, 3),
+                cls._lab_matrix()[rows]
+            )[0].tolist()
+        else:
+            distances, _ = measured
+        least = min(distances) * (1 + TIE_TOLERANCE)
+        return next(
+            row
+            for row, distance in zip(rows, distances)
+            if distance <= least
+        )
+
+    @staticmethod
+    def _first_closest(distances: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the closest column of each row of distances.
+
+        This is the lowest column within :py:data:`TIE_TOLERANCE` of the
+        row's least distance, rather than the exact argmin.
+        """
+        least = distances.min(axis=1, keepdims=True)
+        return (distances <= least * (1 + TIE_TOLERANCE)).argmax(axis=1)
+
+    @classmethod
+    def _closest_rows(
+        cls,
+        labs: numpy.ndarray,
+        metric: diff.Metric
+    ) -> numpy.ndarray:
+        """Get the Lab matrix row closest to each of the given Lab colors."""
+        matrix = cls._lab_matrix()
+        indexed = len(labs) == 1 or len(matrix) > INDEX_THRESHOLD
+        if indexed and metric.scale is not None:
+            return numpy.array(
+                [cls._closest_indexed_row(lab, metric) for lab in labs],
+                dtype=numpy.intp
+            )
+        rows = numpy.empty(len(labs), dtype=numpy.intp)
+        step = cls._chunk_size(len(matrix))
+        for start in range(0, len(labs), step):
+            chunk = labs[start:start + step]
+            rows[start:start + step] = cls._first_closest(
+                metric(chunk, matrix)
+            )
+        return rows
+
+    @classmethod
+    def _closest_k_rows(
+        cls,
+        labs: numpy.ndarray,
+        k: int,
+        metric: diff.Metric
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """Get the ``k`` closest Lab matrix rows and their distances."""
+        matrix = cls._lab_matrix()
+        k = min(k, len(matrix))
+        rows = numpy.empty((len(labs), k), dtype=numpy.intp)
+        distances = numpy.empty((len(labs), k), dtype=float)
+        if len(matrix) > RADIUS_INDEX_THRESHOLD and metric.scale is not None:
+            for row, lab in enumerate(labs):
+                found = cls._closest_k_indexed_rows(lab, k, metric)
+                rows[row], distances[row] = found
+            return rows, distances
+
+        step = cls._chunk_size(len(matrix))
+        for start in range(0, len(labs), step):
+            chunk = metric(labs[start:start + step], matrix)
+            if k < len(matrix):
+                # The partition only finds the k-th smallest distance; keep
+                # every row below it and fill up with the first rows at it,
+                # so ties are broken in favour of the earlier member.
+                kth = numpy.partition(chunk, k - 1, axis=1)[:, k - 1:k]
+                below = chunk < kth
+                tied = chunk == kth
+                room = k - below.sum(axis=1, keepdims=True)
+                keep = below | (tied & (numpy.cumsum(tied, axis=1) <= room))
+                best = numpy.nonzero(keep)[1].reshape(-1, k)
+            else:
+                best = numpy.broadcast_to(numpy.arange(k), chunk.shape)
+            best_distances = numpy.take_along_axis(chunk, best, axis=1)
+            order = numpy.lexsort((best, best_distances), axis=1)
+            rows[start:start + step] = numpy.take_along_axis(
+                best, order, axis=1
+            )
+            distances[start:start + step] = numpy.take_along_axis(
+                best_distances, order, axis=1
+            )
+        return rows, distances
+
+    @classmethod
+    def _closest_k_indexed_rows(
+        cls,
+        lab: numpy.ndarray,
+        k: int,
+        metric: diff.Metric
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Get the ``k`` closest Lab matrix rows using the spatial index.
+
+        The ``k`` Euclidean nearest members bound the distance of the
+        ``k``-th closest one, as in :py:meth:`_closest_indexed_row`.
+        """
+        lab = lab.reshape(1, 3)
+        matrix = cls._lab_matrix()
+        tree = cls.spatial_index()
+        _, nearest = tree.query_k(lab, k)
+        measured = metric.single(lab[0].tolist(), matrix[nearest].tolist())
+        if measured is None:
+            rows = numpy.arange(len(matrix))
+        else:
+            bounds, scale = measured
+            radius = max(bounds) / scale * (1 + 1e-9) + 1e-9
+            rows = tree.query_radius(lab, radius)
+        distances = metric(lab, matrix[rows])[0]
+        order = numpy.lexsort((rows, distances))[:k]
+        return rows[order], distances[order]
+
+    @classmethod
+    def _within_rows(
+        cls,
+        labs: numpy.ndarray,
+        max_delta_e: float,
+        metric: diff.Metric
+    ) -> typing.List[typing.Tuple[numpy.ndarray, numpy.ndarray]]:
+        """Get the Lab matrix rows and distances inside the given radius."""
+        matrix = cls._lab_matrix()
+        found = []
+        if len(matrix) > RADIUS_INDEX_THRESHOLD and metric.scale is not None:
+            tree = cls.spatial_index()
+            for lab in labs:
+                lab = lab.reshape(1, 3)
+                measured = metric.single(lab[0].tolist(), [])
+                if measured is None:
+                    scale = metric.lower_bound(lab)[0]
+                else:
+                    _, scale = measured
+                radius = max_delta_e / scale * (1 + 1e-9) + 1e-9
+                rows = tree.query_radius(lab, radius)
+                distances = metric(lab, matrix[rows])[0]
+                found.append(cls._sorted_hits(rows, distances, max_delta_e))
+            return found
+
+        step = cls._chunk_size(len(matrix))
+        rows = numpy.arange(len(matrix))
+        for start in range(0, len(labs), step):
+            for distances in metric(labs[start:start + step], matrix):
+                found.append(cls._sorted_hits(rows, distances, max_delta_e))
+        return found
+
+    @staticmethod
+    def _sorted_hits(
+        rows: numpy.ndarray,
+        distances: numpy.ndarray,
+        max_delta_e: float
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """Keep the rows within ``max_delta_e`` and sort them by distance."""
+        hit = distances <= max_delta_e
+        rows = rows[hit]
+        distances = distances[hit]
+        order = numpy.lexsort((rows, distances))
+        return rows[order], distances[order]
+
+    @staticmethod
+    def _chunk_size(width: int) -> int:
+        """Get how many colors to compare at once against ``width`` members."""
+        return max(1, 2 ** 20 // max(1, width))
+
+    @staticmethod
+    def _lab_array(
+        colors: typing.Union[
+            'ColorArray',
+            typing.Iterable[typing.Union['ColorGroup', 'BaseColor', 'RGB24']]
+        ]
+    ) -> numpy.ndarray:
+        """
+        Get an ``(N, 3)`` array of the Lab values of the given colors.
+
+        When a :py:func:`convert.lab_cube` is installed, the values of
+        exactly 8-bit sRGB colors are read from it.
+        """
+        cube = convert.lab_cube() is not None
+        if isinstance(colors, ColorArray):
+            if not cube or not issubclass(colors.space, sRGBColor):
+                return colors.lab.values
+            packed, pending = ColorGroup._packed_values(colors)
+            labs = numpy.empty((len(colors), 3))
+            labs[~pending] = convert.rgb8_to_lab(
+                convert.unpack_rgb(packed[~pending])
+            )
+            if pending.any():
+                labs[pending] = colors[pending].lab.values
+            return labs
+
+        packed = []
+        packed_rows = []
+        values = []
+        value_rows = []
+        for row, color in enumerate(colors):
+            if isinstance(color, ColorGroup):
+                color = color._value_
+            value = ColorGroup._packed_value(color)
+            if value is not None:
+                packed.append(value)
+                packed_rows.append(row)
+                continue
+            values.append(color._color)  # type: ignore
+            value_rows.append(row)
+
+        labs = numpy.empty((len(packed) + len(values), 3))
+        if packed:
+            labs[packed_rows] = convert.rgb8_to_lab(convert.unpack_rgb(packed))
+        if values:
+            labs[value_rows] = convert.convert_colors(
+                values,
+                colormath.color_objects.LabColor
+            )
+        return labs
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _members(cls) -> typing.Tuple['ColorGroup', ...]:
+        """Get the members of the group in definition order."""
+        return tuple(cls)
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _value_members(
+        cls
+    ) -> typing.Dict[int, typing.Tuple['ColorGroup', ...]]:
+        """Get the members with each 8-bit sRGB color, in order."""
+        members: typing.Dict[int, typing.List['ColorGroup']] = {}
+        for member in cls:
+            packed = cls._packed_value(member)
+            if packed is not None:
+                members.setdefault(packed, []).append(member)
+        return {value: tuple(found) for value, found in members.items()}
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _member_index(cls) -> typing.Dict['ColorGroup', int]:
+        """Get the position in ``list(cls)`` of each member."""
+        return {member: position for position, member in enumerate(cls)}
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _positions(cls) -> numpy.ndarray:
+        """Get the positions in ``list(cls)`` of members with a color."""
+        return numpy.array(
+            [
+                position
+                for position, member in enumerate(cls)
+                if member._value_ is not None
+            ],
+            dtype=numpy.intp
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def spatial_index(cls) -> index.KDTree:
+        """
+        Get the k-d tree over the Lab values of the group's members.
+
+        The tree is built the first time it is needed. Its point indexes are
+        rows of the group's Lab matrix, not positions in ``list(cls)``.
+        """
+        return index.KDTree(cls._lab_matrix())
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _rgb_matrix(cls) -> numpy.ndarray:
+        """Get the 8-bit sRGB values of the group's members as ``(M, 3)``."""
+        members = cls._members()
+        matrix = numpy.array(
+            [
+                members[position]._value_.value_tuple
+                for position in cls._positions()
+            ],
+            dtype=numpy.uint8
+        ).reshape(-1, 3)
+        matrix.flags.writeable = False
+        return matrix
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _lab_matrix(cls) -> numpy.ndarray:
+        """Get the Lab values of the group's members as an ``(M, 3)`` array."""
+        members = cls._members()
+        packed = [
+            cls._packed_value(members[position])
+            for position in cls._positions()
+        ]
+        if None not in packed:
+            matrix = convert.srgb_to_lab(convert.unpack_rgb(packed) / 255)
+        else:
+            matrix = convert.convert_colors(
+                (
+                    members[position].value._color
+                    for position in cls._positions()
+                ),
+                colormath.color_objects.LabColor
+            )
+        matrix.flags.writeable = False
+        return matrix
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _lab_rows(cls) -> typing.List[typing.Tuple[float, float, float]]:
+        """Get the rows of :py:meth:`_lab_matrix` as tuples of floats."""
+        return [tuple(row) for row in cls._lab_matrix().tolist()]
 
     @property
     def red(self) -> int:
         """Get the red color level (0-255)."""
-        return self.value.red
+        return self._value_.red
 
     @property
     def r(self) -> int:
         """Get the red color level (0-255)."""
-        return self.value.r
+        return self._value_.r
 
     @property
     def green(self) -> int:
         """Get the green color level (0-255)."""
-        return self.value.green
+        return self._value_.green
 
     @property
     def g(self) -> int:
         """Get the green color level (0-255)."""
-        return self.value.g
+        return self._value_.g
 
     @property
     def blue(self) -> int:
         """Get the blue color level (0-255)."""
-        return self.value.blue
+        return self._value_.blue
 
     @property
     def b(self) -> int:
         """Get the blue color level (0-255)."""
-        return self.value.b
+        return self._value_.b
 
     @property
     def hex(self) -> str:
         """Get the html 6-digit hex code (#rrggbb)."""
-        return self.value.hex
+        return self._value_.hex
 
     @property
     def value_tuple(self) -> typing.Tuple[int, int, int]:
         """Get the tuple containing (red, green, blue)."""
-        return self.value.value_tuple
+        return self._value_.value_tuple
@@ -0,0 +1,237 @@
+"""Bounded, thread-safe caches for colors and color group search results."""
+
+import collections
+import threading
+import typing
+import weakref
+
+POLICIES = ('lru', 'fifo')
+"""Supported eviction policies."""
+
+
+class CacheInfo(typing.NamedTuple):
+    """Statistics of a :py:class:`ResultCache`, like ``functools`` reports."""
+
+    hits: int
+    misses: int
+    maxsize: typing.Optional[int]
+    currsize: int
+    policy: str
+
+
+class ResultCache:
+    """
+    Cache mapping hashable keys to computed results.
+
+    Unlike :py:func:`functools.lru_cache`, the keys are chosen by the caller
+    (color groups use the color's value rather than the color object), and
+    the size and eviction policy can be changed per cache:
+
+    * ``'lru'`` evicts the least recently used entry.
+    * ``'fifo'`` evicts the oldest entry, so hits never reorder the cache.
+
+    All operations hold a lock, so a cache can be shared between threads.
+    Results are computed outside the lock; two threads missing on the same
+    key at once both compute it, and the later result is kept.
+    """
+
+    def __init__(
+        self,
+        maxsize: typing.Optional[int] = 4096,
+        policy: str = 'lru'
+    ) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+            maxsize: Most entries kept, ``None`` for no limit, or 0 to
+                disable caching.
+            policy: Eviction policy, one of :py:data:`POLICIES`.
+
+        Raises:
+            ValueError: The size is negative or the policy is unknown.
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f'cache size must not be negative, not {maxsize}')
+        if policy not in POLICIES:
+            raise ValueError(
+                f'unknown cache policy {policy!r}; expected one of '
+                f'{", ".join(POLICIES)}'
+            )
+        self.maxsize = maxsize
+        self.policy = policy
+        self.__data: typing.OrderedDict = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self) -> int:
+        """Get the number of cached entries."""
+        return len(self.__data)
+
+    def __repr__(self) -> str:
+        """Get the string representation of the ResultCache instance."""
+        return (
+            f'<ResultCache(maxsize={self.maxsize!r}, '
+            f'policy={self.policy!r})>'
+        )
+
+    def lookup(
+        self,
+        key: typing.Hashable,
+        compute: typing.Callable[[], typing.Any]
+    ) -> typing.Any:
+        """Get the cached result for ``key``, computing it on a miss."""
+        with self.__lock:
+            try:
+                result = self.__data[key]
+            except KeyError:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                if self.policy == 'lru':
+                    self.__data.move_to_end(key)
+                return result
+
+        result = compute()
+        if self.maxsize != 0:
+            with self.__lock:
+                self.__data[key] = result
+                self.__data.move_to_end(key)
+                if self.maxsize is not None:
+                    while len(self.__data) > self.maxsize:
+                        self.__data.popitem(last=False)
+        return result
+
+    def info(self) -> CacheInfo:
+        """Get the cache statistics."""
+        with self.__lock:
+            return CacheInfo(
+                self.__hits,
+                self.__misses,
+                self.maxsize,
+                len(self.__data),
+                self.policy
+            )
+
+    def clear(self) -> None:
+        """Remove every entry and reset the statistics."""
+        with self.__lock:
+            self.__data.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+
+class RegistryInfo(typing.NamedTuple):
+    """Statistics of an :py:class:`InstanceRegistry`."""
+
+    live: int
+    pinned: int
+    maxsize: typing.Optional[int]
+
+
+class InstanceRegistry:
+    """
+    Flyweight registry that does not keep unused instances alive.
+
+    Every registered instance is held through a weak reference, so it is
+    dropped as soon as nothing else refers to it. The ``maxsize`` most
+    recently used instances are also held strongly ("pinned"), so that
+    colors which are created, used and discarded over and over are not
+    rebuilt every time. Memory is bounded by the instances the program
+    keeps plus the pinned ones. Registered objects must support weak
+    references.
+    """
+
+    def __init__(self, maxsize: typing.Optional[int] = 1024) -> None:
+        """
+        Create an empty registry.
+
+        Args:
+            maxsize: Most instances pinned, or ``None`` to pin every
+                instance (the registry then never forgets one).
+
+        Raises:
+            ValueError: The size is negative.
+        """
+        self.__weak: weakref.WeakValueDictionary = (
+            weakref.WeakValueDictionary()
+        )
+        self.__pinned: typing.OrderedDict = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.maxsize = maxsize
+
+    @property
+    def maxsize(self) -> typing.Optional[int]:
+        """Get the most instances kept alive by the registry itself."""
+        return self.__maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: typing.Optional[int]) -> None:
+        """Change the most instances pinned, unpinning the oldest ones."""
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(
+                f'registry size must not be negative, not {maxsize}'
+            )
+        with self.__lock:
+            self.__maxsize = maxsize
+            self.__trim()
+
+    def __len__(self) -> int:
+        """Get the number of live registered instances."""
+        return len(self.__weak)
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        """Check whether a live instance is registered under ``key``."""
+        return key in self.__weak
+
+    def __getitem__(self, key: typing.Hashable) -> typing.Any:
+        """Get the instance registered under ``key`` and mark it used."""
+        instance = self.__weak[key]
+        with self.__lock:
+            self.__pin(key, instance)
+        return instance
+
+    def __setitem__(self, key: typing.Hashable, instance: typing.Any) -> None:
+        """Register an instance under ``key``."""
+        with self.__lock:
+            self.__weak[key] = instance
+            self.__pin(key, instance)
+
+    def __repr__(self) -> str:
+        """Get the string representation of the InstanceRegistry instance."""
+        return f'<InstanceRegistry(maxsize={self.maxsize!r})>'
+
+    def info(self) -> RegistryInfo:
+        """Get the registry statistics."""
+        with self.__lock:
+            return RegistryInfo(
+                len(self.__weak),
+                len(self.__pinned),
+                self.__maxsize
+            )
+
+    def clear(self) -> None:
+        """
+        Forget every instance.
+
+        Instances still referenced elsewhere keep working, but constructing
+        an equal color afterwards gives a new instance.
+        """
+        with self.__lock:
+            self.__pinned.clear()
+            self.__weak.clear()
+
+    def __pin(self, key: typing.Hashable, instance: typing.Any) -> None:
+        """Hold ``instance`` strongly as the most recently used one."""
+        if self.__maxsize == 0:
+            return
+        self.__pinned[key] = instance
+        self.__pinned.move_to_end(key)
+        self.__trim()
+
+    def __trim(self) -> None:
+        """Unpin the least recently used instances over the size limit."""
+        if self.__maxsize is not None:
+            while len(self.__pinned) > self.__maxsize:
+                self.__pinned.popitem(last=False)
@@ -0,0 +1,1178 @@
+"""
+Vectorized conversions between color spaces.
+
+Every kernel here takes an ``(N, k)`` array of colors (``k`` channels, as
+ordered by the colormath class's ``VALUES``) and returns the converted
+``(N, k')`` array. They follow :py:mod:`colormath.color_conversions`
+formula for formula, including its illuminant handling, so results agree
+with colormath to within floating point rounding.
+
+:py:func:`convert` chains the kernels along the same path colormath would
+take between two color classes, and :py:func:`convert_color` does so for a
+single colormath object, as a drop-in replacement for
+:py:func:`colormath.color_conversions.convert_color`.
+"""
+
+import collections
+import functools
+import typing
+
+import numpy
+
+import colormath.chromatic_adaptation
+import colormath.color_constants
+import colormath.color_objects
+
+_objects = colormath.color_objects
+
+
+def unpack_rgb(packed: numpy.ndarray) -> numpy.ndarray:
+    """Split packed ``0xRRGGBB`` integers into an ``(N, 3)`` uint8 array."""
+    packed = numpy.asarray(packed, dtype=numpy.uint32).reshape(-1)
+    return numpy.stack(
+        [(packed >> 16) & 0xff, (packed >> 8) & 0xff, packed & 0xff],
+        axis=1
+    ).astype(numpy.uint8)
+
+
+def pack_rgb(rgb: numpy.ndarray) -> numpy.ndarray:
+    """Pack an ``(N, 3)`` array of 8-bit channels into ``0xRRGGBB`` ints."""
+    rgb = numpy.asarray(rgb, dtype=numpy.uint32).reshape(-1, 3)
+    return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+
+class RowError(ValueError):
+    """
+    Some rows of a batch are invalid.
+
+    All the invalid rows are collected rather than stopping at the first
+    one: :py:attr:`rows` holds their indexes in ascending order. When a
+    batch of colors was being parsed, :py:attr:`packed` holds the values
+    of the valid rows (and 0 for the invalid ones).
+    """
+
+    def __init__(
+        self,
+        message: str,
+        rows: numpy.ndarray,
+        packed: typing.Optional[numpy.ndarray] = None
+    ) -> None:
+        """Create the error for the given invalid rows."""
+        shown = ', '.join(str(row) for row in rows[:10])
+        if len(rows) > 10:
+            shown += ', ...'
+        super().__init__(f'{message} at rows {shown} ({len(rows)} in total)')
+        self.rows = rows
+        self.packed = packed
+
+
+_HEX_DIGITS = numpy.full(256, -1, dtype=numpy.int32)
+_HEX_DIGITS[numpy.frombuffer(b'0123456789', dtype=numpy.uint8)] = range(10)
+_HEX_DIGITS[numpy.frombuffer(b'abcdef', dtype=numpy.uint8)] = range(10, 16)
+_HEX_DIGITS[numpy.frombuffer(b'ABCDEF', dtype=numpy.uint8)] = range(10, 16)
+"""Value of each ASCII character as a hex digit, or -1."""
+
+
+def parse_hex(
+    codes: typing.Union[typing.Sequence[str], bytes]
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Parse many ``#rrggbb`` or ``#rgb`` hex codes into packed ``0xRRGGBB``.
+
+    Like :py:meth:`colormath.color_objects.sRGBColor.new_from_rgb_hex`,
+    surrounding whitespace and the ``#`` are optional, and digits may be
+    upper or lower case. As in CSS, each digit of a 3-digit code stands for
+    itself repeated (``#f80`` is ``#ff8800``).
+
+    Args:
+        codes: The hex codes, as strings or as a bytes buffer with one code
+            per line.
+
+    Returns:
+        The packed values (0 for invalid codes), and a mask of the rows
+        whose code is invalid.
+    """
+    if isinstance(codes, (bytes, bytearray, memoryview)):
+        codes = numpy.array(bytes(codes).splitlines(), dtype=bytes)
+    else:
+        codes = numpy.array(
+            [code if isinstance(code, str) else '' for code in codes],
+            dtype=str
+        )
+    if not len(codes) or not codes.itemsize:
+        return (
+            numpy.zeros(len(codes), dtype=numpy.uint32),
+            numpy.ones(len(codes), dtype=bool)
+        )
+
+    text = codes.dtype.kind == 'U'
+    codes = numpy.char.strip(codes)
+    hashed = numpy.char.startswith(codes, '#' if text else b'#')
+    lengths = numpy.char.str_len(codes) - hashed
+
+    # Fixed-width strings are arrays of code points (or bytes), padded with
+    # zeros, so the six digits after the optional '#' can be gathered, or
+    # each of three twice.
+    char_type = numpy.uint32 if text else numpy.uint8
+    width = codes.itemsize // numpy.dtype(char_type).itemsize
+    chars = codes.view(char_type).reshape(len(codes), width)
+    chars = numpy.pad(chars, ((0, 0), (0, max(0, 7 - width))))
+    short = lengths == 3
+    chars = numpy.take_along_axis(
+        chars,
+        hashed[:, None] + numpy.where(
+            short[:, None],
+            numpy.arange(6) // 2,
+            numpy.arange(6)
+        ),
+        axis=1
+    )
+    digits = _HEX_DIGITS[numpy.minimum(chars, 255)]
+    digits[chars > 255] = -1
+
+    invalid = ((lengths != 6) & ~short) | (digits < 0).any(axis=1)
+    digits[invalid] = 0
+    packed = (digits << numpy.arange(20, -1, -4)).sum(axis=1)
+    return packed.astype(numpy.uint32), invalid
+
+
+def format_hex(packed: numpy.ndarray) -> numpy.ndarray:
+    """
+    Format packed ``0xRRGGBB`` values as ``#rrggbb`` hex codes.
+
+    Returns:
+        Array of the hex codes as strings.
+
+    Raises:
+        RowError: Some values are not 24-bit integers.
+    """
+    packed = numpy.asarray(packed).reshape(-1)
+    if packed.dtype.kind not in 'ui':
+        invalid = packed != numpy.floor(packed)
+        if invalid.any():
+            raise RowError('not integers', numpy.flatnonzero(invalid))
+    invalid = (packed < 0) | (packed > 0xffffff)
+    if invalid.any():
+        raise RowError('not 24-bit RGB values', numpy.flatnonzero(invalid))
+
+    packed = packed.astype(numpy.uint32)
+    chars = numpy.empty((len(packed), 7), dtype=numpy.uint32)
+    chars[:, 0] = ord('#')
+    nibbles = (packed[:, None] >> numpy.arange(20, -1, -4, dtype=numpy.uint32))
+    chars[:, 1:] = numpy.frombuffer(
+        b'0123456789abcdef',
+        dtype=numpy.uint8
+    )[nibbles & 0xf]
+    return chars.view('U7').reshape(-1)
+
+
+def _channels(values: numpy.ndarray, width: int = 3) -> numpy.ndarray:
+    """Get values as an ``(N, width)`` float array."""
+    return numpy.asarray(values, dtype=float).reshape(-1, width)
+
+
+def _columns(*columns: numpy.ndarray) -> numpy.ndarray:
+    """Join equally long 1-D arrays (or scalars) as columns of a 2-D one."""
+    result = numpy.empty((len(columns[0]), len(columns)))
+    for position, column in enumerate(columns):
+        result[:, position] = column
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def _white(illuminant: str, observer: str) -> numpy.ndarray:
+    """Get the XYZ reference white of an illuminant."""
+    white = numpy.array(
+        colormath.color_constants.ILLUMINANTS[observer][illuminant.lower()]
+    )
+    white.flags.writeable = False
+    return white
+
+
+def rgb_to_linear(
+    rgb: numpy.ndarray,
+    space: type = _objects.sRGBColor
+) -> numpy.ndarray:
+    """
+    Remove the companding of RGB values in the range 0-1.
+
+    ``space`` is the colormath RGB class: sRGB uses its piecewise curve,
+    other spaces their ``rgb_gamma``.
+    """
+    rgb = _channels(rgb)
+    if issubclass(space, _objects.sRGBColor):
+        return numpy.where(
+            rgb <= 0.04045,
+            rgb / 12.92,
+            numpy.power((rgb + 0.055) / 1.055, 2.4)
+        )
+    return numpy.power(rgb, space.rgb_gamma)
+
+
+def linear_to_rgb(
+    linear: numpy.ndarray,
+    space: type = _objects.sRGBColor
+) -> numpy.ndarray:
+    """Apply the companding of an RGB space to linear values."""
+    linear = _channels(linear)
+    if space is _objects.sRGBColor:
+        return numpy.where(
+            linear <= 0.0031308,
+            linear * 12.92,
+            1.055 * numpy.power(linear, 1 / 2.4) - 0.055
+        )
+    return numpy.power(linear, 1 / space.rgb_gamma)
+
+
+def rgb_to_xyz(
+    rgb: numpy.ndarray,
+    space: type = _objects.sRGBColor
+) -> numpy.ndarray:
+    """
+    Convert RGB values in the range 0-1 to XYZ.
+
+    The XYZ values are relative to the space's native illuminant, and
+    negative results are clamped to 0 like colormath does.
+    """
+    matrix = space.conversion_matrices['rgb_to_xyz']
+    return numpy.maximum(rgb_to_linear(rgb, space) @ matrix.T, 0.0)
+
+
+def xyz_to_rgb(
+    xyz: numpy.ndarray,
+    space: type = _objects.sRGBColor,
+    illuminant: str = 'd65'
+) -> numpy.ndarray:
+    """
+    Convert XYZ values to RGB values in the range 0-1.
+
+    XYZ values relative to another illuminant than the space's native one
+    are first adapted to it with the Bradford transform.
+    """
+    xyz = _channels(xyz)
+    if illuminant != space.native_illuminant:
+        xyz = adapt_xyz(xyz, illuminant, space.native_illuminant)
+    matrix = space.conversion_matrices['xyz_to_rgb']
+    return linear_to_rgb(numpy.maximum(xyz @ matrix.T, 0.0), space)
+
+
+def adapt_xyz(
+    xyz: numpy.ndarray,
+    source: str,
+    target: str,
+    observer: str = '2',
+    adaptation: str = 'bradford'
+) -> numpy.ndarray:
+    """Chromatically adapt XYZ values from one illuminant to another."""
+    matrix = _adaptation_matrix(
+        source.lower(),
+        target.lower(),
+        observer,
+        adaptation.lower()
+    )
+    return _channels(xyz) @ matrix.T
+
+
+@functools.lru_cache(maxsize=None)
+def _adaptation_matrix(
+    source: str,
+    target: str,
+    observer: str,
+    adaptation: str
+) -> numpy.ndarray:
+    """Get the matrix adapting XYZ values between two illuminants."""
+    return colormath.chromatic_adaptation._get_adaptation_matrix(
+        source,
+        target,
+        observer,
+        adaptation
+    )
+
+
+def xyz_to_lab(
+    xyz: numpy.ndarray,
+    illuminant: str = 'd65',
+    observer: str = '2'
+) -> numpy.ndarray:
+    """
+    Convert XYZ values to CIE Lab relative to the given reference white.
+
+    This matches :py:func:`colormath.color_conversions.XYZ_to_Lab`.
+    """
+    scaled = _lab_curve(xyz, illuminant, observer)
+    return _columns(
+        (116.0 * scaled[:, 1]) - 16.0,
+        500.0 * (scaled[:, 0] - scaled[:, 1]),
+        200.0 * (scaled[:, 1] - scaled[:, 2]),
+    )
+
+
+def _lab_curve(
+    xyz: numpy.ndarray,
+    illuminant: str,
+    observer: str
+) -> numpy.ndarray:
+    """Apply the CIE Lab companding curve to white-relative XYZ values."""
+    scaled = _channels(xyz) / _white(illuminant, observer)
+    return numpy.where(
+        scaled > colormath.color_constants.CIE_E,
+        numpy.power(numpy.maximum(scaled, 0.0), 1.0 / 3.0),
+        (7.787 * scaled) + (16.0 / 116.0)
+    )
+
+
+def lab_to_xyz(
+    lab: numpy.ndarray,
+    illuminant: str = 'd50',
+    observer: str = '2'
+) -> numpy.ndarray:
+    """Convert CIE Lab values to XYZ relative to the given reference white."""
+    lab = _channels(lab)
+    y = (lab[:, 0] + 16.0) / 116.0
+    scaled = _columns(lab[:, 1] / 500.0 + y, y, y - lab[:, 2] / 200.0)
+    cubed = numpy.power(scaled, 3)
+    scaled = numpy.where(
+        cubed > colormath.color_constants.CIE_E,
+        cubed,
+        (scaled - 16.0 / 116.0) / 7.787
+    )
+    return scaled * _white(illuminant, observer)
+
+
+def xyz_to_luv(
+    xyz: numpy.ndarray,
+    illuminant: str = 'd50',
+    observer: str = '2'
+) -> numpy.ndarray:
+    """Convert XYZ values to CIE Luv relative to the given reference white."""
+    xyz = _channels(xyz)
+    white = _white(illuminant, observer)
+    denom = xyz[:, 0] + (15.0 * xyz[:, 1]) + (3.0 * xyz[:, 2])
+    safe = numpy.where(denom == 0.0, 1.0, denom)
+    u = numpy.where(denom == 0.0, 0.0, (4.0 * xyz[:, 0]) / safe)
+    v = numpy.where(denom == 0.0, 0.0, (9.0 * xyz[:, 1]) / safe)
+
+    y = xyz[:, 1] / white[1]
+    y = numpy.where(
+        y > colormath.color_constants.CIE_E,
+        numpy.power(numpy.maximum(y, 0.0), 1.0 / 3.0),
+        (7.787 * y) + (16.0 / 116.0)
+    )
+    white_denom = white[0] + (15.0 * white[1]) + (3.0 * white[2])
+    ref_u = (4.0 * white[0]) / white_denom
+    ref_v = (9.0 * white[1]) / white_denom
+
+    lightness = (116.0 * y) - 16.0
+    return _columns(
+        lightness,
+        13.0 * lightness * (u - ref_u),
+        13.0 * lightness * (v - ref_v),
+    )
+
+
+def luv_to_xyz(
+    luv: numpy.ndarray,
+    illuminant: str = 'd50',
+    observer: str = '2'
+) -> numpy.ndarray:
+    """Convert CIE Luv values to XYZ relative to the given reference white."""
+    luv = _channels(luv)
+    white = _white(illuminant, observer)
+    lightness = luv[:, 0]
+    dark = lightness <= 0.0
+    safe = numpy.where(dark, 1.0, lightness)
+
+    white_denom = white[0] + 15.0 * white[1] + 3.0 * white[2]
+    u = luv[:, 1] / (13.0 * safe) + (4.0 * white[0]) / white_denom
+    v = luv[:, 2] / (13.0 * safe) + (9.0 * white[1]) / white_denom
+    v = numpy.where(dark, 1.0, v)
+
+    y = numpy.where(
+        lightness > colormath.color_constants.CIE_K
+        * colormath.color_constants.CIE_E,
+        numpy.power((lightness + 16.0) / 116.0, 3.0),
+        lightness / colormath.color_constants.CIE_K
+    )
+    xyz = _columns(
+        y * 9.0 * u / (4.0 * v),
+        y,
+        y * (12.0 - 3.0 * u - 20.0 * v) / (4.0 * v),
+    )
+    return numpy.where(dark[:, None], 0.0, xyz)
+
+
+def lab_to_lch(lab: numpy.ndarray) -> numpy.ndarray:
+    """
+    Convert Lab (or Luv) values to cylindrical LCH(ab) (or LCH(uv)).
+
+    Hues are in degrees, in ``(0, 360]`` like colormath gives them.
+    """
+    lab = _channels(lab)
+    hue = numpy.arctan2(lab[:, 2], lab[:, 1])
+    hue = numpy.where(
+        hue > 0,
+        (hue / numpy.pi) * 180,
+        360 - (numpy.abs(hue) / numpy.pi) * 180
+    )
+    return _columns(
+        lab[:, 0],
+        numpy.sqrt(lab[:, 1] ** 2 + lab[:, 2] ** 2),
+        hue
+    )
+
+
+def lch_to_lab(lch: numpy.ndarray) -> numpy.ndarray:
+    """Convert LCH(ab) (or LCH(uv)) values to Lab (or Luv)."""
+    lch = _channels(lch)
+    hue = numpy.radians(lch[:, 2])
+    return _columns(
+        lch[:, 0],
+        numpy.cos(hue) * lch[:, 1],
+        numpy.sin(hue) * lch[:, 1]
+    )
+
+
+def xyz_to_xyy(xyz: numpy.ndarray) -> numpy.ndarray:
+    """Convert XYZ values to CIE xyY."""
+    xyz = _channels(xyz)
+    total = xyz.sum(axis=1)
+    safe = numpy.where(total == 0.0, 1.0, total)
+    return _columns(
+        numpy.where(total == 0.0, 0.0, xyz[:, 0] / safe),
+        numpy.where(total == 0.0, 0.0, xyz[:, 1] / safe),
+        xyz[:, 1],
+    )
+
+
+def xyy_to_xyz(xyy: numpy.ndarray) -> numpy.ndarray:
+    """Convert CIE xyY values to XYZ."""
+    xyy = _channels(xyy)
+    zero = xyy[:, 1] == 0.0
+    safe = numpy.where(zero, 1.0, xyy[:, 1])
+    xyz = _columns(
+        (xyy[:, 0] * xyy[:, 2]) / safe,
+        xyy[:, 2],
+        ((1.0 - xyy[:, 0] - xyy[:, 1]) * xyy[:, 2]) / safe,
+    )
+    return numpy.where(zero[:, None], 0.0, xyz)
+
+
+def _rgb_hue(
+    rgb: numpy.ndarray,
+    low: numpy.ndarray,
+    high: numpy.ndarray
+) -> numpy.ndarray:
+    """Get the hue in degrees shared by HSV and HSL."""
+    red, green, blue = rgb.T
+    spread = numpy.where(high == low, 1.0, high - low)
+    hue = numpy.where(
+        high == green,
+        60.0 * ((blue - red) / spread) + 120,
+        60.0 * ((red - green) / spread) + 240.0
+    )
+    hue = numpy.where(
+        high == red,
+        (60.0 * ((green - blue) / spread) + 360) % 360.0,
+        hue
+    )
+    return numpy.where(high == low, 0.0, hue)
+
+
+def rgb_to_hsv(rgb: numpy.ndarray) -> numpy.ndarray:
+    """Convert RGB values in the range 0-1 to HSV (hue in degrees)."""
+    rgb = _channels(rgb)
+    high = rgb.max(axis=1)
+    low = rgb.min(axis=1)
+    safe = numpy.where(high == 0, 1.0, high)
+    return _columns(
+        _rgb_hue(rgb, low, high),
+        numpy.where(high == 0, 0.0, 1.0 - (low / safe)),
+        high,
+    )
+
+
+def rgb_to_hsl(rgb: numpy.ndarray) -> numpy.ndarray:
+    """Convert RGB values in the range 0-1 to HSL (hue in degrees)."""
+    rgb = _channels(rgb)
+    high = rgb.max(axis=1)
+    low = rgb.min(axis=1)
+    lightness = 0.5 * (high + low)
+    flat = high == low
+    lower = numpy.where(flat | (lightness == 0), 1.0, 2.0 * lightness)
+    upper = numpy.where(flat | (lightness == 1), 1.0, 2.0 - 2.0 * lightness)
+    saturation = numpy.where(
+        flat,
+        0.0,
+        numpy.where(
+            lightness <= 0.5,
+            (high - low) / lower,
+            (high - low) / upper
+        )
+    )
+    return _columns(_rgb_hue(rgb, low, high), saturation, lightness)
+
+
+_HSV_SECTORS = numpy.array([
+    [0, 1, 2],
+    [3, 0, 2],
+    [2, 0, 1],
+    [2, 3, 0],
+    [1, 2, 0],
+    [0, 2, 3],
+])
+"""Which of ``(V, t, p, q)`` each RGB channel is, per 60 degree hue sector."""
+
+
+def hsv_to_rgb(hsv: numpy.ndarray) -> numpy.ndarray:
+    """Convert HSV values (hue in degrees) to RGB in the range 0-1."""
+    hsv = _channels(hsv)
+    hue, saturation, value = hsv.T
+    floored = numpy.floor(hue)
+    sector = numpy.trunc(floored / 60).astype(int) % 6
+    fraction = (hue / 60.0) - numpy.floor_divide(floored, 60)
+    p = value * (1.0 - saturation)
+    q = value * (1.0 - fraction * saturation)
+    t = value * (1.0 - (1.0 - fraction) * saturation)
+    return numpy.take_along_axis(
+        _columns(value, t, p, q),
+        _HSV_SECTORS[sector],
+        axis=1
+    )
+
+
+def hsl_to_rgb(hsl: numpy.ndarray) -> numpy.ndarray:
+    """Convert HSL values (hue in degrees) to RGB in the range 0-1."""
+    hsl = _channels(hsl)
+    hue, saturation, lightness = hsl.T
+    q = numpy.where(
+        lightness < 0.5,
+        lightness * (1.0 + saturation),
+        lightness + saturation - (lightness * saturation)
+    )
+    p = 2.0 * lightness - q
+    hue = hue / 360.0
+    channels = _columns(hue + (1.0 / 3.0), hue, hue - (1.0 / 3.0))
+    channels = numpy.where(channels < 0, channels + 1.0, channels)
+    channels = numpy.where(channels > 1, channels - 1.0, channels)
+    p = p[:, None]
+    q = q[:, None]
+    result = numpy.where(
+        channels < (2.0 / 3.0),
+        p + ((q - p) * 6.0 * ((2.0 / 3.0) - channels)),
+        p
+    )
+    result = numpy.where(channels < 0.5, q, result)
+    return numpy.where(
+        channels < (1.0 / 6.0),
+        p + ((q - p) * 6.0 * channels),
+        result
+    )
+
+
+def rgb_to_cmy(rgb: numpy.ndarray) -> numpy.ndarray:
+    """Convert RGB values in the range 0-1 to CMY."""
+    return 1.0 - _channels(rgb)
+
+
+def cmy_to_rgb(cmy: numpy.ndarray) -> numpy.ndarray:
+    """Convert CMY values to RGB in the range 0-1."""
+    return 1.0 - _channels(cmy)
+
+
+def cmy_to_cmyk(cmy: numpy.ndarray) -> numpy.ndarray:
+    """Convert CMY values to ``(N, 4)`` CMYK values."""
+    cmy = _channels(cmy)
+    black = numpy.minimum(cmy.min(axis=1), 1.0)[:, None]
+    full = black == 1
+    cmy = numpy.where(
+        full,
+        0.0,
+        (cmy - black) / numpy.where(full, 1.0, 1.0 - black)
+    )
+    return numpy.concatenate([cmy, black], axis=1)
+
+
+def cmyk_to_cmy(cmyk: numpy.ndarray) -> numpy.ndarray:
+    """Convert ``(N, 4)`` CMYK values to CMY."""
+    cmyk = _channels(cmyk, 4)
+    black = cmyk[:, 3:]
+    return cmyk[:, :3] * (1.0 - black) + black
+
+
+def xyz_to_ipt(xyz: numpy.ndarray) -> numpy.ndarray:
+    """Convert XYZ values (2 degree observer, D65) to IPT."""
+    matrices = _objects.IPTColor.conversion_matrices
+    lms = _channels(xyz) @ matrices['xyz_to_lms'].T
+    lms = numpy.sign(lms) * numpy.abs(lms) ** 0.43
+    return lms @ matrices['lms_to_ipt'].T
+
+
+def ipt_to_xyz(ipt: numpy.ndarray) -> numpy.ndarray:
+    """Convert IPT values to XYZ (2 degree observer, D65)."""
+    matrices = _objects.IPTColor.conversion_matrices
+    lms = _channels(ipt) @ numpy.linalg.inv(matrices['lms_to_ipt']).T
+    lms = numpy.sign(lms) * numpy.abs(lms) ** (1 / 0.43)
+    return lms @ numpy.linalg.inv(matrices['xyz_to_lms']).T
+
+
+def srgb_to_xyz(rgb: numpy.ndarray) -> numpy.ndarray:
+    """
+    Convert sRGB values in the range 0-1 to XYZ under the D65 illuminant.
+
+    This matches :py:func:`colormath.color_conversions.RGB_to_XYZ` for
+    :py:class:`colormath.color_objects.sRGBColor`.
+    """
+    return rgb_to_xyz(rgb, _objects.sRGBColor)
+
+
+def srgb_to_lab(rgb: numpy.ndarray) -> numpy.ndarray:
+    """
+    Convert sRGB values in the range 0-1 to CIE Lab.
+
+    Like :py:func:`colormath.color_conversions.convert_color`, the Lab
+    values keep the D65 illuminant native to sRGB.
+    """
+    return xyz_to_lab(srgb_to_xyz(rgb))
+
+
+def srgb_box_to_lab(
+    low: numpy.ndarray,
+    high: numpy.ndarray
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Get boxes in CIE Lab holding the colors of boxes of sRGB values.
+
+    Every step from sRGB to XYZ increases with every channel (the sRGB
+    matrix has no negative entries), and each of L, a and b is a difference
+    of increasing functions of X, Y and Z, so their extremes over a box are
+    found from its lowest and highest corners. The boxes are widened a
+    little for rounding, for the Lab cube's precision, and for the step of
+    about 4e-7 in the Lab curve where its linear part meets the cube root.
+
+    Args:
+        low: ``(N, 3)`` array of the lowest sRGB values (0-1) of each box.
+        high: ``(N, 3)`` array of the highest values.
+
+    Returns:
+        ``(N, 3)`` arrays of the lowest and highest Lab values.
+    """
+    curve_low = _lab_curve(srgb_to_xyz(low), 'd65', '2')
+    curve_high = _lab_curve(srgb_to_xyz(high), 'd65', '2')
+    lab_low = _columns(
+        (116.0 * curve_low[:, 1]) - 16.0,
+        500.0 * (curve_low[:, 0] - curve_high[:, 1]),
+        200.0 * (curve_low[:, 1] - curve_high[:, 2]),
+    )
+    lab_high = _columns(
+        (116.0 * curve_high[:, 1]) - 16.0,
+        500.0 * (curve_high[:, 0] - curve_low[:, 1]),
+        200.0 * (curve_high[:, 1] - curve_low[:, 2]),
+    )
+    return (
+        lab_low - (1e-3 + 1e-6 * numpy.abs(lab_low)),
+        lab_high + (1e-3 + 1e-6 * numpy.abs(lab_high))
+    )
+
+
+_lab_cube: typing.Optional[typing.Any] = None
+_lab_cube_generation = 0
+
+
+def use_lab_cube(cube: typing.Optional[typing.Any]) -> None:
+    """
+    Make :py:func:`rgb8_to_lab` look up Lab values instead of computing them.
+
+    Args:
+        cube: Object mapping an array of packed ``0xRRGGBB`` values to their
+            ``(N, 3)`` Lab values, such as a :py:class:`colors.lut.LabCube`,
+            or ``None`` to compute the values again.
+    """
+    global _lab_cube, _lab_cube_generation
+    _lab_cube = cube
+    _lab_cube_generation += 1
+
+
+def lab_cube() -> typing.Optional[typing.Any]:
+    """Get the cube installed with :py:func:`use_lab_cube`, if any."""
+    return _lab_cube
+
+
+def lab_cube_token() -> typing.Optional[int]:
+    """
+    Get a token telling apart the cubes installed over time.
+
+    It is ``None`` while no cube is installed, and otherwise changes every
+    time :py:func:`use_lab_cube` is called, so results computed with one
+    cube can be kept under it without keeping the cube itself alive.
+    """
+    return None if _lab_cube is None else _lab_cube_generation
+
+
+def rgb8_to_lab(rgb: numpy.ndarray) -> numpy.ndarray:
+    """
+    Convert an ``(N, 3)`` array of 8-bit sRGB channels to CIE Lab.
+
+    Integer channels are looked up in the installed :py:func:`lab_cube`, if
+    there is one.
+    """
+    rgb = numpy.asarray(rgb)
+    if _lab_cube is not None and rgb.dtype.kind in 'ui':
+        return _lab_cube[pack_rgb(rgb)]
+    return srgb_to_lab(rgb.astype(float) / 255)
+
+
+def rgb8_to_lab_single(packed: int) -> typing.List[float]:
+    """
+    Convert one packed ``0xRRGGBB`` value to CIE Lab in plain floats.
+
+    For a single color, numpy's overhead per call outweighs the arithmetic.
+    The values are those of :py:func:`rgb8_to_lab` (from the installed cube
+    too), except that the matrix product may round differently in the last
+    bits.
+    """
+    if _lab_cube is not None:
+        return _lab_cube[numpy.array([packed])][0].tolist()
+    linear = _srgb8_linear()
+    red, green, blue = (
+        linear[packed >> 16],
+        linear[(packed >> 8) & 0xff],
+        linear[packed & 0xff]
+    )
+    x, y, z = (
+        _lab_curve_single(
+            max(red * m_r + green * m_g + blue * m_b, 0.0) / white
+        )
+        for (m_r, m_g, m_b), white in _srgb8_to_xyz()
+    )
+    return [(116.0 * y) - 16.0, 500.0 * (x - y), 200.0 * (y - z)]
+
+
+@functools.lru_cache(maxsize=None)
+def _srgb8_linear() -> typing.Tuple[float, ...]:
+    """Get the linear values of the 256 sRGB levels, as rgb_to_linear()."""
+    levels = numpy.repeat(numpy.arange(256) / 255, 3).reshape(-1, 3)
+    return tuple(rgb_to_linear(levels)[:, 0].tolist())
+
+
+@functools.lru_cache(maxsize=None)
+def _srgb8_to_xyz() -> typing.Tuple[tuple, ...]:
+    """Get the sRGB to XYZ matrix rows, each with the D65 white value."""
+    matrix = _objects.sRGBColor.conversion_matrices['rgb_to_xyz']
+    return tuple(zip(
+        map(tuple, matrix.tolist()),
+        _white('d65', '2').tolist()
+    ))
+
+
+def _lab_curve_single(scaled: float) -> float:
+    """Apply the CIE Lab companding curve to one value, as _lab_curve()."""
+    if scaled > colormath.color_constants.CIE_E:
+        return max(scaled, 0.0) ** (1.0 / 3.0)
+    return (7.787 * scaled) + (16.0 / 116.0)
+
+
+class State(typing.NamedTuple):
+    """Colors part way through a conversion, and what they are relative to."""
+
+    values: numpy.ndarray
+    space: type
+    illuminant: typing.Optional[str]
+    observer: typing.Optional[str]
+
+
+def _lab_to_lchab(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=lab_to_lch(state.values),
+        space=_objects.LCHabColor
+    )
+
+
+def _lab_to_xyz(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=lab_to_xyz(state.values, state.illuminant, state.observer),
+        space=_objects.XYZColor
+    )
+
+
+def _luv_to_lchuv(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=lab_to_lch(state.values),
+        space=_objects.LCHuvColor
+    )
+
+
+def _luv_to_xyz(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=luv_to_xyz(state.values, state.illuminant, state.observer),
+        space=_objects.XYZColor
+    )
+
+
+def _lchab_to_lab(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=lch_to_lab(state.values),
+        space=_objects.LabColor
+    )
+
+
+def _lchuv_to_luv(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=lch_to_lab(state.values),
+        space=_objects.LuvColor
+    )
+
+
+def _xyy_to_xyz(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=xyy_to_xyz(state.values),
+        space=_objects.XYZColor
+    )
+
+
+def _xyz_to_xyy(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=xyz_to_xyy(state.values),
+        space=_objects.xyYColor
+    )
+
+
+def _xyz_to_luv(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=xyz_to_luv(state.values, state.illuminant, state.observer),
+        space=_objects.LuvColor
+    )
+
+
+def _xyz_to_lab(state: State, target_rgb: type) -> State:
+    return state._replace(
+        values=xyz_to_lab(state.values, state.illuminant, state.observer),
+        space=_objects.LabColor
+    )
+
+
+def _xyz_to_rgb(state: State, target_rgb: type) -> State:
+    return State(
+        xyz_to_rgb(state.values, target_rgb, state.illuminant),
+        target_rgb,
+        None,
+        None
+    )
+
+
+def _rgb_to_xyz(state: State, target_rgb: type) -> State:
+    return State(
+        rgb_to_xyz(state.values, state.space),
+        _objects.XYZColor,
+        state.space.native_illuminant,
+        '2'
+    )
+
+
+def _rgb_to_hsv(state: State, target_rgb: type) -> State:
+    return State(rgb_to_hsv(state.values), _objects.HSVColor, None, None)
+
+
+def _rgb_to_hsl(state: State, target_rgb: type) -> State:
+    return State(rgb_to_hsl(state.values), _objects.HSLColor, None, None)
+
+
+def _hsv_to_rgb(state: State, target_rgb: type) -> State:
+    return State(hsv_to_rgb(state.values), target_rgb, None, None)
+
+
+def _hsl_to_rgb(state: State, target_rgb: type) -> State:
+    return State(hsl_to_rgb(state.values), target_rgb, None, None)
+
+
+def _rgb_to_cmy(state: State, target_rgb: type) -> State:
+    return State(rgb_to_cmy(state.values), _objects.CMYColor, None, None)
+
+
+def _cmy_to_rgb(state: State, target_rgb: type) -> State:
+    return State(cmy_to_rgb(state.values), target_rgb, None, None)
+
+
+def _cmy_to_cmyk(state: State, target_rgb: type) -> State:
+    return State(cmy_to_cmyk(state.values), _objects.CMYKColor, None, None)
+
+
+def _cmyk_to_cmy(state: State, target_rgb: type) -> State:
+    return State(cmyk_to_cmy(state.values), _objects.CMYColor, None, None)
+
+
+def _xyz_to_ipt(state: State, target_rgb: type) -> State:
+    if state.illuminant != 'd65' or state.observer != '2':
+        raise ValueError(
+            'XYZColor for XYZ->IPT conversion needs to be D65 adapted.'
+        )
+    return State(xyz_to_ipt(state.values), _objects.IPTColor, None, None)
+
+
+def _ipt_to_xyz(state: State, target_rgb: type) -> State:
+    return State(ipt_to_xyz(state.values), _objects.XYZColor, 'd65', '2')
+
+
+STEPS: typing.Dict[str, typing.Callable[[State, type], State]] = {
+    'Lab_to_LCHab': _lab_to_lchab,
+    'Lab_to_XYZ': _lab_to_xyz,
+    'Luv_to_LCHuv': _luv_to_lchuv,
+    'Luv_to_XYZ': _luv_to_xyz,
+    'LCHab_to_Lab': _lchab_to_lab,
+    'LCHuv_to_Luv': _lchuv_to_luv,
+    'xyY_to_XYZ': _xyy_to_xyz,
+    'XYZ_to_xyY': _xyz_to_xyy,
+    'XYZ_to_Luv': _xyz_to_luv,
+    'XYZ_to_Lab': _xyz_to_lab,
+    'XYZ_to_RGB': _xyz_to_rgb,
+    'RGB_to_XYZ': _rgb_to_xyz,
+    'RGB_to_HSV': _rgb_to_hsv,
+    'RGB_to_HSL': _rgb_to_hsl,
+    'HSV_to_RGB': _hsv_to_rgb,
+    'HSL_to_RGB': _hsl_to_rgb,
+    'RGB_to_CMY': _rgb_to_cmy,
+    'CMY_to_RGB': _cmy_to_rgb,
+    'CMY_to_CMYK': _cmy_to_cmyk,
+    'CMYK_to_CMY': _cmyk_to_cmy,
+    'XYZ_to_IPT': _xyz_to_ipt,
+    'IPT_to_XYZ': _ipt_to_xyz,
+}
+"""Kernel steps, named after the colormath conversion functions."""
+
+
+def node(space: type) -> type:
+    """
+    Get the node of a colormath class in the conversion graph.
+
+    All RGB classes share one node, like in colormath: the RGB class to
+    convert to or through is chosen by :py:func:`target_rgb` instead.
+    """
+    if issubclass(space, _objects.BaseRGBColor):
+        return _objects.BaseRGBColor
+    return space
+
+
+def _step_space(name: str) -> type:
+    """Get the graph node named in a step name, such as ``'Lab'``."""
+    if name == 'RGB':
+        return _objects.BaseRGBColor
+    return getattr(_objects, f'{name}Color')
+
+
+EDGES: typing.Dict[type, typing.Dict[type, str]] = {}
+"""Direct conversions: the step from each graph node to each neighbour."""
+
+for _step in STEPS:
+    _source, _target = _step.split('_to_')
+    EDGES.setdefault(_step_space(_source), {})[_step_space(_target)] = _step
+del _step, _source, _target
+
+
+@functools.lru_cache(maxsize=None)
+def path(source: type, target: type) -> typing.Tuple[str, ...]:
+    """
+    Get the names of the cheapest chain of steps from one class to another.
+
+    The chain is planned once per pair of classes, by a breadth-first
+    search of :py:data:`EDGES`, so it has the fewest steps. The graph is a
+    tree, so this is also the chain colormath takes.
+
+    Raises:
+        ValueError: There is no conversion between the classes.
+    """
+    source = node(source)
+    target = node(target)
+    previous: typing.Dict[type, typing.Optional[type]] = {source: None}
+    queue = collections.deque([source])
+    while queue and target not in previous:
+        current = queue.popleft()
+        for neighbour in EDGES.get(current, {}):
+            if neighbour not in previous:
+                previous[neighbour] = current
+                queue.append(neighbour)
+    if target not in previous:
+        raise ValueError(
+            f'no conversion from {source.__name__} to {target.__name__}'
+        )
+
+    steps = []
+    while previous[target] is not None:
+        steps.append(EDGES[previous[target]][target])
+        target = previous[target]
+    return tuple(reversed(steps))
+
+
+@functools.lru_cache(maxsize=None)
+def chain(source: type, target: type) -> typing.Callable[[State, type], State]:
+    """
+    Get the conversion from one class to another as one function.
+
+    The function is composed once per pair of classes from the steps of
+    :py:func:`path`, and takes the state to convert and the RGB class to
+    convert through (see :py:func:`target_rgb`).
+    """
+    steps = tuple(STEPS[name] for name in path(source, target))
+
+    def run(state: State, rgb: type) -> State:
+        for step in steps:
+            state = step(state, rgb)
+        return state
+
+    return run
+
+
+@functools.lru_cache(maxsize=None)
+def intermediates(
+    source: type,
+    target: type,
+    through_rgb: typing.Optional[type] = None
+) -> typing.Tuple[type, ...]:
+    """
+    Get the classes a conversion passes through, in order.
+
+    The source and target are not included, and the RGB node is resolved to
+    the class :py:func:`target_rgb` picks. A color already converted to one
+    of these classes (from the same source) can be converted to the target
+    from there with the same result.
+    """
+    rgb = target_rgb(target, through_rgb)
+    spaces = []
+    for step in path(source, target)[:-1]:
+        space = _step_space(step.split('_to_')[1])
+        spaces.append(rgb if space is _objects.BaseRGBColor else space)
+    return tuple(spaces)
+
+
+def target_rgb(
+    target: type,
+    through_rgb: typing.Optional[type] = None
+) -> type:
+    """
+    Get the RGB class a conversion to ``target`` passes through.
+
+    Like colormath, this is ``target`` itself when it is an RGB class other
+    than sRGB, otherwise the colors' ``_through_rgb_type`` or sRGB.
+    """
+    if (
+        issubclass(target, _objects.BaseRGBColor)
+        and target is not _objects.sRGBColor
+    ):
+        return target
+    return through_rgb or _objects.sRGBColor
+
+
+def convert(
+    values: numpy.ndarray,
+    source: type,
+    target: type,
+    illuminant: typing.Optional[str] = None,
+    observer: typing.Optional[str] = None,
+    through_rgb: typing.Optional[type] = None
+) -> State:
+    """
+    Convert an array of colors between two colormath color classes.
+
+    Args:
+        values: ``(N, k)`` array of colors of the ``source`` class.
+        source: Colormath class of the colors.
+        target: Colormath class to convert to.
+        illuminant: Illuminant of the colors, for classes that have one.
+        observer: Observer angle of the colors, for classes that have one.
+        through_rgb: The colors' ``_through_rgb_type``, see
+            :py:func:`target_rgb`.
+
+    Returns:
+        The converted values and what they are relative to. Conversions
+        between RGB classes have no steps, so like colormath they give the
+        values unchanged, still of the ``source`` class.
+    """
+    width = len(source.VALUES)
+    state = State(_channels(values, width), source, illuminant, observer)
+    return chain(source, target)(state, target_rgb(target, through_rgb))
+
+
+def convert_color(
+    color: _objects.ColorBase,
+    target: type,
+    through_rgb: typing.Optional[type] = None
+) -> _objects.ColorBase:
+    """
+    Convert a colormath color to another colormath class using the kernels.
+
+    This gives the same result as
+    :py:func:`colormath.color_conversions.convert_color` with its default
+    options, including returning ``color`` itself (marked with the target
+    RGB class) when converting between RGB spaces.
+
+    Args:
+        color: The color to convert.
+        target: Colormath class to convert to.
+        through_rgb: The ``_through_rgb_type`` to use instead of the
+            color's own, when ``color`` is one of the
+            :py:func:`intermediates` of a conversion from another color.
+    """
+    if path(type(color), target):
+        state = convert(
+            [color.get_value_tuple()],
+            type(color),
+            target,
+            getattr(color, 'illuminant', None),
+            getattr(color, 'observer', None),
+            through_rgb or color._through_rgb_type
+        )
+        values = state.values[0].tolist()
+        if issubclass(state.space, _objects.IlluminantMixin):
+            color = state.space(
+                *values,
+                observer=state.observer,
+                illuminant=state.illuminant
+            )
+        else:
+            color = state.space(*values)
+
+    if (
+        issubclass(target, _objects.BaseRGBColor)
+        and target is not _objects.sRGBColor
+    ):
+        color._through_rgb_type = target
+    return color
+
+
+def convert_colors(
+    colors: typing.Iterable[_objects.ColorBase],
+    target: type
+) -> numpy.ndarray:
+    """
+    Convert many colormath colors to another colormath class at once.
+
+    Colors sharing a class, illuminant, observer and RGB space to convert
+    through are converted together by the kernels, so this gives the values
+    :py:func:`convert_color` would give for each color, without the
+    per-color overhead.
+
+    Returns:
+        ``(N, k)`` array of the converted values, in the order given.
+    """
+    colors = list(colors)
+    batches: typing.Dict[tuple, typing.List[int]] = {}
+    for row, color in enumerate(colors):
+        batches.setdefault(
+            (
+                type(color),
+                getattr(color, 'illuminant', None),
+                getattr(color, 'observer', None),
+                color._through_rgb_type,
+            ),
+            []
+        ).append(row)
+
+    result = numpy.empty((len(colors), len(target.VALUES)))
+    for (source, illuminant, observer, through_rgb), rows in batches.items():
+        result[rows] = convert(
+            [colors[row].get_value_tuple() for row in rows],
+            source,
+            target,
+            illuminant,
+            observer,
+            through_rgb
+        ).values
+    return result
@@ -92,7 +92,6 @@ class Crayola(base.ColorGroup):
     ForestGreen            = base.RGBColor( 95, 167, 119)
     DarkGreen              = base.RGBColor( 95, 167, 119)
     SeaGreen               = base.RGBColor(147, 223, 184)
-    LightGreen             = base.RGBColor(147, 223, 184)
     Shamrock               = base.RGBColor( 51, 204, 153)
     MountainMeadow         = base.RGBColor( 26, 179, 133)
     JungleGreen            = base.RGBColor( 41, 171, 135)
@@ -113,7 +112,6 @@ class Crayola(base.ColorGroup):
     SkyBlue                = base.RGBColor(118, 215, 234)
     MiddleBlue             = base.RGBColor(126, 212, 230)
     BlueGreen              = base.RGBColor(  0, 149, 183)
-    MiddleBlueGreen        = base.RGBColor(  0, 149, 183)
     PacificBlue            = base.RGBColor(  0, 157, 196)
     Cerulean               = base.RGBColor(  2, 164, 211)
     MaximumBlue            = base.RGBColor( 71, 171, 204)
@@ -164,7 +162,6 @@ class Crayola(base.ColorGroup):
     PurpleMountainMajesty  = base.RGBColor(214, 174, 221)
     Fuchsia                = base.RGBColor(193,  84, 193)
     PinkFlamingo           = base.RGBColor(252, 116, 253)
-    Violet                 = base.RGBColor(115,  46, 108)
     VioletI                = base.RGBColor(115,  46, 108)
     Purple                 = base.RGBColor(115,  46, 108)
     BrilliantRose          = base.RGBColor(230, 103, 206)
@@ -226,7 +223,6 @@ class Crayola(base.ColorGroup):
     Almond                 = base.RGBColor(238, 217, 196)
     RawUmber               = base.RGBColor(102,  82,  51)
     Shadow                 = base.RGBColor(131, 112,  80)
-    RawSienna              = base.RGBColor(230, 188,  92)
     RawSiennaI             = base.RGBColor(230, 188,  92)
     Timberwolf             = base.RGBColor(217, 214, 207)
     Gold                   = base.RGBColor(146, 146, 110)
@@ -352,7 +348,6 @@ class Crayola(base.ColorGroup):
     BubbleBath        = base.RGBColor(252, 128, 165)
     Earthworm         = base.RGBColor(198,  45,  66)
     FlowerShop        = base.RGBColor(201, 160, 220)
-    FreshAir          = base.RGBColor(118, 215, 234)
     GrandmasPerfume   = base.RGBColor(255, 136,  51)
     KoalaTree         = base.RGBColor( 41, 171, 135)
     NewSneakers       = base.RGBColor(  0,   0,   0)
@@ -0,0 +1,696 @@
+"""
+Vectorized delta E formulas for comparing many Lab colors at once.
+
+Every formula here takes an ``(N, 3)`` array of reference colors and either
+an ``(M, 3)`` array of samples shared by all references or an
+``(N, M, 3)`` array with separate samples per reference, and returns the
+``(N, M)`` array of distances. They follow the formulas in
+:py:mod:`colormath.color_diff_matrix`, which only compare one reference at
+a time.
+
+Formulas that weight their terms using only the reference color also have
+a ``*_scale`` function giving, for each reference ``x``, a factor ``f``
+such that ``distance(x, y) >= f * ||x - y||`` for every sample ``y``. That
+lets a Euclidean spatial index over Lab values prune candidates for them
+without changing the result.
+"""
+
+import inspect
+import math
+import typing
+
+import numpy
+
+
+class Metric(typing.NamedTuple):
+    """A delta E formula bound to its parameters."""
+
+    name: str
+    distance: typing.Callable[..., numpy.ndarray]
+    scale: typing.Optional[typing.Callable[..., numpy.ndarray]]
+    params: typing.Tuple[typing.Tuple[str, float], ...] = ()
+
+    @property
+    def key(self) -> str:
+        """Get a stable string identifying the formula and parameters."""
+        params = ','.join(f'{name}={value!r}' for name, value in self.params)
+        return f'{self.name}({params})'
+
+    def __call__(
+        self,
+        labs: numpy.ndarray,
+        matrix: numpy.ndarray
+    ) -> numpy.ndarray:
+        """Calculate the distances between reference and sample colors."""
+        return self.distance(labs, matrix, **dict(self.params))
+
+    def lower_bound(
+        self,
+        labs: numpy.ndarray
+    ) -> typing.Optional[numpy.ndarray]:
+        """Get the CIE76 scale factors for the references, if there are any."""
+        if self.scale is None:
+            return None
+        return self.scale(labs, **dict(self.params))
+
+    def measure(
+        self,
+        labs: numpy.ndarray,
+        matrix: numpy.ndarray
+    ) -> typing.Tuple[numpy.ndarray, typing.Optional[numpy.ndarray]]:
+        """
+        Calculate the distances and the scale factors together.
+
+        Formulas weighted by the references alone get both from one
+        computation of the weights.
+        """
+        weights = _WEIGHTS.get(self.distance)
+        if weights is None:
+            return self(labs, matrix), self.lower_bound(labs)
+        divisors = weights(labs, **dict(self.params))
+        return (
+            _weighted(labs, matrix, divisors),
+            1 / numpy.maximum.reduce(divisors)
+        )
+
+    def single(
+        self,
+        lab: typing.Sequence[float],
+        samples: typing.Iterable[typing.Sequence[float]]
+    ) -> typing.Optional[typing.Tuple[typing.List[float], float]]:
+        """
+        Calculate the distances from one reference color in plain floats.
+
+        For a single color, numpy's overhead per call outweighs the
+        arithmetic. The results can differ from the vectorized ones in the
+        last bits, so they are only good for narrowing down candidates.
+
+        Returns:
+            The distances and the scale factor, or None if the formula is
+            not weighted by the reference alone (CIEDE2000), or the
+            reference is too close to a branch point of the weights to be
+            sure of matching the vectorized ones.
+        """
+        divisors = _DIVISORS.get(self.distance)
+        if divisors is None:
+            return None
+        found = divisors(*lab, **dict(self.params))
+        if found is None:
+            return None
+
+        # The operations are those of _lch_deltas() and _weighted(), in the
+        # same order, so only the divisors can round differently.
+        S_L, S_C, S_H = found
+        L, a, b = lab
+        C_1 = math.sqrt(a * a + b * b)
+        distances = []
+        for L_2, a_2, b_2 in samples:
+            delta_L = L - L_2
+            delta_a = a - a_2
+            delta_b = b - b_2
+            delta_C = C_1 - math.sqrt(a_2 * a_2 + b_2 * b_2)
+            delta_H = math.sqrt(max(
+                -(delta_C * delta_C) + delta_a * delta_a + delta_b * delta_b,
+                0
+            ))
+            L_term = delta_L / S_L
+            C_term = delta_C / S_C
+            H_term = delta_H / S_H
+            distances.append(math.sqrt(
+                L_term * L_term + C_term * C_term + H_term * H_term
+            ))
+        return distances, 1 / max(found)
+
+    @property
+    def boxed(self) -> bool:
+        """Whether :py:meth:`box_bounds` can bound this formula."""
+        return self.distance in _BOXES
+
+    def box_bounds(
+        self,
+        low: numpy.ndarray,
+        high: numpy.ndarray,
+        matrix: numpy.ndarray
+    ) -> typing.Optional[typing.Tuple[numpy.ndarray, numpy.ndarray]]:
+        """
+        Bound the distances from every reference inside boxes in Lab.
+
+        Args:
+            low: ``(N, 3)`` array of the lowest Lab values of each box.
+            high: ``(N, 3)`` array of the highest Lab values of each box.
+            matrix: ``(M, 3)`` array of sample Lab colors.
+
+        Returns:
+            ``(N, M)`` arrays that no distance from a reference in the box
+            to the sample is below or above, or None if the formula has no
+            such bounds (CIEDE2000).
+        """
+        bounds = _BOXES.get(self.distance)
+        if bounds is None:
+            return None
+        terms = _box_terms(low, high, matrix)
+        lower, upper = bounds(terms, **dict(self.params))
+        return lower * (1 - 1e-9), upper * (1 + 1e-9) + 1e-12
+
+
+def cie1976(labs: numpy.ndarray, matrix: numpy.ndarray) -> numpy.ndarray:
+    """Calculate the CIE76 delta E (Euclidean distance in Lab)."""
+    labs = numpy.asarray(labs, dtype=float).reshape(-1, 3)
+    matrix = numpy.asarray(matrix, dtype=float)
+    return numpy.sqrt(
+        numpy.power(labs[:, 0:1] - matrix[..., 0], 2)
+        + numpy.power(labs[:, 1:2] - matrix[..., 1], 2)
+        + numpy.power(labs[:, 2:3] - matrix[..., 2], 2)
+    )
+
+
+def cie1976_scale(labs: numpy.ndarray) -> numpy.ndarray:
+    """Get the CIE76 scale factors, which are all one."""
+    return numpy.ones(len(numpy.asarray(labs).reshape(-1, 3)))
+
+
+def cie1994(
+    labs: numpy.ndarray,
+    matrix: numpy.ndarray,
+    K_L: float = 1,
+    K_C: float = 1,
+    K_H: float = 1,
+    K_1: float = 0.045,
+    K_2: float = 0.015
+) -> numpy.ndarray:
+    """
+    Calculate the CIE94 delta E.
+
+    Args:
+        labs: Reference Lab colors.
+        matrix: Sample Lab colors.
+        K_L: Lightness weight (1 by default, 2 for textiles).
+        K_C: Chroma weight.
+        K_H: Hue weight.
+        K_1: 0.045 for graphic arts, 0.048 for textiles.
+        K_2: 0.015 for graphic arts, 0.014 for textiles.
+    """
+    return _weighted(
+        labs, matrix, _cie1994_weights(labs, K_L, K_C, K_H, K_1, K_2)
+    )
+
+
+def cie1994_scale(
+    labs: numpy.ndarray,
+    K_L: float = 1,
+    K_C: float = 1,
+    K_H: float = 1,
+    K_1: float = 0.045,
+    K_2: float = 0.015
+) -> numpy.ndarray:
+    """Get the CIE94 scale factors for the reference colors."""
+    return 1 / numpy.maximum.reduce(
+        _cie1994_weights(labs, K_L, K_C, K_H, K_1, K_2)
+    )
+
+
+def cie2000(
+    labs: numpy.ndarray,
+    matrix: numpy.ndarray,
+    Kl: float = 1,
+    Kc: float = 1,
+    Kh: float = 1
+) -> numpy.ndarray:
+    """
+    Calculate the CIEDE2000 delta E.
+
+    The weighting terms depend on both colors, so there is no scale
+    function for this formula. The hue difference is computed exactly as
+    :py:func:`colormath.color_diff_matrix.delta_e_cie2000` does, so results
+    agree with colormath.
+
+    Args:
+        labs: Reference Lab colors.
+        matrix: Sample Lab colors.
+        Kl: Lightness weight.
+        Kc: Chroma weight.
+        Kh: Hue weight.
+    """
+    labs = numpy.asarray(labs, dtype=float).reshape(-1, 3)
+    matrix = numpy.asarray(matrix, dtype=float)
+    L = labs[:, 0:1]
+    a = labs[:, 1:2]
+    b = labs[:, 2:3]
+
+    avg_Lp = (L + matrix[..., 0]) / 2.0
+
+    C1 = numpy.sqrt(numpy.power(a, 2) + numpy.power(b, 2))
+    C2 = numpy.sqrt(
+        numpy.power(matrix[..., 1], 2) + numpy.power(matrix[..., 2], 2)
+    )
+
+    avg_C1_C2 = (C1 + C2) / 2.0
+
+    G = 0.5 * (1 - numpy.sqrt(
+        numpy.power(avg_C1_C2, 7.0)
+        / (numpy.power(avg_C1_C2, 7.0) + numpy.power(25.0, 7.0))
+    ))
+
+    a1p = (1.0 + G) * a
+    a2p = (1.0 + G) * matrix[..., 1]
+
+    C1p = numpy.sqrt(numpy.power(a1p, 2) + numpy.power(b, 2))
+    C2p = numpy.sqrt(numpy.power(a2p, 2) + numpy.power(matrix[..., 2], 2))
+
+    avg_C1p_C2p = (C1p + C2p) / 2.0
+
+    h1p = numpy.degrees(numpy.arctan2(b, a1p))
+    h1p += (h1p < 0) * 360
+
+    h2p = numpy.degrees(numpy.arctan2(matrix[..., 2], a2p))
+    h2p += (h2p < 0) * 360
+
+    avg_Hp = (((numpy.fabs(h1p - h2p) > 180) * 360) + h1p + h2p) / 2.0
+
+    T = (
+        1
+        - 0.17 * numpy.cos(numpy.radians(avg_Hp - 30))
+        + 0.24 * numpy.cos(numpy.radians(2 * avg_Hp))
+        + 0.32 * numpy.cos(numpy.radians(3 * avg_Hp + 6))
+        - 0.2 * numpy.cos(numpy.radians(4 * avg_Hp - 63))
+    )
+
+    diff_h2p_h1p = h2p - h1p
+    delta_hp = diff_h2p_h1p + (numpy.fabs(diff_h2p_h1p) > 180) * 360
+    delta_hp -= (h2p > h1p) * 720
+
+    delta_Lp = matrix[..., 0] - L
+    delta_Cp = C2p - C1p
+    delta_Hp = (
+        2 * numpy.sqrt(C2p * C1p) * numpy.sin(numpy.radians(delta_hp) / 2.0)
+    )
+
+    S_L = 1 + (
+        (0.015 * numpy.power(avg_Lp - 50, 2))
+        / numpy.sqrt(20 + numpy.power(avg_Lp - 50, 2.0))
+    )
+    S_C = 1 + 0.045 * avg_C1p_C2p
+    S_H = 1 + 0.015 * avg_C1p_C2p * T
+
+    delta_ro = 30 * numpy.exp(-(numpy.power(((avg_Hp - 275) / 25), 2.0)))
+    R_C = numpy.sqrt(
+        numpy.power(avg_C1p_C2p, 7.0)
+        / (numpy.power(avg_C1p_C2p, 7.0) + numpy.power(25.0, 7.0))
+    )
+    R_T = -2 * R_C * numpy.sin(2 * numpy.radians(delta_ro))
+
+    return numpy.sqrt(
+        numpy.power(delta_Lp / (S_L * Kl), 2)
+        + numpy.power(delta_Cp / (S_C * Kc), 2)
+        + numpy.power(delta_Hp / (S_H * Kh), 2)
+        + R_T * (delta_Cp / (S_C * Kc)) * (delta_Hp / (S_H * Kh))
+    )
+
+
+def cmc(
+    labs: numpy.ndarray,
+    matrix: numpy.ndarray,
+    pl: float = 2,
+    pc: float = 1
+) -> numpy.ndarray:
+    """
+    Calculate the CMC l:c delta E.
+
+    The CMC formula is not symmetric; the weighting terms are derived from
+    the reference colors.
+
+    Args:
+        labs: Reference Lab colors.
+        matrix: Sample Lab colors.
+        pl: Lightness weight (2 for acceptability, 1 for perceptibility).
+        pc: Chroma weight.
+    """
+    return _weighted(labs, matrix, _cmc_weights(labs, pl, pc))
+
+
+def cmc_scale(
+    labs: numpy.ndarray,
+    pl: float = 2,
+    pc: float = 1
+) -> numpy.ndarray:
+    """Get the CMC scale factors for the reference colors."""
+    return 1 / numpy.maximum.reduce(_cmc_weights(labs, pl, pc))
+
+
+METRICS = {
+    'cie76': (cie1976, cie1976_scale),
+    'cie94': (cie1994, cie1994_scale),
+    'cie2000': (cie2000, None),
+    'cmc': (cmc, cmc_scale),
+}
+"""Available delta E formulas by name, with their scale functions."""
+
+
+def metric(name: str, **params: float) -> Metric:
+    """
+    Get a delta E formula by name, optionally with non-default parameters.
+
+    For example, ``metric('cmc', pl=1, pc=1)`` is the CMC 1:1
+    (perceptibility) form.
+
+    Parameters left at their default values are dropped, so equal formulas
+    always have the same :py:attr:`Metric.key`.
+
+    Raises:
+        ValueError: There is no formula with that name, or it does not take
+            one of the parameters.
+    """
+    try:
+        distance, scale = METRICS[name]
+    except KeyError:
+        raise ValueError(
+            f'unknown delta E metric {name!r}; expected one of '
+            f'{", ".join(METRICS)}'
+        ) from None
+
+    defaults = {
+        param.name: param.default
+        for param in inspect.signature(distance).parameters.values()
+        if param.default is not param.empty
+    }
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(
+            f'delta E metric {name!r} has no parameter(s) '
+            f'{", ".join(sorted(unknown))}'
+        )
+    return Metric(name, distance, scale, tuple(sorted(
+        (key, value) for key, value in params.items()
+        if value != defaults[key]
+    )))
+
+
+def get_metric(spec: typing.Union[str, Metric]) -> Metric:
+    """Get a :py:class:`Metric` from either a name or a metric."""
+    if isinstance(spec, Metric):
+        return spec
+    return metric(spec)
+
+
+def _lch_deltas(
+    labs: numpy.ndarray,
+    matrix: numpy.ndarray
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Get the lightness, chroma and hue differences of two sets of colors."""
+    labs = numpy.asarray(labs, dtype=float).reshape(-1, 3)
+    matrix = numpy.asarray(matrix, dtype=float)
+
+    C_1 = numpy.sqrt(
+        numpy.power(labs[:, 1:2], 2) + numpy.power(labs[:, 2:3], 2)
+    )
+    C_2 = numpy.sqrt(
+        numpy.power(matrix[..., 1], 2) + numpy.power(matrix[..., 2], 2)
+    )
+
+    delta_L = labs[:, 0:1] - matrix[..., 0]
+    delta_a = labs[:, 1:2] - matrix[..., 1]
+    delta_b = labs[:, 2:3] - matrix[..., 2]
+    delta_C = C_1 - C_2
+
+    delta_H_sq = (
+        -numpy.power(delta_C, 2)
+        + numpy.power(delta_a, 2)
+        + numpy.power(delta_b, 2)
+    )
+    return delta_L, delta_C, numpy.sqrt(delta_H_sq.clip(min=0))
+
+
+def _weighted(
+    labs: numpy.ndarray,
+    matrix: numpy.ndarray,
+    weights: typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+) -> numpy.ndarray:
+    """Get distances from the references' lightness, chroma, hue divisors."""
+    S_L, S_C, S_H = (weight[:, numpy.newaxis] for weight in weights)
+    delta_L, delta_C, delta_H = _lch_deltas(labs, matrix)
+    return numpy.sqrt(
+        numpy.power(delta_L / S_L, 2)
+        + numpy.power(delta_C / S_C, 2)
+        + numpy.power(delta_H / S_H, 2)
+    )
+
+
+def _cie1994_weights(
+    labs: numpy.ndarray,
+    K_L: float = 1,
+    K_C: float = 1,
+    K_H: float = 1,
+    K_1: float = 0.045,
+    K_2: float = 0.015
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Get the CIE94 lightness, chroma and hue divisors for references."""
+    labs = numpy.asarray(labs, dtype=float).reshape(-1, 3)
+    C_1 = numpy.sqrt(numpy.power(labs[:, 1], 2) + numpy.power(labs[:, 2], 2))
+    S_L = numpy.ones_like(C_1)
+    S_C = 1 + K_1 * C_1
+    S_H = 1 + K_2 * C_1
+    return K_L * S_L, K_C * S_C, K_H * S_H
+
+
+def _cmc_weights(
+    labs: numpy.ndarray,
+    pl: float = 2,
+    pc: float = 1
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Get the CMC lightness, chroma and hue divisors for references."""
+    labs = numpy.asarray(labs, dtype=float).reshape(-1, 3)
+    L = labs[:, 0]
+    C_1 = numpy.sqrt(numpy.power(labs[:, 1], 2) + numpy.power(labs[:, 2], 2))
+
+    H_1 = numpy.degrees(numpy.arctan2(labs[:, 2], labs[:, 1]))
+    H_1 = numpy.where(H_1 < 0, H_1 + 360, H_1)
+
+    F = numpy.sqrt(numpy.power(C_1, 4) / (numpy.power(C_1, 4) + 1900.0))
+    T = numpy.where(
+        (164 <= H_1) & (H_1 <= 345),
+        0.56 + numpy.abs(0.2 * numpy.cos(numpy.radians(H_1 + 168))),
+        0.36 + numpy.abs(0.4 * numpy.cos(numpy.radians(H_1 + 35)))
+    )
+
+    S_L = numpy.where(L < 16, 0.511, (0.040975 * L) / (1 + 0.01765 * L))
+    S_C = ((0.0638 * C_1) / (1 + 0.0131 * C_1)) + 0.638
+    S_H = S_C * (F * T + 1 - F)
+    return pl * S_L, pc * S_C, S_H
+
+
+_WEIGHTS = {
+    cie1994: _cie1994_weights,
+    cmc: _cmc_weights,
+}
+"""Weight functions of the formulas computed by :py:func:`_weighted`."""
+
+
+def _cie1976_divisors(
+    L: float,
+    a: float,
+    b: float
+) -> typing.Tuple[float, float, float]:
+    """Get the (unit) CIE76 divisors for one reference."""
+    return 1.0, 1.0, 1.0
+
+
+def _cie1994_divisors(
+    L: float,
+    a: float,
+    b: float,
+    K_L: float = 1,
+    K_C: float = 1,
+    K_H: float = 1,
+    K_1: float = 0.045,
+    K_2: float = 0.015
+) -> typing.Tuple[float, float, float]:
+    """Get the CIE94 divisors for one reference, as _cie1994_weights()."""
+    C_1 = math.sqrt(a * a + b * b)
+    return K_L, K_C * (1 + K_1 * C_1), K_H * (1 + K_2 * C_1)
+
+
+def _cmc_divisors(
+    L: float,
+    a: float,
+    b: float,
+    pl: float = 2,
+    pc: float = 1
+) -> typing.Optional[typing.Tuple[float, float, float]]:
+    """Get the CMC divisors for one reference, as _cmc_weights()."""
+    C_1 = math.sqrt(a * a + b * b)
+    H_1 = math.degrees(math.atan2(b, a))
+    if H_1 < 0:
+        H_1 += 360
+    if min(abs(H_1 - 164), abs(H_1 - 345), abs(L - 16)) < 1e-9:
+        return None
+
+    F = math.sqrt(C_1 ** 4 / (C_1 ** 4 + 1900.0))
+    if 164 <= H_1 <= 345:
+        T = 0.56 + abs(0.2 * math.cos(math.radians(H_1 + 168)))
+    else:
+        T = 0.36 + abs(0.4 * math.cos(math.radians(H_1 + 35)))
+
+    S_L = 0.511 if L < 16 else (0.040975 * L) / (1 + 0.01765 * L)
+    S_C = ((0.0638 * C_1) / (1 + 0.0131 * C_1)) + 0.638
+    S_H = S_C * (F * T + 1 - F)
+    return pl * S_L, pc * S_C, S_H
+
+
+_DIVISORS = {
+    cie1976: _cie1976_divisors,
+    cie1994: _cie1994_divisors,
+    cmc: _cmc_divisors,
+}
+"""Plain float weight functions of the formulas used by Metric.single()."""
+
+
+class _BoxTerms(typing.NamedTuple):
+    """Ranges of the terms of a distance over boxes of references."""
+
+    L: typing.Tuple[numpy.ndarray, numpy.ndarray]
+    C: typing.Tuple[numpy.ndarray, numpy.ndarray]
+    delta_L: typing.Tuple[numpy.ndarray, numpy.ndarray]
+    delta_ab_sq: typing.Tuple[numpy.ndarray, numpy.ndarray]
+    delta_C: typing.Tuple[numpy.ndarray, numpy.ndarray]
+
+
+def _box_terms(
+    low: numpy.ndarray,
+    high: numpy.ndarray,
+    matrix: numpy.ndarray
+) -> _BoxTerms:
+    """
+    Get the ranges of the terms of the distances from boxes to samples.
+
+    The reference's lightness and chroma ranges are ``(N, 1)``; the others
+    are ``(N, M)``. Differences are unsigned.
+    """
+    low = numpy.asarray(low, dtype=float).reshape(-1, 3)
+    high = numpy.asarray(high, dtype=float).reshape(-1, 3)
+    matrix = numpy.asarray(matrix, dtype=float).reshape(-1, 3)
+
+    def spans(
+        first: numpy.ndarray,
+        last: numpy.ndarray,
+        values: numpy.ndarray
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """Get the least and greatest distances from values to intervals."""
+        below = first[:, numpy.newaxis] - values
+        above = values - last[:, numpy.newaxis]
+        return (
+            numpy.maximum(numpy.maximum(below, above), 0),
+            numpy.maximum(numpy.abs(below), numpy.abs(above))
+        )
+
+    nearest = numpy.maximum(numpy.maximum(low[:, 1:], -high[:, 1:]), 0)
+    farthest = numpy.maximum(numpy.abs(low[:, 1:]), numpy.abs(high[:, 1:]))
+    C_low = numpy.hypot(nearest[:, 0], nearest[:, 1])
+    C_high = numpy.hypot(farthest[:, 0], farthest[:, 1])
+    C_2 = numpy.hypot(matrix[:, 1], matrix[:, 2])
+
+    min_a, max_a = spans(low[:, 1], high[:, 1], matrix[:, 1])
+    min_b, max_b = spans(low[:, 2], high[:, 2], matrix[:, 2])
+    return _BoxTerms(
+        (low[:, 0:1], high[:, 0:1]),
+        (C_low[:, numpy.newaxis], C_high[:, numpy.newaxis]),
+        spans(low[:, 0], high[:, 0], matrix[:, 0]),
+        (min_a * min_a + min_b * min_b, max_a * max_a + max_b * max_b),
+        spans(C_low, C_high, C_2),
+    )
+
+
+def _weighted_bounds(
+    terms: _BoxTerms,
+    S_L: typing.Tuple[numpy.ndarray, numpy.ndarray],
+    S_C: typing.Tuple[numpy.ndarray, numpy.ndarray],
+    S_H: typing.Tuple[numpy.ndarray, numpy.ndarray]
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """Bound distances weighted by ranges of the references' divisors."""
+    delta_L_low, delta_L_high = terms.delta_L
+    delta_C_low, delta_C_high = terms.delta_C
+    delta_ab_low, delta_ab_high = terms.delta_ab_sq
+    delta_H_low = numpy.maximum(delta_ab_low - delta_C_high * delta_C_high, 0)
+    delta_H_high = numpy.maximum(delta_ab_high - delta_C_low * delta_C_low, 0)
+    return (
+        numpy.sqrt(
+            numpy.power(delta_L_low / S_L[1], 2)
+            + numpy.power(delta_C_low / S_C[1], 2)
+            + delta_H_low / numpy.power(S_H[1], 2)
+        ),
+        numpy.sqrt(
+            numpy.power(delta_L_high / S_L[0], 2)
+            + numpy.power(delta_C_high / S_C[0], 2)
+            + delta_H_high / numpy.power(S_H[0], 2)
+        ),
+    )
+
+
+def _cie1976_box(terms: _BoxTerms) -> typing.Tuple[numpy.ndarray, ...]:
+    """Bound the CIE76 distances from boxes."""
+    delta_L_low, delta_L_high = terms.delta_L
+    delta_ab_low, delta_ab_high = terms.delta_ab_sq
+    return (
+        numpy.sqrt(delta_L_low * delta_L_low + delta_ab_low),
+        numpy.sqrt(delta_L_high * delta_L_high + delta_ab_high),
+    )
+
+
+def _cie1994_box(
+    terms: _BoxTerms,
+    K_L: float = 1,
+    K_C: float = 1,
+    K_H: float = 1,
+    K_1: float = 0.045,
+    K_2: float = 0.015
+) -> typing.Tuple[numpy.ndarray, ...]:
+    """Bound the CIE94 distances from boxes; the divisors grow with C."""
+    C_low, C_high = terms.C
+    S_L = K_L * numpy.ones_like(C_low)
+    return _weighted_bounds(
+        terms,
+        (S_L, S_L),
+        (K_C * (1 + K_1 * C_low), K_C * (1 + K_1 * C_high)),
+        (K_H * (1 + K_2 * C_low), K_H * (1 + K_2 * C_high)),
+    )
+
+
+def _cmc_box(
+    terms: _BoxTerms,
+    pl: float = 2,
+    pc: float = 1
+) -> typing.Tuple[numpy.ndarray, ...]:
+    """
+    Bound the CMC distances from boxes.
+
+    ``S_L``, ``S_C`` and ``F`` grow with lightness and chroma, and ``T``
+    is always between 0.36 and 0.76, whatever the hue.
+    """
+    def lightness(L: numpy.ndarray) -> numpy.ndarray:
+        return numpy.where(L < 16, 0.511, (0.040975 * L) / (1 + 0.01765 * L))
+
+    def chroma(C: numpy.ndarray) -> numpy.ndarray:
+        return ((0.0638 * C) / (1 + 0.0131 * C)) + 0.638
+
+    def factor(C: numpy.ndarray) -> numpy.ndarray:
+        return numpy.sqrt(numpy.power(C, 4) / (numpy.power(C, 4) + 1900.0))
+
+    L_low, L_high = terms.L
+    C_low, C_high = terms.C
+    S_C = (chroma(C_low), chroma(C_high))
+    return _weighted_bounds(
+        terms,
+        (pl * lightness(L_low), pl * lightness(L_high)),
+        (pc * S_C[0], pc * S_C[1]),
+        (
+            S_C[0] * (1 - factor(C_high) * (1 - 0.36)),
+            S_C[1] * (1 - factor(C_low) * (1 - 0.76)),
+        ),
+    )
+
+
+_BOXES = {
+    cie1976: _cie1976_box,
+    cie1994: _cie1994_box,
+    cmc: _cmc_box,
+}
+"""Distance bound functions for boxes, used by Metric.box_bounds()."""
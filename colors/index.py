@@ -0,0 +1,191 @@
+"""Spatial index used to search the members of a color group."""
+
+import heapq
+import math
+import typing
+
+import numpy
+
+
+class KDTree:
+    """
+    Static k-d tree for nearest neighbour searches in a 3D color space.
+
+    The tree is built once over a fixed set of points (for color groups,
+    the Lab values of the members) and answers Euclidean nearest neighbour,
+    k nearest neighbour and radius queries without checking every point.
+    Results are exact; ties are resolved in favour of the point with the
+    lowest index, which matches :py:func:`numpy.argmin` over the same
+    points.
+
+    Queries handle one point at a time, so the leaves are kept as plain
+    float tuples: scanning a few points in Python is cheaper than a numpy
+    call per leaf.
+    """
+
+    def __init__(self, points: numpy.ndarray, leaf_size: int = 8) -> None:
+        """Build the tree over an ``(M, 3)`` array of points."""
+        points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        self.__leaf_size = max(1, leaf_size)
+        self.__order = numpy.arange(len(points))
+        self.__nodes: typing.List[tuple] = []
+        if len(points):
+            self.__build(points, 0, len(points))
+
+    def __len__(self) -> int:
+        """Get the number of points in the tree."""
+        return len(self.__order)
+
+    def __build(self, points: numpy.ndarray, start: int, stop: int) -> int:
+        """Build the subtree for ``order[start:stop]`` and get its node id."""
+        node = len(self.__nodes)
+        order = self.__order[start:stop]
+        if stop - start <= self.__leaf_size:
+            leaf = tuple(
+                (index, *point)
+                for index, point in zip(
+                    order.tolist(),
+                    points[order].tolist()
+                )
+            )
+            self.__nodes.append((None, None, leaf, None))
+            return node
+
+        self.__nodes.append(())
+        subset = points[order]
+        axis = int(numpy.ptp(subset, axis=0).argmax())
+        middle = (stop - start) // 2
+        partition = numpy.argpartition(subset[:, axis], middle)
+        self.__order[start:stop] = order[partition]
+        split = float(points[self.__order[start + middle], axis])
+
+        left = self.__build(points, start, start + middle)
+        right = self.__build(points, start + middle, stop)
+        self.__nodes[node] = (axis, split, left, right)
+        return node
+
+    def query(self, point: numpy.ndarray) -> typing.Tuple[float, int]:
+        """
+        Find the point nearest to the given point.
+
+        Returns:
+            The Euclidean distance to the nearest point and its index.
+        """
+        x, y, z = target = self.__target(point)
+        nodes = self.__nodes
+        best_sq = math.inf
+        best = -1
+        stack = [(0, 0.0)] if nodes else []
+        while stack:
+            node, bound_sq = stack.pop()
+            if bound_sq > best_sq:
+                continue
+            axis, split, first, second = nodes[node]
+            if axis is None:
+                for index, p, q, r in first:
+                    dist_sq = (p - x) * (p - x) + (q - y) * (q - y)
+                    dist_sq += (r - z) * (r - z)
+                    if dist_sq < best_sq or (
+                        dist_sq == best_sq and index < best
+                    ):
+                        best_sq = dist_sq
+                        best = index
+                continue
+
+            offset = target[axis] - split
+            near, far = (first, second) if offset < 0 else (second, first)
+            stack.append((far, max(bound_sq, offset * offset)))
+            stack.append((near, bound_sq))
+        return math.sqrt(best_sq), best
+
+    def query_k(
+        self,
+        point: numpy.ndarray,
+        k: int
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Find the ``k`` points nearest to the given point.
+
+        Returns:
+            The Euclidean distances to the nearest points (or to all of
+            them, if there are fewer than ``k``) and their indexes, nearest
+            first, with equally distant points in ascending index order.
+        """
+        x, y, z = target = self.__target(point)
+        nodes = self.__nodes
+        # Max-heap of the best points so far, worst (then highest index) at
+        # the top; a node at the same distance as the worst may still hold
+        # a point with a lower index, so it is only skipped when further.
+        best: typing.List[typing.Tuple[float, int]] = []
+        worst_sq = math.inf
+        stack = [(0, 0.0)] if nodes and k > 0 else []
+        while stack:
+            node, bound_sq = stack.pop()
+            if bound_sq > worst_sq:
+                continue
+            axis, split, first, second = nodes[node]
+            if axis is None:
+                for index, p, q, r in first:
+                    dist_sq = (p - x) * (p - x) + (q - y) * (q - y)
+                    dist_sq += (r - z) * (r - z)
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist_sq, -index))
+                    elif (-dist_sq, -index) > best[0]:
+                        heapq.heapreplace(best, (-dist_sq, -index))
+                    else:
+                        continue
+                    if len(best) == k:
+                        worst_sq = -best[0][0]
+                continue
+
+            offset = target[axis] - split
+            near, far = (first, second) if offset < 0 else (second, first)
+            stack.append((far, max(bound_sq, offset * offset)))
+            stack.append((near, bound_sq))
+
+        found = sorted((-dist_sq, -index) for dist_sq, index in best)
+        return (
+            numpy.sqrt([dist_sq for dist_sq, _ in found]),
+            numpy.array([index for _, index in found], dtype=numpy.intp)
+        )
+
+    def query_radius(
+        self,
+        point: numpy.ndarray,
+        radius: float
+    ) -> numpy.ndarray:
+        """
+        Find every point within ``radius`` of the given point.
+
+        Returns:
+            The indexes of the matching points in ascending order.
+        """
+        x, y, z = target = self.__target(point)
+        radius_sq = radius * radius
+        nodes = self.__nodes
+        found = []
+        stack = [0] if nodes else []
+        while stack:
+            axis, split, first, second = nodes[stack.pop()]
+            if axis is None:
+                found.extend(
+                    index
+                    for index, p, q, r in first
+                    if (p - x) * (p - x) + (q - y) * (q - y)
+                    + (r - z) * (r - z) <= radius_sq
+                )
+                continue
+
+            offset = target[axis] - split
+            if offset - radius <= 0:
+                stack.append(first)
+            if offset + radius >= 0:
+                stack.append(second)
+
+        found.sort()
+        return numpy.array(found, dtype=numpy.intp)
+
+    @staticmethod
+    def __target(point: numpy.ndarray) -> typing.List[float]:
+        """Get a query point as plain floats."""
+        return numpy.asarray(point, dtype=float).reshape(3).tolist()
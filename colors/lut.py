@@ -0,0 +1,643 @@
+"""Precomputed 24-bit sRGB lookup tables for color groups."""
+
+import concurrent.futures
+import hashlib
+import os
+import typing
+
+import numpy
+
+from colors import convert, diff
+
+SIZE = 1 << 24
+"""Number of entries in a table (one per 8-bit sRGB triple)."""
+
+CHUNK_SIZE = 1 << 16
+"""Number of sRGB values resolved per build task."""
+
+
+def cache_dir() -> str:
+    """
+    Get the default directory for generated tables.
+
+    This is ``$COLORS_CACHE_DIR`` when set, otherwise ``~/.cache/colors``.
+    """
+    return os.environ.get(
+        'COLORS_CACHE_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'colors')
+    )
+
+
+def digest(*parts: typing.Union[bytes, str]) -> str:
+    """Get a short content hash identifying the data a table was built from."""
+    sha = hashlib.sha256()
+    for part in parts:
+        sha.update(part.encode() if isinstance(part, str) else part)
+    return sha.hexdigest()[:16]
+
+
+class LookupTable:
+    """
+    Memory-mapped table giving a group member for every 24-bit sRGB value.
+
+    Entry ``0xRRGGBB`` holds the position in ``list(group)`` of the member
+    closest to that color. The file is only opened the first time the table
+    is indexed, so attaching a table to a group that is never queried costs
+    nothing. Several processes mapping the same file share its pages.
+    """
+
+    def __init__(self, path: str, metric: str) -> None:
+        """
+        Refer to the table stored at ``path`` without opening it.
+
+        Args:
+            path: Where the table is stored.
+            metric: Key of the delta E formula the table was built with.
+        """
+        self.path = path
+        self.metric = metric
+        self.__table: typing.Optional[numpy.ndarray] = None
+
+    @property
+    def table(self) -> numpy.ndarray:
+        """
+        Get the mapped table, opening the file if needed.
+
+        Raises:
+            ValueError: The file is not a complete table of integers, such
+                as a truncated or corrupt one.
+        """
+        if self.__table is None:
+            try:
+                table = numpy.load(self.path, mmap_mode='r')
+            except (EOFError, ValueError) as error:
+                raise ValueError(
+                    f'{self.path} is not a 24-bit lookup table'
+                ) from error
+            if table.shape != (SIZE,) or table.dtype.kind != 'u':
+                raise ValueError(f'{self.path} is not a 24-bit lookup table')
+            self.__table = table
+        return self.__table
+
+    def __getitem__(
+        self,
+        packed: typing.Union[int, numpy.ndarray]
+    ) -> typing.Union[int, numpy.ndarray]:
+        """Get the member position(s) for packed ``0xRRGGBB`` value(s)."""
+        if isinstance(packed, numpy.ndarray):
+            return self.table[packed].astype(numpy.intp)
+        return int(self.table[packed])
+
+    def __repr__(self) -> str:
+        """Get the string representation of the LookupTable instance."""
+        return f'<LookupTable({self.path!r})>'
+
+    @staticmethod
+    def default_path(group: type, key: str) -> str:
+        """Get the cache path for a group's table built from ``key``."""
+        return os.path.join(
+            cache_dir(),
+            f'{group.__module__}.{group.__qualname__}-{key}.npy'
+        )
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        metric: str,
+        resolve: typing.Callable[[numpy.ndarray], numpy.ndarray],
+        dtype: numpy.dtype,
+        workers: typing.Optional[int] = None
+    ) -> 'LookupTable':
+        """
+        Compute a table and write it to ``path``.
+
+        Args:
+            path: Where to store the table.
+            metric: Key of the delta E formula ``resolve`` uses.
+            resolve: Maps an ``(N, 3)`` array of Lab colors to the member
+                position of each.
+            dtype: Integer type of the stored positions.
+            workers: Number of threads resolving chunks in parallel. The
+                heavy lifting is done by NumPy, which releases the GIL.
+
+        Returns:
+            The new (not yet mapped) table.
+        """
+        def compute(packed: numpy.ndarray) -> numpy.ndarray:
+            return resolve(convert.rgb8_to_lab(convert.unpack_rgb(packed)))
+
+        _fill(path, (SIZE,), dtype, compute, workers)
+        return cls(path, metric)
+
+
+class LabCube:
+    """
+    Memory-mapped table of the CIE Lab value of every 24-bit sRGB value.
+
+    Row ``0xRRGGBB`` holds the Lab value of that color (relative to D65,
+    like :py:func:`convert.srgb_to_lab`) as float32, which is within about
+    1e-5 of the computed value. Once installed with
+    :py:func:`load_lab_cube`, converting 8-bit sRGB colors to Lab for color
+    matching reads the table instead of computing the conversion. The file
+    takes 192 MiB, is only opened when first indexed, and its pages are
+    shared by every process mapping it.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Refer to the cube stored at ``path`` without opening it."""
+        self.path = path
+        self.__table: typing.Optional[numpy.ndarray] = None
+
+    @property
+    def table(self) -> numpy.ndarray:
+        """Get the mapped ``(2 ** 24, 3)`` table, opening it if needed."""
+        if self.__table is None:
+            table = numpy.load(self.path, mmap_mode='r')
+            if table.shape != (SIZE, 3) or table.dtype != numpy.float32:
+                raise ValueError(f'{self.path} is not an sRGB to Lab cube')
+            self.__table = table
+        return self.__table
+
+    def __getitem__(self, packed: numpy.ndarray) -> numpy.ndarray:
+        """Get the ``(N, 3)`` Lab values of packed ``0xRRGGBB`` values."""
+        return self.table[packed].astype(float)
+
+    def __repr__(self) -> str:
+        """Get the string representation of the LabCube instance."""
+        return f'<LabCube({self.path!r})>'
+
+    @staticmethod
+    def default_path() -> str:
+        """Get the cache path of the cube."""
+        return os.path.join(cache_dir(), 'srgb-lab-float32.npy')
+
+    @classmethod
+    def build(
+        cls,
+        path: typing.Optional[str] = None,
+        workers: typing.Optional[int] = None
+    ) -> 'LabCube':
+        """
+        Compute the cube and write it to a file.
+
+        Args:
+            path: Where to store the cube; :py:meth:`default_path` if not
+                given.
+            workers: Number of threads computing chunks in parallel.
+
+        Returns:
+            The new (not yet mapped) cube.
+        """
+        path = path or cls.default_path()
+
+        def compute(packed: numpy.ndarray) -> numpy.ndarray:
+            rgb = convert.unpack_rgb(packed)
+            return convert.srgb_to_lab(rgb / 255).astype(numpy.float32)
+
+        _fill(path, (SIZE, 3), numpy.dtype(numpy.float32), compute, workers)
+        return cls(path)
+
+
+def load_lab_cube(
+    path: typing.Optional[str] = None,
+    build: bool = False
+) -> LabCube:
+    """
+    Open a cube and install it with :py:func:`convert.use_lab_cube`.
+
+    Color matching then reads 8-bit sRGB colors' Lab values from the cube,
+    in :py:func:`convert.rgb8_to_lab` and every color group search, for
+    single colors and batches. Call ``convert.use_lab_cube(None)`` to
+    compute the values again. Nothing is installed on import; worker
+    processes sharing one cube each call this when they start.
+
+    Args:
+        path: Where the cube is stored; ``$COLORS_LAB_CUBE`` if set,
+            otherwise :py:meth:`LabCube.default_path`.
+        build: Build the cube if the file does not exist yet.
+
+    Raises:
+        FileNotFoundError: There is no cube at ``path`` and ``build`` is
+            not set.
+    """
+    path = (
+        path
+        or os.environ.get('COLORS_LAB_CUBE')
+        or LabCube.default_path()
+    )
+    if os.path.exists(path):
+        cube = LabCube(path)
+    elif build:
+        cube = LabCube.build(path)
+    else:
+        raise FileNotFoundError(f'no sRGB to Lab cube at {path}')
+    convert.use_lab_cube(cube)
+    return cube
+
+
+def _fill(
+    path: str,
+    shape: typing.Tuple[int, ...],
+    dtype: numpy.dtype,
+    compute: typing.Callable[[numpy.ndarray], numpy.ndarray],
+    workers: typing.Optional[int]
+) -> None:
+    """
+    Write a table with a row per 24-bit sRGB value to ``path``.
+
+    ``compute`` maps an array of packed ``0xRRGGBB`` values to their rows.
+    Chunks are computed by ``workers`` threads (NumPy releases the GIL),
+    and the file only replaces ``path`` once complete.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    partial = f'{path}.{os.getpid()}.tmp'
+    table = numpy.lib.format.open_memmap(
+        partial,
+        mode='w+',
+        dtype=dtype,
+        shape=shape
+    )
+
+    def fill(start: int) -> None:
+        packed = numpy.arange(start, start + CHUNK_SIZE, dtype=numpy.uint32)
+        table[start:start + CHUNK_SIZE] = compute(packed)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            for _ in executor.map(fill, range(0, SIZE, CHUNK_SIZE)):
+                pass
+        table.flush()
+        del table
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+class Lattice:
+    """
+    Reduced-precision sRGB lattice narrowing closest-member searches.
+
+    Each channel is cut to its top ``bits`` bits, splitting the sRGB cube
+    into ``2 ** (3 * bits)`` cells of ``256 >> bits`` levels per side. Every
+    cell keeps at most eight candidate members, and colors inside it are
+    only compared with those. A cell whose candidates are all the same
+    member needs no comparison at all; the others are ambiguous and refined
+    by comparing the candidates.
+
+    The candidates start as the exact answers at the eight corners of the
+    cell, and :py:attr:`bounds` holds the most by which the best of them is
+    further from a color in the cell than the closest member. A first bound
+    is proven for every cell at once: the cell is enclosed in a box in Lab
+    (see :py:func:`convert.srgb_box_to_lab`), and
+    :py:meth:`diff.Metric.box_bounds` gives the least and greatest distance
+    from anywhere in that box to every member. No color in the cell can be
+    further from its best candidate than the smallest upper bound among the
+    candidates, nor closer to another member than the smallest lower bound
+    among the others, so their difference (or zero) bounds the error.
+
+    Boxes are wide in Lab, so that bound is rarely zero and mostly far above
+    the real error (up to 135 for the bundled groups). Every cell where it
+    is not zero is measured instead: each of its colors is compared with
+    the members that may be closer to it than its nearest candidate in Lab
+    (found with the formula's CIE76 scale factor, as in the spatial index),
+    and the bound becomes the largest error actually made. Where that is
+    above the build's tolerance, the candidates are replaced with the
+    members closest to the cell's colors, or with the eight of them that
+    leave the smallest error if there are more.
+
+    Each entry of :py:attr:`bounds` is an upper bound on the error made in
+    its cell, and :py:attr:`error_bound` the largest of them. It is at most
+    the build's tolerance, except in cells whose colors are closest to more
+    than eight members between them; those keep the eight leaving the
+    smallest error, and their bound says how large it is.
+    ``python -m benchmarks.approx`` reports the bounds, build times and
+    search speeds of the bundled groups.
+
+    Only formulas with box bounds can be used, so there is no lattice for
+    CIEDE2000.
+    """
+
+    def __init__(
+        self,
+        bits: int,
+        candidates: numpy.ndarray,
+        bounds: numpy.ndarray
+    ) -> None:
+        """
+        Wrap a computed lattice.
+
+        Args:
+            bits: Bits kept per channel.
+            candidates: ``(2 ** (3 * bits), 8)`` array of the candidates of
+                each cell, indexed by the packed reduced channels, sorted
+                within each cell.
+            bounds: ``2 ** (3 * bits)`` array of the error bound of each
+                cell; see the class documentation.
+        """
+        self.bits = bits
+        self.candidates = candidates
+        self.bounds = bounds
+
+    def __getitem__(self, packed: numpy.ndarray) -> numpy.ndarray:
+        """Get the ``(N, 8)`` candidates for packed ``0xRRGGBB`` values."""
+        return self.candidates[self.cells(packed)]
+
+    def __repr__(self) -> str:
+        """Get the string representation of the Lattice instance."""
+        return (
+            f'<Lattice(bits={self.bits}, ambiguous={self.ambiguous:.1%}, '
+            f'error_bound={self.error_bound:.3f})>'
+        )
+
+    @property
+    def ambiguous(self) -> float:
+        """Get the fraction of cells with more than one candidate."""
+        return float(
+            (self.candidates[:, 0] != self.candidates[:, -1]).mean()
+        )
+
+    @property
+    def error_bound(self) -> float:
+        """
+        Get the largest error bound over all cells.
+
+        This is the most by which an answer can be worse than the exact
+        one, in the lattice's delta E formula. Errors mostly come from the
+        ambiguous cells, but the non-metric formulas can also fool a cell
+        whose corners all agree, so none are left out.
+        """
+        return float(self.bounds.max())
+
+    def cell(self, packed: int) -> int:
+        """Get the cell index of one packed ``0xRRGGBB`` value."""
+        shift = 8 - self.bits
+        mask = (1 << self.bits) - 1
+        return (
+            (packed >> (16 + shift)) << (2 * self.bits)
+            | ((packed >> (8 + shift)) & mask) << self.bits
+            | (packed >> shift) & mask
+        )
+
+    def cells(self, packed: numpy.ndarray) -> numpy.ndarray:
+        """Get the cell index of packed ``0xRRGGBB`` values."""
+        rgb = convert.unpack_rgb(packed).astype(numpy.intp) >> (8 - self.bits)
+        cell = (rgb[:, 0] << (2 * self.bits)) | (rgb[:, 1] << self.bits)
+        return cell | rgb[:, 2]
+
+    @classmethod
+    def build(
+        cls,
+        bits: int,
+        matrix: numpy.ndarray,
+        metric: diff.Metric,
+        resolve: typing.Callable[[numpy.ndarray], numpy.ndarray],
+        tolerance: float = 0.5
+    ) -> 'Lattice':
+        """
+        Compute a lattice.
+
+        Args:
+            bits: Bits kept per channel, from 1 to 8.
+            matrix: ``(M, 3)`` array of the Lab colors of the members.
+            metric: The delta E formula searches use.
+            resolve: Maps an ``(N, 3)`` array of Lab colors to the row of
+                ``matrix`` closest to each under ``metric``.
+            tolerance: Largest error the corner answers of a cell may make
+                before they are replaced.
+
+        Raises:
+            ValueError: ``bits`` is out of range, or the formula cannot
+                bound its distances over a cell.
+        """
+        if not 1 <= bits <= 8:
+            raise ValueError(f'bits must be from 1 to 8, not {bits}')
+        matrix = numpy.asarray(matrix, dtype=float).reshape(-1, 3)
+        if not metric.boxed:
+            raise ValueError(
+                f'delta E metric {metric.name!r} cannot bound a lattice'
+            )
+
+        side = 1 << bits
+        step = 256 >> bits
+        levels = numpy.minimum(numpy.arange(side + 1) * step, 255)
+        grid = numpy.stack(
+            numpy.meshgrid(levels, levels, levels, indexing='ij'),
+            axis=-1
+        ).reshape(-1, 3)
+        answers = resolve(convert.rgb8_to_lab(grid))
+        answers = answers.reshape(side + 1, side + 1, side + 1)
+        candidates = numpy.stack(
+            [
+                answers[
+                    red:side + red,
+                    green:side + green,
+                    blue:side + blue
+                ].reshape(-1)
+                for red in (0, 1)
+                for green in (0, 1)
+                for blue in (0, 1)
+            ],
+            axis=1
+        )
+
+        # Members repeating an earlier member's color are never the answer.
+        _, first = numpy.unique(matrix, axis=0, return_index=True)
+        first = numpy.sort(first)
+        others = numpy.ones(len(matrix), dtype=bool)
+        others[first] = False
+
+        bounds = numpy.empty(len(candidates))
+        chunk = max(1, (1 << 20) // max(1, len(matrix)))
+        for start in range(0, len(candidates), chunk):
+            cells = numpy.arange(start, min(start + chunk, len(candidates)))
+            lower, upper = metric.box_bounds(
+                *convert.srgb_box_to_lab(
+                    cls.__low(cells, bits) / 255,
+                    numpy.minimum(cls.__low(cells, bits) + step - 1, 255)
+                    / 255
+                ),
+                matrix
+            )
+            lower[:, others] = numpy.inf
+            found = candidates[cells]
+            best = numpy.take_along_axis(upper, found, axis=1).min(axis=1)
+            numpy.put_along_axis(lower, found, numpy.inf, axis=1)
+            bounds[cells] = numpy.maximum(best - lower.min(axis=1), 0)
+
+        loose = numpy.flatnonzero(bounds > 0)
+        chunk = max(1, (1 << 16) // step ** 3)
+        for start in range(0, len(loose), chunk):
+            cells = loose[start:start + chunk]
+            candidates[cells], bounds[cells] = cls.__refine(
+                cls.__low(cells, bits),
+                step,
+                candidates[cells],
+                matrix,
+                first,
+                metric,
+                tolerance
+            )
+
+        candidates = numpy.sort(candidates, axis=1)
+        candidates.flags.writeable = False
+        bounds.flags.writeable = False
+        return cls(bits, candidates, bounds)
+
+    @staticmethod
+    def __low(cells: numpy.ndarray, bits: int) -> numpy.ndarray:
+        """Get the lowest 8-bit sRGB color of each cell."""
+        rgb = numpy.stack([cells >> (2 * bits), cells >> bits, cells], axis=1)
+        return rgb % (1 << bits) * (256 >> bits)
+
+    @classmethod
+    def __refine(
+        cls,
+        low: numpy.ndarray,
+        step: int,
+        found: numpy.ndarray,
+        matrix: numpy.ndarray,
+        first: numpy.ndarray,
+        metric: diff.Metric,
+        tolerance: float
+    ) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Measure the error of cells exactly, replacing loose candidates.
+
+        Args:
+            low: ``(K, 3)`` array of the lowest 8-bit sRGB color of each
+                cell.
+            step: Levels per channel in a cell.
+            found: ``(K, 8)`` array of the candidates of each cell.
+            matrix: ``(M, 3)`` array of the Lab colors of the members.
+            first: Sorted rows of ``matrix`` not repeating an earlier row.
+            metric: The delta E formula searches use.
+            tolerance: Largest error left alone.
+
+        Returns:
+            The candidates and the largest error of each cell.
+        """
+        offsets = numpy.stack(
+            numpy.meshgrid(*[numpy.arange(step)] * 3, indexing='ij'),
+            axis=-1
+        ).reshape(-1, 3)
+        size = len(offsets)
+        labs = convert.rgb8_to_lab(
+            (low[:, None] + offsets).reshape(-1, 3)
+        ).reshape(len(low), size, 3)
+
+        # No member is closer to a color than the candidate nearest to it
+        # in Lab, so all are inside the radius that candidate gives.
+        nearest = numpy.take_along_axis(
+            found,
+            cls.__squares(labs, matrix[found]).argmin(axis=-1),
+            axis=1
+        )
+        least, scale = metric.measure(
+            labs.reshape(-1, 3),
+            matrix[nearest.reshape(-1), None]
+        )
+        radius = (least[:, 0] / scale * (1 + 1e-6) + 1e-6).reshape(
+            len(low),
+            size
+        )
+
+        # Members near the Lab box of each cell, in row order.
+        points = matrix[first]
+        gap = numpy.maximum(
+            numpy.maximum(
+                labs.min(axis=1)[:, None] - points,
+                points - labs.max(axis=1)[:, None]
+            ),
+            0
+        )
+        near = numpy.square(gap).sum(axis=-1) <= numpy.square(
+            radius.max(axis=1)
+        )[:, None]
+        order = numpy.argsort(~near, axis=1, kind='stable')[
+            :,
+            :near.sum(axis=1).max()
+        ]
+        rows = first[order]
+        valid = numpy.take_along_axis(near, order, axis=1)
+        inside = valid[:, None] & (
+            cls.__squares(labs, matrix[rows])
+            <= numpy.square(radius)[..., None]
+        )
+
+        # A color can only be misplaced if some member other than the
+        # candidates is in reach; compare it with everything in reach.
+        ours = (rows[:, :, None] == found[:, None]).any(axis=-1)
+        inside &= (inside & ~ours[:, None]).any(axis=-1, keepdims=True)
+        cell, color, slot = numpy.nonzero(inside)
+        errors = numpy.zeros(len(low))
+        if not len(cell):
+            return found, errors
+        distances = metric(
+            labs[cell, color],
+            matrix[rows[cell, slot]][:, None]
+        )[:, 0]
+        starts = numpy.flatnonzero(
+            numpy.concatenate([
+                [True],
+                (cell[1:] != cell[:-1]) | (color[1:] != color[:-1])
+            ])
+        )
+        numpy.maximum.at(
+            errors,
+            cell[starts],
+            numpy.minimum.reduceat(
+                numpy.where(ours[cell, slot], distances, numpy.inf),
+                starts
+            )
+            - numpy.minimum.reduceat(distances, starts)
+        )
+
+        for index in numpy.flatnonzero(errors > tolerance):
+            near = rows[index, valid[index]]
+            distances = metric(labs[index], matrix[near])
+            best = distances.min(axis=1)
+            winners = numpy.unique(near[
+                (distances <= best[:, None] * (1 + 1e-9)).argmax(axis=1)
+            ])
+            distances = distances[:, numpy.isin(near, winners)]
+
+            # Take the member cutting the largest error most, until there
+            # is no error left or no slot to put another member in.
+            chosen = []
+            reached = numpy.full(len(best), numpy.inf)
+            while len(chosen) < 8 and (reached > best).any():
+                worst = (numpy.minimum(reached[:, None], distances)
+                         - best[:, None]).max(axis=0)
+                worst[chosen] = numpy.inf
+                chosen.append(int(worst.argmin()))
+                reached = numpy.minimum(reached, distances[:, chosen[-1]])
+            error = max((reached - best).max(), 0)
+            if error < errors[index]:
+                found[index] = numpy.pad(
+                    winners[chosen],
+                    (0, 8 - len(chosen)),
+                    mode='edge'
+                )
+                errors[index] = error
+        return found, errors
+
+    @staticmethod
+    def __squares(labs: numpy.ndarray, points: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get squared Lab distances from colors to points, cell by cell.
+
+        Args:
+            labs: ``(K, N, 3)`` array of the colors of each cell.
+            points: ``(K, P, 3)`` array of the points of each cell.
+
+        Returns:
+            ``(K, N, P)`` array a little below the squared distances, so
+            that rounding cannot put a point out of reach.
+        """
+        norms = numpy.square(labs).sum(axis=-1)[..., None]
+        point_norms = numpy.square(points).sum(axis=-1)[:, None]
+        squares = norms + point_norms - 2 * labs @ points.transpose(0, 2, 1)
+        return squares - 1e-9 * (norms + point_norms)
@@ -630,7 +630,6 @@ class Wiki(base.ColorGroup):
     PigmentGreen       = base.RGBColor(  0, 165,  80)
     RYBGreen           = base.RGBColor(102, 176,  50)
     GreenBlue          = base.RGBColor( 17, 100, 180)
-    GreenBlue          = base.RGBColor( 17, 100, 180)
     GreenCyan          = base.RGBColor(  0, 153, 102)
     GreenLizard        = base.RGBColor(167, 244,  50)
     GreenSheen         = base.RGBColor(110, 174, 161)
@@ -918,7 +917,6 @@ class Wiki(base.ColorGroup):
     MidnightGreen         = base.RGBColor(  0,  73,  83)
     EagleGreen            = base.RGBColor(  0,  73,  83)
     MikadoYellow          = base.RGBColor(255, 196,  12)
-    MikadoYellow          = base.RGBColor(255, 196,  12)
     Milk                  = base.RGBColor(253, 255, 245)
     MilkChocolate         = base.RGBColor(132,  86,  60)
     MimiPink              = base.RGBColor(255, 218, 233)
@@ -1311,7 +1309,6 @@ class Wiki(base.ColorGroup):
     Sienna               = base.RGBColor(136,  45,  23)
     Silver               = base.RGBColor(192, 192, 192)
     CrayolaSilver        = base.RGBColor(201, 192, 187)
-    MetallicSilver       = base.RGBColor(170, 169, 173)
     SilverChalice        = base.RGBColor(172, 172, 172)
     SilverFoil           = base.RGBColor(175, 177, 174)
     SilverLakeBlue       = base.RGBColor( 93, 137, 186)
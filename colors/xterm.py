@@ -1,8 +1,19 @@
 """Contains the implementation of the xterm (256) color group."""
 import enum
 import functools
+import typing
+
+import numpy
 
 from colors import base
+from colors import convert
+from colors import diff
+
+CUBE_LEVELS = numpy.array([0, 95, 135, 175, 215, 255])
+"""Channel levels of the 6x6x6 color cube (indexes 16-231)."""
+
+GRAY_LEVELS = numpy.arange(8, 239, 10)
+"""Levels of the 24-step grayscale ramp (indexes 232-255)."""
 
 
 class Xterm(base.ColorGroup):
@@ -291,3 +302,286 @@ class Xterm(base.ColorGroup):
                 type(self).__members__.keys()
             ).index(self.name)
             return self.__index
+
+    @classmethod
+    def quantize(
+        cls,
+        color: typing.Union[base.ColorGroup, base.BaseColor, base.RGB24],
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> 'Xterm':
+        """
+        Find the closest xterm color using the structure of the palette.
+
+        This gives the same member as :py:meth:`closest`, without its
+        cache. It is :py:meth:`quantize_many` for a single color; the cube
+        cell of an 8-bit color is found from its channels as integers.
+        """
+        metric = cls._metric_for(metric)
+        packed = cls._packed_value(color)
+        if packed is None or metric.scale is None:
+            row = cls._closest_rows(cls._lab_array([color]), metric)[0]
+            return cls._members()[cls._positions()[row]]
+
+        rgb = [packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF]
+        labs = convert.rgb8_to_lab(numpy.array([rgb]))
+        row = cls._quantize_one(rgb, labs[0], metric)
+        if row is None:
+            row = cls._quantize_rows(numpy.array([rgb]), labs, metric)[0]
+        return cls._members()[cls._positions()[row]]
+
+    @classmethod
+    def quantize_many(
+        cls,
+        rgb: numpy.ndarray,
+        metric: typing.Union[str, diff.Metric, None] = None
+    ) -> numpy.ndarray:
+        """
+        Find the closest xterm colors for an array of 8-bit sRGB colors.
+
+        The results are those of :py:meth:`closest_many` with
+        ``indices=True``, found by scoring only a few members per color
+        with the full formula:
+
+        * The corners of the cube cell around each color are computed
+          from its channels, and the two grayscale steps around its
+          lightness looked up. The closest of them gives an upper bound on
+          the distance to the closest member.
+        * Every delta E formula with a scale factor (see
+          :py:mod:`colors.diff`) is at least that factor times the
+          Euclidean Lab distance, so only members within ``bound /
+          factor`` in Lab can be closer. They are found with one matrix
+          product and compared with the full formula; usually, there are
+          none besides the closest corner or step.
+
+        The arithmetic candidates alone are not exact: the closest member
+        under CMC can be two cube levels or three grayscale steps away
+        from the nearest ones, or one of the 16 system colors. The
+        Euclidean pass that rules the others out still takes a dot
+        product with each of the palette's 247 distinct colors, so each
+        color costs O(palette) work, if far less than the full formula
+        over every member that :py:meth:`closest` used to take.
+
+        Formulas without a scale factor (CIEDE2000) are compared with every
+        member instead.
+
+        :py:meth:`closest` and :py:meth:`closest_many` search this way too,
+        so this only skips their handling of other kinds of colors.
+
+        Args:
+            rgb: ``(N, 3)`` array of red, green and blue levels (0-255).
+            metric: Delta E formula to use instead of the group's default.
+
+        Returns:
+            ``(N,)`` array of xterm color indexes.
+        """
+        metric = cls._metric_for(metric)
+        rgb = numpy.asarray(rgb).reshape(-1, 3)
+        labs = convert.rgb8_to_lab(rgb)
+        if metric.scale is None:
+            return cls._positions()[cls._closest_rows(labs, metric)]
+        return cls._positions()[cls._quantize_rows(rgb, labs, metric)]
+
+    @classmethod
+    def _closest_rows(
+        cls,
+        labs: numpy.ndarray,
+        metric: diff.Metric
+    ) -> numpy.ndarray:
+        """
+        Get the Lab matrix row closest to each of the given Lab colors.
+
+        Formulas with a scale factor are searched as in
+        :py:meth:`quantize_many`, with the cube cells found from the
+        colors' sRGB values. Any cell gives an upper bound on the distance
+        to the closest member, so colors out of the sRGB gamut, or whose
+        values are rounded on the way back to sRGB, are still exact.
+        """
+        if metric.scale is None:
+            return super()._closest_rows(labs, metric)
+        labs = numpy.asarray(labs, dtype=float).reshape(-1, 3)
+        rgb = convert.xyz_to_rgb(convert.lab_to_xyz(labs, 'd65')) * 255
+        if len(labs) == 1:
+            row = cls._quantize_one(rgb[0].tolist(), labs[0], metric)
+            if row is not None:
+                return numpy.array([row], dtype=numpy.intp)
+        return cls._quantize_rows(rgb, labs, metric)
+
+    @classmethod
+    def _quantize_rows(
+        cls,
+        rgb: numpy.ndarray,
+        labs: numpy.ndarray,
+        metric: diff.Metric
+    ) -> numpy.ndarray:
+        """
+        Find the Lab matrix row of the closest member to each color.
+
+        This is the search of :py:meth:`quantize_many`, for a formula with
+        a scale factor: the full formula only scores the arithmetic
+        candidates and the members the Euclidean pass over the whole
+        palette cannot rule out.
+        """
+        labs = numpy.asarray(labs, dtype=float).reshape(-1, 3)
+        rgb = numpy.asarray(rgb, dtype=float).reshape(-1, 3)
+        cube_rows, gray_rows, distinct, points, norms = cls._palette_rows()
+
+        # Cube levels are 0, 95, 135, ..., 255: the level above a channel
+        # is the first one, or one of the next four, 40 apart.
+        upper = numpy.where(rgb <= 95, 1, (rgb - 56) // 40 + 1)
+        levels = upper.astype(numpy.intp).clip(1, 5)[:, :, numpy.newaxis]
+        levels = levels + numpy.arange(-1, 1)
+        cube = cube_rows[
+            levels[:, 0, :, numpy.newaxis, numpy.newaxis],
+            levels[:, 1, numpy.newaxis, :, numpy.newaxis],
+            levels[:, 2, numpy.newaxis, numpy.newaxis, :]
+        ].reshape(len(rgb), -1)
+
+        matrix = cls._lab_matrix()
+        step = numpy.searchsorted(matrix[gray_rows, 0], labs[:, 0])
+        step = step.clip(1, len(gray_rows) - 1)
+        gray = gray_rows[step[:, numpy.newaxis] + numpy.arange(-1, 1)]
+
+        candidates = numpy.concatenate([cube, gray], axis=1)
+        distances, scale = metric.measure(labs, matrix[candidates])
+        best = distances.argmin(axis=1)
+        result = candidates[numpy.arange(len(labs)), best]
+        bound = distances[numpy.arange(len(labs)), best]
+
+        # Members whose Euclidean distance is within bound / scale, with
+        # slack for rounding in the matrix product (extra members are only
+        # compared, never wrongly picked). The closest candidate is one of
+        # them, so colors with no other are done.
+        squares = numpy.einsum('ij,ij->i', labs, labs)
+        radius = bound / scale * (1 + 1e-6) + 1e-6
+        limit = radius * radius - squares + 1e-9 * (squares + norms.max())
+        rows = []
+        columns = []
+        step = cls._chunk_size(len(distinct))
+        for start in range(0, len(labs), step):
+            chunk_rows, chunk_columns = numpy.nonzero(
+                labs[start:start + step] @ (-2 * points.T) + norms
+                <= limit[start:start + step, numpy.newaxis]
+            )
+            rows.append(chunk_rows + start)
+            columns.append(chunk_columns)
+        rows = numpy.concatenate(rows)
+        columns = numpy.concatenate(columns)
+        contested = numpy.bincount(rows, minlength=len(labs))[rows] > 1
+        rows = rows[contested]
+        columns = columns[contested]
+        if not len(rows):
+            return result
+
+        # Pairs come sorted by row, then by member: the first pair tied
+        # with a row's minimum is its lowest-indexed closest member.
+        scores = metric(labs[rows], points[columns][:, numpy.newaxis])[:, 0]
+        starts = numpy.flatnonzero(numpy.r_[True, rows[1:] != rows[:-1]])
+        counts = numpy.diff(numpy.r_[starts, len(rows)])
+        minima = numpy.minimum.reduceat(scores, starts)
+        hits = numpy.flatnonzero(
+            scores <= numpy.repeat(minima, counts) * (1 + base.TIE_TOLERANCE)
+        )
+        first = hits[numpy.r_[True, rows[hits][1:] != rows[hits][:-1]]]
+        result[rows[first]] = distinct[columns[first]]
+        return result
+
+    @classmethod
+    def _quantize_one(
+        cls,
+        rgb: typing.Sequence[float],
+        lab: numpy.ndarray,
+        metric: diff.Metric
+    ) -> typing.Optional[int]:
+        """
+        Find the Lab matrix row of the closest member to one color.
+
+        This is _quantize_rows() in plain numbers (see
+        :py:meth:`colors.diff.Metric.single`), which is faster for a single
+        color. The members left after pruning are compared as in
+        :py:meth:`base.ColorGroup._closest_of_rows`, so the result is the
+        same.
+
+        Args:
+            rgb: Red, green and blue levels (0-255) of the color.
+            lab: ``(3,)`` array of its Lab values.
+            metric: Delta E formula with a scale factor.
+
+        Returns:
+            The row, or None if the metric has no plain float form for the
+            color.
+        """
+        values = lab.tolist()
+        cube_rows, gray_rows, distinct, points, norms = cls._palette_rows()
+        matrix = cls._lab_matrix()
+
+        lower = [
+            0 if level <= 95 else min(int((level - 56) // 40), 4)
+            for level in rgb
+        ]
+        step = int(numpy.searchsorted(matrix[gray_rows, 0], values[0]))
+        step = min(max(step, 1), len(gray_rows) - 1)
+        candidates = cube_rows[
+            lower[0]:lower[0] + 2,
+            lower[1]:lower[1] + 2,
+            lower[2]:lower[2] + 2
+        ].ravel().tolist() + gray_rows[step - 1:step + 1].tolist()
+        measured = metric.single(values, matrix[candidates].tolist())
+        if measured is None:
+            return None
+
+        distances, scale = measured
+        square = sum(value * value for value in values)
+        radius = min(distances) / scale * (1 + 1e-6) + 1e-6
+        limit = radius * radius - square + 1e-9 * (square + norms.max())
+        hits = numpy.flatnonzero(points @ (-2 * lab) + norms <= limit)
+        if not len(hits):
+            return None
+        if len(hits) == 1:
+            return int(distinct[hits[0]])
+        return cls._closest_of_rows(lab, distinct[hits].tolist(), metric)
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _palette_rows(cls) -> typing.Tuple[numpy.ndarray, ...]:
+        """
+        Get the Lab matrix rows of the cube and grayscale colors.
+
+        The members are looked up by color, so the rows do not depend on
+        where in the group they are defined; of members sharing a color,
+        the first one's row is used, as it is what a search picks.
+
+        Returns:
+            ``(6, 6, 6)`` array of the rows of the cube colors, indexed by
+            the positions of their levels in :py:data:`CUBE_LEVELS`; the
+            rows of the :py:data:`GRAY_LEVELS` steps; and the rows with a
+            distinct color, with their Lab values and those values' squared
+            norms.
+        """
+        rows = {
+            position: row
+            for row, position in enumerate(cls._positions().tolist())
+        }
+        members = cls._value_members()
+        positions = cls._member_index()
+
+        def lookup(*levels: numpy.ndarray) -> numpy.ndarray:
+            packed = convert.pack_rgb(numpy.stack(levels, axis=-1))
+            found = [
+                rows[positions[members[value][0]]]
+                for value in packed.tolist()
+            ]
+            return numpy.array(found, dtype=numpy.intp).reshape(
+                levels[0].shape
+            )
+
+        cube = lookup(*numpy.meshgrid(*[CUBE_LEVELS] * 3, indexing='ij'))
+        gray = lookup(GRAY_LEVELS, GRAY_LEVELS, GRAY_LEVELS)
+        distinct = numpy.sort(numpy.array(
+            [rows[positions[found[0]]] for found in members.values()],
+            dtype=numpy.intp
+        ))
+        points = cls._lab_matrix()[distinct]
+        points.flags.writeable = False
+        norms = numpy.einsum('ij,ij->i', points, points)
+        norms.flags.writeable = False
+        return cube, gray, distinct, points, norms
@@ -0,0 +1,20 @@
+"""Fixtures shared by the tests."""
+
+import pytest
+
+from colors import base
+
+
+def _make_group(name, levels):
+    """Create a group with a member for each of the given 8-bit colors."""
+    namespace = base.ColorGroupMeta.__prepare__(name, (base.ColorGroup,))
+    namespace['__module__'] = __name__
+    for number, (red, green, blue) in enumerate(levels):
+        namespace[f'Color{number}'] = base.RGBColor(red, green, blue)
+    return base.ColorGroupMeta(name, (base.ColorGroup,), namespace)
+
+
+@pytest.fixture(scope='session')
+def make_group():
+    """Get a factory of groups with a member for each given 8-bit color."""
+    return _make_group
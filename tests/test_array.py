@@ -0,0 +1,161 @@
+"""Tests for the columnar color arrays."""
+
+import colormath.color_conversions
+import colormath.color_objects
+import numpy
+import pytest
+
+from colors import base, convert
+
+SPACES = sorted(base.ColorMeta._ColorMeta__class_registry)
+
+
+@pytest.fixture
+def rgb():
+    """Random sRGB colors, with the corners of the cube."""
+    rng = numpy.random.default_rng(0)
+    corners = numpy.stack(
+        numpy.meshgrid(*[[0.0, 1.0]] * 3, indexing='ij'),
+        axis=-1
+    ).reshape(-1, 3)
+    return numpy.concatenate([rng.uniform(size=(50, 3)), corners])
+
+
+def test_construct_from_lists_and_arrays(rgb):
+    """Lists and arrays of channel values give the same array."""
+    from_list = base.ColorArray(rgb.tolist())
+    from_array = base.ColorArray(rgb, base.sRGBColor)
+    for array in (from_list, from_array):
+        assert array.space is base.sRGBColor
+        assert len(array) == len(rgb)
+        numpy.testing.assert_array_equal(array.values, rgb)
+        numpy.testing.assert_array_equal(array.channels, rgb.T)
+    assert from_array.illuminant is None
+
+    labs = base.ColorArray([[50, 10, -10]], 'lab', illuminant='D65')
+    assert (labs.illuminant, labs.observer) == ('d65', '2')
+    assert base.ColorArray([[50, 10, -10]], 'lab').illuminant == 'd50'
+
+
+def test_construct_from_colors_and_packed(rgb):
+    """Single colors and packed values give the arrays of their channels."""
+    packed = convert.pack_rgb(numpy.rint(rgb * 255).astype(int))
+    from_packed = base.ColorArray.from_packed(packed)
+    colors = [base.RGB24(value) for value in packed.tolist()]
+    from_colors = base.ColorArray.from_colors(colors)
+    numpy.testing.assert_array_equal(from_colors.values, from_packed.values)
+    assert [color.hex for color in from_colors] == [
+        color.hex for color in colors
+    ]
+    assert len(base.ColorArray.from_colors([])) == 0
+
+
+@pytest.mark.parametrize(
+    'values, space',
+    [([[0, 0]], 'srgb'), ([0, 0, 0], 'srgb'), ([[0, 0, 0]], 'rgb')]
+)
+def test_construct_rejects(values, space):
+    """Values of the wrong shape and unknown spaces are rejected."""
+    with pytest.raises(ValueError):
+        base.ColorArray(values, space)
+
+
+def test_from_colors_rejects_mixed_spaces():
+    """Colors in different spaces do not make one array."""
+    color = base.RGBColor(12, 34, 56)
+    with pytest.raises(ValueError):
+        base.ColorArray.from_colors([color, color.lab])
+
+
+@pytest.mark.parametrize('space', SPACES)
+def test_conversions_match_colormath(rgb, space):
+    """Converting the array converts every color like colormath does."""
+    cls = base.ColorArray.color_class(space)
+    target = getattr(colormath.color_objects, cls.__name__)
+    converted = getattr(base.ColorArray(rgb), space)
+    assert converted.space is cls
+    expected = [
+        colormath.color_conversions.convert_color(
+            colormath.color_objects.sRGBColor(*values),
+            target
+        ).get_value_tuple()
+        for values in rgb.tolist()
+    ]
+    numpy.testing.assert_allclose(converted.values, expected, atol=1e-9)
+    color = base.sRGBColor(
+        colormath.color_objects.sRGBColor(*rgb[3].tolist())
+    )
+    single = getattr(color, space)
+    assert type(converted[3]) is type(single)
+    numpy.testing.assert_allclose(
+        converted[3]._color.get_value_tuple(),
+        single._color.get_value_tuple(),
+        atol=1e-9
+    )
+
+
+def test_conversions_are_kept(rgb):
+    """Converting twice gives the same array."""
+    colors = base.ColorArray(rgb)
+    assert colors.lab is colors.lab
+    assert colors.convert('lab') is colors.lab
+    assert colors.lab.srgb is colors.lab.srgb
+
+
+
+def test_conversions_start_from_kept_intermediates(rgb, monkeypatch):
+    """Converting to lab after xyz converts the kept xyz array."""
+    colors = base.ColorArray(rgb)
+    xyz = colors.xyz
+    calls = []
+    kernel = convert.convert
+
+    def record(values, source, target, *args):
+        calls.append((values, source, target))
+        return kernel(values, source, target, *args)
+
+    monkeypatch.setattr(convert, 'convert', record)
+    labs = colors.lab
+    ((values, source, target),) = calls
+    assert source is colormath.color_objects.XYZColor
+    assert target is colormath.color_objects.LabColor
+    assert numpy.shares_memory(values, xyz.channels)
+    numpy.testing.assert_allclose(
+        labs.values,
+        convert.srgb_to_lab(rgb),
+        atol=1e-9
+    )
+
+    # Without a kept intermediate, the conversion starts from the colors.
+    calls.clear()
+    base.ColorArray(rgb).lab
+    assert calls[0][1] is colormath.color_objects.sRGBColor
+
+def test_slices_are_views(rgb):
+    """Slicing shares the channels, and selecting copies them."""
+    colors = base.ColorArray(rgb)
+    part = colors[10:20:2]
+    assert len(part) == 5
+    assert numpy.shares_memory(part.channels, colors.channels)
+    numpy.testing.assert_array_equal(part.values, rgb[10:20:2])
+    assert part.lab[0] == colors.lab[10]
+
+    picked = colors[numpy.array([1, 3])]
+    masked = colors[numpy.arange(len(rgb)) < 2]
+    assert not numpy.shares_memory(picked.channels, colors.channels)
+    numpy.testing.assert_array_equal(picked.values, rgb[[1, 3]])
+    numpy.testing.assert_array_equal(masked.values, rgb[:2])
+    assert isinstance(colors[-1], base.sRGBColor)
+
+
+def test_channels_are_read_only(rgb):
+    """Neither the channels nor their views can be written."""
+    colors = base.ColorArray(rgb)
+    for values in (colors.channels, colors.values, colors[1:].channels,
+                   colors.lab.channels):
+        assert not values.flags.writeable
+        with pytest.raises(ValueError):
+            values[0, 0] = 0.5
+    # The array does not share the values it was created from.
+    rgb[0] = 0.5
+    assert colors.values[0, 0] != 0.5
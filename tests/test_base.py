@@ -0,0 +1,225 @@
+"""Tests for the core color classes."""
+
+import colormath.color_conversions
+import colormath.color_objects
+import numpy
+import pytest
+
+from colors import base, convert
+from colors.x11 import X11
+
+
+@pytest.mark.parametrize(
+    'code',
+    ['#ff0000', 'ff0000', ' #FF0000 ', 'Ff0000', '#f00', 'F00']
+)
+def test_rgb24_from_hex(code):
+    """Hex codes are read like convert.parse_hex() reads them."""
+    assert base.RGB24.from_hex(code) is base.RGB24(0xff0000)
+
+
+@pytest.mark.parametrize(
+    'code',
+    [
+        '0x1234', '+12345', ' 12345', '12_345', '# ff000', 'ff00000',
+        '#gg0000', '#ff00', '#f0', '#g00'
+    ]
+)
+def test_rgb24_from_hex_rejects(code):
+    """Anything but six or three hex digits after a '#' is rejected."""
+    with pytest.raises(ValueError):
+        base.RGB24.from_hex(code)
+
+
+def test_from_hex_many():
+    """Hex codes of either length, with or without '#', are parsed."""
+    codes = ['#0c2238', '0C2238', '#abc', 'ABC', ' #fff ']
+    packed = base.sRGBColor.from_hex_many(codes)
+    numpy.testing.assert_array_equal(
+        packed,
+        [0x0c2238, 0x0c2238, 0xaabbcc, 0xaabbcc, 0xffffff]
+    )
+    numpy.testing.assert_array_equal(
+        base.sRGBColor.from_hex_many('\n'.join(codes).encode()),
+        packed
+    )
+    assert [base.RGB24.from_hex(code).value for code in codes] == (
+        packed.tolist()
+    )
+
+
+def test_from_hex_many_reports_rows():
+    """Every invalid code is reported by its row, after the valid ones."""
+    codes = ['#000001', '#00000g', 'fff', '#ff', None, '#abcdef', '']
+    with pytest.raises(convert.RowError) as info:
+        base.sRGBColor.from_hex_many(codes)
+    numpy.testing.assert_array_equal(info.value.rows, [1, 3, 4, 6])
+    numpy.testing.assert_array_equal(
+        info.value.packed,
+        [1, 0, 0xffffff, 0, 0, 0xabcdef, 0]
+    )
+    assert 'rows 1, 3, 4, 6 (4 in total)' in str(info.value)
+
+
+def test_hex_many_round_trip():
+    """Formatting and parsing back gives the same values and codes."""
+    packed = numpy.random.default_rng(0).integers(0, 1 << 24, size=1000)
+    codes = base.sRGBColor.to_hex_many(packed)
+    assert codes[:3] == [base.RGB24(int(value)).hex for value in packed[:3]]
+    numpy.testing.assert_array_equal(
+        base.sRGBColor.from_hex_many(codes),
+        packed
+    )
+    assert base.sRGBColor.to_hex_many(
+        base.sRGBColor.from_hex_many(codes)
+    ) == codes
+
+
+@pytest.mark.parametrize('levels', [(256, 0, 0), (0, -1, 0), (0, 0, 300)])
+def test_rgb24_from_rgb_rejects(levels):
+    """Color levels must be from 0 to 255."""
+    with pytest.raises(ValueError):
+        base.RGB24.from_rgb(*levels)
+
+
+@pytest.mark.parametrize(
+    'levels',
+    [(256, 0, 0), (0, -1, 0), (0, 0, 300), (0, 255.5, 0)]
+)
+def test_rgbcolor_rejects(levels):
+    """Color levels must be from 0 to 255."""
+    with pytest.raises(ValueError):
+        base.RGBColor(*levels)
+
+
+def test_rgbcolor_is_srgb():
+    """RGBColor() still gives an sRGBColor."""
+    assert isinstance(base.RGBColor(255, 0, 0), base.sRGBColor)
+
+
+def test_rgbcolor_is_flyweight():
+    """RGBColor() gives the instance of the equal colormath color."""
+    color = base.RGBColor(12, 34, 56)
+    assert color is base.sRGBColor(
+        colormath.color_objects.sRGBColor(12, 34, 56, is_upscaled=True)
+    )
+    assert color is base.sRGBColor.from_hex('#0c2238')
+    assert color is base.RGB24(0x0c2238).srgb
+
+
+
+def test_flyweight_keeps_through_rgb():
+    """Colors converting through different RGB spaces are not shared."""
+    plain = colormath.color_objects.XYZColor(0.2, 0.3, 0.4)
+    adobe = colormath.color_objects.XYZColor(0.2, 0.3, 0.4)
+    adobe._through_rgb_type = colormath.color_objects.AdobeRGBColor
+    assert base.XYZColor(plain) is not base.XYZColor(adobe)
+    assert base.XYZColor(adobe) is base.XYZColor(adobe)
+    for value in (plain, adobe):
+        expected = colormath.color_conversions.convert_color(
+            value,
+            colormath.color_objects.sRGBColor
+        )
+        numpy.testing.assert_allclose(
+            base.XYZColor(value).srgb._color.get_value_tuple(),
+            expected.get_value_tuple(),
+            atol=1e-9
+        )
+
+def test_rgbcolor_defers_colormath():
+    """Colors from 8-bit levels create their colormath object when used."""
+    color = base.RGBColor(1, 2, 254)
+    slot = base.BaseColor._BaseColor__color
+    with pytest.raises(AttributeError):
+        slot.__get__(color)
+    assert (color.red, color.green, color.blue) == (1, 2, 254)
+    assert X11._packed_value(color) == 0x0102fe
+    with pytest.raises(AttributeError):
+        slot.__get__(color)
+    assert color.hex == '#0102fe'
+    assert slot.__get__(color).get_upscaled_value_tuple() == (1, 2, 254)
+
+
+def test_rgbcolor_accepts_fractional_levels():
+    """Fractional levels are kept, as the colors are not 8-bit."""
+    color = base.RGBColor(127.5, 0, 0)
+    assert color._color.rgb_r == 0.5
+    assert X11._packed_value(color) is None
+    assert base.RGBColor(255.0, 0, 0)._color.rgb_r == 1.0
+
+
+
+def test_colors_have_no_dict():
+    """Colors keep their values in slots, without an instance __dict__."""
+    color = base.RGBColor(12, 34, 56)
+    color.hex, color.value_tuple
+    for attr_name in base.ColorMeta._ColorMeta__class_registry:
+        converted = getattr(color, attr_name)
+        converted.value_tuple
+        assert not hasattr(converted, '__dict__')
+        with pytest.raises(AttributeError):
+            converted.extra = None
+    assert not hasattr(base.RGB24(0x0c2238), '__dict__')
+
+def test_member_colors_are_lazy():
+    """Defining a group creates no colormath objects for its members."""
+    slot = base.BaseColor._BaseColor__color
+    namespace = base.ColorGroupMeta.__prepare__('Group', (base.ColorGroup,))
+    namespace['__module__'] = __name__
+    namespace['First'] = base.RGBColor(3, 1, 4)
+    namespace['Second'] = base.RGBColor(3, 1, 4)
+    group = base.ColorGroupMeta('Group', (base.ColorGroup,), namespace)
+    assert [member.name for member in group] == ['First', 'Second']
+    assert group.Second.value is not group.First.value
+    assert group.closest(base.RGBColor(3, 1, 5)) is group.First
+    for member in group:
+        with pytest.raises(AttributeError):
+            slot.__get__(member.value)
+
+
+@pytest.mark.parametrize('value', [
+    base.RGBColor(255, 0, 0),
+    base.RGB24(0xff0000),
+    base.sRGBColor.from_hex('#ff0000'),
+])
+def test_lookup_by_color(value):
+    """Members are found by any 8-bit color equal to theirs."""
+    assert X11(value) is X11.Red
+
+
+def test_lookup_prefers_own_value():
+    """A member sharing its color with an earlier one is found by value."""
+    twin = X11.Red1
+    assert twin.hex == X11.Red.hex
+    assert X11(twin.value) is twin
+
+
+def test_lookup_missing():
+    """Colors that no member has are not found."""
+    with pytest.raises(ValueError):
+        X11(base.RGB24(0x010203))
+
+
+def test_rgb24_equality():
+    """RGB24 colors compare by value, and sRGB colors by identity."""
+    color = base.RGB24(0xff0000)
+    assert color == base.RGB24.from_rgb(255, 0, 0)
+    assert hash(color) == hash(0xff0000)
+    assert color != base.RGB24(0xfe0000)
+    assert color != 0xff0000
+    assert color != base.RGBColor(255, 0, 0)
+    assert color.srgb == base.RGBColor(255, 0, 0)
+
+    srgb = base.RGBColor(255, 0, 0)
+    twin = srgb.twin()
+    assert twin != srgb
+    assert len({srgb, twin, srgb}) == 2
+    assert hash(srgb) == object.__hash__(srgb)
+
+
+@pytest.mark.parametrize('cls', [base.RGB24, base.ColorArray])
+def test_conversion_properties(cls):
+    """Every registered color class has a conversion property."""
+    for attr_name in base.ColorMeta._ColorMeta__class_registry:
+        assert isinstance(vars(cls)[attr_name], property)
+    assert base.RGB24(0x0c2238).lab is base.RGBColor(12, 34, 56).lab
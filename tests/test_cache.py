@@ -0,0 +1,113 @@
+"""Tests for the instance registry behind the flyweight colors."""
+
+import gc
+
+import pytest
+
+from colors import base, cache
+
+
+class Item:
+    """Weakly referenceable object to register."""
+
+
+def register(registry, keys):
+    """Register a new item under each key, keeping no reference to it."""
+    for key in keys:
+        registry[key] = Item()
+
+
+def test_unpinned_instance_is_collected():
+    """Nothing keeps an instance alive once it is unused and unpinned."""
+    registry = cache.InstanceRegistry(maxsize=0)
+    item = Item()
+    registry['key'] = item
+    assert registry['key'] is item
+    assert registry.info() == cache.RegistryInfo(1, 0, 0)
+
+    del item
+    gc.collect()
+    assert 'key' not in registry
+    assert len(registry) == 0
+    with pytest.raises(KeyError):
+        registry['key']
+
+
+def test_pinned_instances_stay_at_maxsize():
+    """Only the most recently used instances are kept alive."""
+    registry = cache.InstanceRegistry(maxsize=3)
+    register(registry, range(10))
+    gc.collect()
+    assert registry.info() == cache.RegistryInfo(3, 3, 3)
+    assert [key in registry for key in range(10)] == [False] * 7 + [True] * 3
+
+    # Using an instance makes it the most recent one.
+    registry[7]
+    register(registry, [10, 11])
+    gc.collect()
+    assert sorted(key for key in range(12) if key in registry) == [7, 10, 11]
+
+    registry.maxsize = 1
+    gc.collect()
+    assert registry.info() == cache.RegistryInfo(1, 1, 1)
+    assert 11 in registry
+
+
+def test_held_instances_outlive_the_pins():
+    """Instances in use stay registered beyond the pinned ones."""
+    registry = cache.InstanceRegistry(maxsize=2)
+    held = [Item() for _ in range(5)]
+    for key, item in enumerate(held):
+        registry[key] = item
+    gc.collect()
+    assert registry.info() == cache.RegistryInfo(5, 2, 2)
+    assert all(registry[key] is item for key, item in enumerate(held))
+
+
+def test_unlimited_registry():
+    """Without a size, every instance is pinned."""
+    registry = cache.InstanceRegistry(maxsize=None)
+    register(registry, range(100))
+    gc.collect()
+    assert registry.info() == cache.RegistryInfo(100, 100, None)
+    with pytest.raises(ValueError):
+        registry.maxsize = -1
+    with pytest.raises(ValueError):
+        cache.InstanceRegistry(maxsize=-1)
+
+
+def test_clear():
+    """Clearing forgets every instance, but leaves them usable."""
+    registry = cache.InstanceRegistry(maxsize=4)
+    item = Item()
+    registry['held'] = item
+    register(registry, 'abc')
+    assert registry.info() == cache.RegistryInfo(4, 4, 4)
+
+    registry.clear()
+    assert registry.info() == cache.RegistryInfo(0, 0, 4)
+    assert 'held' not in registry
+    registry['held'] = Item()
+    assert registry['held'] is not item
+
+
+def test_color_instances_are_collected():
+    """Unused colors are rebuilt once they fall out of the registry."""
+    instances = base.sRGBColor.instances
+    maxsize = instances.maxsize
+    instances.maxsize = 0
+    try:
+        color = base.RGBColor(3, 141, 59)
+        assert base.RGBColor(3, 141, 59) is color
+        # Let the colors other tests left unused go first.
+        gc.collect()
+        live = instances.info().live
+
+        del color
+        gc.collect()
+        assert instances.info().live == live - 1
+        color = base.RGBColor(3, 141, 59)
+        assert color.hex == '#038d3b'
+        assert instances.info().pinned == 0
+    finally:
+        instances.maxsize = maxsize
@@ -0,0 +1,242 @@
+"""Tests for the conversion kernels, checked against colormath."""
+
+import itertools
+import random
+
+import numpy
+import pytest
+from colormath import color_conversions
+from colormath import color_objects
+
+from colors import convert
+
+CLASSES = (
+    color_objects.sRGBColor,
+    color_objects.AdobeRGBColor,
+    color_objects.AppleRGBColor,
+    color_objects.XYZColor,
+    color_objects.LabColor,
+    color_objects.LCHabColor,
+    color_objects.LuvColor,
+    color_objects.LCHuvColor,
+    color_objects.xyYColor,
+    color_objects.HSVColor,
+    color_objects.HSLColor,
+    color_objects.CMYColor,
+    color_objects.CMYKColor,
+    color_objects.IPTColor,
+)
+
+TOLERANCE = 1e-6
+
+
+def sources(source):
+    """Get colors of the ``source`` class, from corners and random RGB."""
+    rng = random.Random(0)
+    rgbs = [
+        (0, 0, 0), (1, 1, 1), (1, 0, 0), (0, 1, 0), (0, 0, 1),
+        (0.5, 0.5, 0.5), (1, 1, 0), (0, 1, 1),
+    ] + [tuple(rng.random() for _ in range(3)) for _ in range(24)]
+    return [
+        color_conversions.convert_color(
+            color_objects.sRGBColor(*rgb),
+            source
+        )
+        for rgb in rgbs
+    ]
+
+
+def assert_close(expected, actual, target):
+    """Compare converted values, treating hue angles as circular."""
+    difference = numpy.abs(numpy.subtract(expected, actual))
+    if target in (color_objects.LCHabColor, color_objects.LCHuvColor):
+        difference[..., 2] = numpy.minimum(
+            difference[..., 2],
+            360 - difference[..., 2]
+        )
+    assert difference.max() <= TOLERANCE
+
+
+@pytest.mark.parametrize(
+    'source, target',
+    list(itertools.product(CLASSES, CLASSES)),
+    ids=lambda cls: cls.__name__
+)
+def test_convert_matches_colormath(source, target):
+    """Scalar and array conversions agree with colormath."""
+    colors = sources(source)
+    expected = [
+        color_conversions.convert_color(color, target) for color in colors
+    ]
+    for color, reference in zip(colors, expected):
+        actual = convert.convert_color(color, target)
+        assert type(actual) is type(reference)
+        assert (
+            getattr(actual, 'illuminant', None)
+            == getattr(reference, 'illuminant', None)
+        )
+        assert actual._through_rgb_type is reference._through_rgb_type
+        assert_close(
+            reference.get_value_tuple(),
+            actual.get_value_tuple(),
+            target
+        )
+
+    assert_close(
+        [color.get_value_tuple() for color in expected],
+        convert.convert_colors(colors, target),
+        target
+    )
+
+
+@pytest.mark.parametrize(
+    'source, target',
+    list(itertools.product(CLASSES, CLASSES)),
+    ids=lambda cls: cls.__name__
+)
+def test_path_matches_colormath(source, target):
+    """The planned steps are the functions colormath chains."""
+    expected = color_conversions._conversion_manager.get_conversion_path(
+        source,
+        target
+    )
+    assert convert.path(source, target) == tuple(
+        function.__name__ for function in expected
+    )
+
+
+@pytest.mark.parametrize('source, target, through_rgb, expected', [
+    (color_objects.sRGBColor, color_objects.LabColor, None,
+     (color_objects.XYZColor,)),
+    (color_objects.LCHabColor, color_objects.LCHuvColor, None,
+     (color_objects.LabColor, color_objects.XYZColor,
+      color_objects.LuvColor)),
+    (color_objects.HSVColor, color_objects.CMYKColor, None,
+     (color_objects.sRGBColor, color_objects.CMYColor)),
+    (color_objects.HSVColor, color_objects.CMYKColor,
+     color_objects.AppleRGBColor,
+     (color_objects.AppleRGBColor, color_objects.CMYColor)),
+    (color_objects.LabColor, color_objects.HSLColor,
+     color_objects.AppleRGBColor,
+     (color_objects.XYZColor, color_objects.AppleRGBColor)),
+    (color_objects.LabColor, color_objects.AdobeRGBColor,
+     color_objects.AppleRGBColor, (color_objects.XYZColor,)),
+    (color_objects.AdobeRGBColor, color_objects.HSLColor, None, ()),
+    (color_objects.sRGBColor, color_objects.AdobeRGBColor, None, ()),
+])
+def test_intermediates(source, target, through_rgb, expected):
+    """Conversions pass through the classes between their steps."""
+    assert convert.intermediates(source, target, through_rgb) == expected
+
+
+def test_path_between_rgb_spaces():
+    """RGB classes share one node, so converting between them is no step."""
+    assert convert.path(
+        color_objects.AdobeRGBColor,
+        color_objects.sRGBColor
+    ) == ()
+    values = numpy.array([[0.25, 0.5, 0.75]])
+    state = convert.convert(
+        values,
+        color_objects.AdobeRGBColor,
+        color_objects.sRGBColor
+    )
+    assert state.space is color_objects.AdobeRGBColor
+    numpy.testing.assert_array_equal(state.values, values)
+
+
+def test_chain_runs_the_path():
+    """A chain applies the steps of the path in order, once composed."""
+    source, target = color_objects.LCHabColor, color_objects.xyYColor
+    run = convert.chain(source, target)
+    assert convert.chain(source, target) is run
+    lch = numpy.array([[50.0, 30.0, 120.0], [80.0, 0.0, 0.0]])
+    state = convert.State(lch, source, 'd50', '2')
+    for name in convert.path(source, target):
+        state = convert.STEPS[name](state, color_objects.sRGBColor)
+    chained = run(
+        convert.State(lch, source, 'd50', '2'),
+        color_objects.sRGBColor
+    )
+    assert chained.space is state.space is target
+    numpy.testing.assert_array_equal(chained.values, state.values)
+    with pytest.raises(ValueError):
+        convert.path(source, str)
+
+
+def test_rgb8_to_lab_single():
+    """One color converts in plain floats like a batch of them."""
+    packed = numpy.random.default_rng(5).integers(0, 1 << 24, size=500)
+    packed = numpy.concatenate([packed, [0, 0xffffff, 0x010101, 0x0a0b0c]])
+    expected = convert.rgb8_to_lab(convert.unpack_rgb(packed))
+    numpy.testing.assert_allclose(
+        [convert.rgb8_to_lab_single(value) for value in packed.tolist()],
+        expected,
+        rtol=0,
+        atol=1e-11
+    )
+
+
+@pytest.mark.parametrize('step', [1, 8, 64])
+def test_srgb_box_to_lab(step):
+    """Every 8-bit color in an sRGB box, corners included, is in its box."""
+    rng = numpy.random.default_rng(step)
+    low = rng.integers(0, 256 - step, size=(50, 3)) // step * step
+    high = low + step - 1
+    lab_low, lab_high = convert.srgb_box_to_lab(low / 255, high / 255)
+    corners = [low, high] + [
+        numpy.where(numpy.array(mask, dtype=bool), high, low)
+        for mask in itertools.product([0, 1], repeat=3)
+    ]
+    for rgb in corners + [rng.integers(low, high + 1) for _ in range(20)]:
+        labs = convert.srgb_to_lab(rgb / 255)
+        assert (lab_low <= labs).all() and (labs <= lab_high).all()
+
+
+@pytest.mark.parametrize('codes', [
+    ['#ff8800', 'ff8800', '#f80', 'F80', '  #FF8800\t'],
+    b'#ff8800\nff8800\r\n#f80\nF80\n  #FF8800\t\n',
+], ids=['strings', 'bytes'])
+def test_parse_hex(codes):
+    """Long and short codes are read with or without '#', in any case."""
+    packed, invalid = convert.parse_hex(codes)
+    numpy.testing.assert_array_equal(packed, [0xff8800] * 5)
+    assert not invalid.any()
+
+
+def test_parse_hex_invalid():
+    """Invalid codes are masked and parse as 0."""
+    packed, invalid = convert.parse_hex(
+        ['#12345', '#1234567', '#12', '#1g3', '##123', '1 2', '#123', 'é12']
+    )
+    numpy.testing.assert_array_equal(
+        invalid,
+        [True, True, True, True, True, True, False, True]
+    )
+    numpy.testing.assert_array_equal(packed, [0] * 6 + [0x112233, 0])
+    packed, invalid = convert.parse_hex([])
+    assert packed.shape == invalid.shape == (0,)
+
+
+def test_format_hex():
+    """Values are formatted as lower case 6-digit codes."""
+    numpy.testing.assert_array_equal(
+        convert.format_hex([0, 0xabcdef, 0x0000ff]),
+        ['#000000', '#abcdef', '#0000ff']
+    )
+    numpy.testing.assert_array_equal(
+        convert.format_hex(numpy.array([1.0, 255.0])),
+        ['#000001', '#0000ff']
+    )
+
+
+@pytest.mark.parametrize('packed, rows', [
+    ([0, -1, 0x1000000, 5], [1, 2]),
+    ([0.5, 1.0, 2.25], [0, 2]),
+])
+def test_format_hex_reports_rows(packed, rows):
+    """Values that are not 24-bit integers are reported by row."""
+    with pytest.raises(convert.RowError) as info:
+        convert.format_hex(packed)
+    numpy.testing.assert_array_equal(info.value.rows, rows)
+    assert info.value.packed is None
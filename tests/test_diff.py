@@ -0,0 +1,92 @@
+"""Tests for the vectorized delta E formulas."""
+
+import numpy
+import pytest
+
+from colors import diff
+
+
+@pytest.fixture
+def colors():
+    """Get random reference and sample Lab colors."""
+    rng = numpy.random.default_rng(0)
+    labs = rng.uniform([0, -100, -100], [100, 100, 100], size=(20, 3))
+    matrix = rng.uniform([0, -100, -100], [100, 100, 100], size=(30, 3))
+    return labs, matrix
+
+
+@pytest.mark.parametrize('metric', sorted(diff.METRICS))
+def test_measure(colors, metric):
+    """Measuring gives the distances and the scale factors."""
+    labs, matrix = colors
+    metric = diff.metric(metric)
+    distances, scale = metric.measure(labs, matrix)
+    numpy.testing.assert_array_equal(distances, metric(labs, matrix))
+    if metric.scale is None:
+        assert scale is None
+    else:
+        numpy.testing.assert_array_equal(scale, metric.lower_bound(labs))
+
+
+@pytest.mark.parametrize('metric', [
+    diff.metric('cie76'),
+    diff.metric('cie94'),
+    diff.metric('cie94', K_L=2, K_1=0.048, K_2=0.014),
+    diff.metric('cmc'),
+    diff.metric('cmc', pl=1),
+])
+def test_single(colors, metric):
+    """Plain float distances agree with the vectorized ones."""
+    labs, matrix = colors
+    for lab in labs:
+        distances, scale = metric.single(lab.tolist(), matrix.tolist())
+        numpy.testing.assert_allclose(
+            distances,
+            metric(lab, matrix)[0],
+            rtol=1e-12
+        )
+        numpy.testing.assert_allclose(
+            scale,
+            metric.lower_bound(lab)[0],
+            rtol=1e-12
+        )
+
+
+def test_single_declines():
+    """Formulas and colors without a safe plain float form give None."""
+    matrix = [[50.0, 0.0, 0.0]]
+    assert diff.metric('cie2000').single([50.0, 10.0, 10.0], matrix) is None
+    assert diff.metric('cmc').single([16.0, 10.0, 10.0], matrix) is None
+    assert diff.metric('cmc').single([50.0, 0.0, 0.0], matrix) is not None
+
+
+@pytest.mark.parametrize('metric', [
+    diff.metric('cie76'),
+    diff.metric('cie94'),
+    diff.metric('cie94', K_L=2, K_1=0.048, K_2=0.014),
+    diff.metric('cmc'),
+    diff.metric('cmc', pl=1),
+])
+def test_box_bounds(colors, metric):
+    """No reference inside a box is closer or further than its bounds."""
+    _, matrix = colors
+    rng = numpy.random.default_rng(1)
+    center = rng.uniform([0, -100, -100], [100, 100, 100], size=(40, 3))
+    size = rng.choice([0.0, 0.5, 5.0, 50.0], size=(40, 1))
+    low, high = center - size, center + size
+    assert metric.boxed
+    lower, upper = metric.box_bounds(low, high, matrix)
+    assert (lower <= upper).all()
+    for _ in range(50):
+        distances = metric(rng.uniform(low, high), matrix)
+        assert (lower <= distances).all() and (distances <= upper).all()
+    for corner in (low, high):
+        distances = metric(corner, matrix)
+        assert (lower <= distances).all() and (distances <= upper).all()
+
+
+def test_box_bounds_cie2000():
+    """CIEDE2000 cannot bound boxes."""
+    metric = diff.metric('cie2000')
+    assert not metric.boxed
+    assert metric.box_bounds([[0, 0, 0]], [[1, 1, 1]], [[0, 0, 0]]) is None
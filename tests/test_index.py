@@ -0,0 +1,181 @@
+"""Tests for the spatial index and the searches that use it."""
+
+import numpy
+import pytest
+
+from colors import base, convert, diff, index
+
+
+@pytest.fixture(params=['random', 'lattice'])
+def points(request):
+    """Get points to index; the lattice has many duplicates and ties."""
+    rng = numpy.random.default_rng(0)
+    if request.param == 'lattice':
+        return rng.integers(-5, 6, size=(400, 3)).astype(float)
+    return rng.uniform([0, -100, -100], [100, 100, 100], size=(400, 3))
+
+
+@pytest.fixture
+def targets():
+    """Get query points, some on the lattice."""
+    rng = numpy.random.default_rng(1)
+    return numpy.concatenate([
+        rng.uniform(-10, 10, size=(30, 3)),
+        rng.integers(-5, 6, size=(30, 3)).astype(float),
+        rng.uniform([0, -100, -100], [100, 100, 100], size=(30, 3)),
+    ])
+
+
+def squared_distances(points, target):
+    """Get the squared distances from the points to a target."""
+    diffs = points - target
+    return diffs[:, 0] * diffs[:, 0] + diffs[:, 1] * diffs[:, 1] + (
+        diffs[:, 2] * diffs[:, 2]
+    )
+
+
+def test_query(points, targets):
+    """The nearest point is argmin's, lowest index first."""
+    tree = index.KDTree(points)
+    assert len(tree) == len(points)
+    for target in targets:
+        dist_sq = squared_distances(points, target)
+        distance, nearest = tree.query(target)
+        assert nearest == dist_sq.argmin()
+        assert distance == numpy.sqrt(dist_sq.min())
+
+
+@pytest.mark.parametrize('k', [1, 5, 400, 500])
+def test_query_k(points, targets, k):
+    """The k nearest points are sorted by distance, then by index."""
+    tree = index.KDTree(points)
+    for target in targets:
+        dist_sq = squared_distances(points, target)
+        expected = numpy.lexsort((numpy.arange(len(points)), dist_sq))[:k]
+        distances, nearest = tree.query_k(target, k)
+        numpy.testing.assert_array_equal(nearest, expected)
+        numpy.testing.assert_array_equal(
+            distances,
+            numpy.sqrt(dist_sq[expected])
+        )
+
+
+@pytest.mark.parametrize('radius', [0.0, 1.0, 3.0, 20.0])
+def test_query_radius(points, targets, radius):
+    """Points exactly at the radius are included."""
+    tree = index.KDTree(points)
+    for target in targets:
+        dist_sq = squared_distances(points, target)
+        numpy.testing.assert_array_equal(
+            tree.query_radius(target, radius),
+            numpy.flatnonzero(dist_sq <= radius * radius)
+        )
+
+
+def test_empty():
+    """An empty tree finds nothing."""
+    tree = index.KDTree(numpy.empty((0, 3)))
+    assert len(tree) == 0
+    assert tree.query([0, 0, 0]) == (numpy.inf, -1)
+    assert len(tree.query_k([0, 0, 0], 3)[1]) == 0
+    assert len(tree.query_radius([0, 0, 0], 10)) == 0
+
+
+@pytest.fixture(scope='module')
+def group(make_group):
+    """Get a group with repeated colors, so there are ties."""
+    rng = numpy.random.default_rng(2)
+    levels = rng.choice([0, 51, 102, 153, 204, 255], size=(150, 3))
+    levels = numpy.concatenate([levels, rng.integers(0, 256, (150, 3))])
+    return make_group('Group', levels.tolist())
+
+
+@pytest.fixture
+def colors():
+    """Get colors to search for, including some of the group's."""
+    rng = numpy.random.default_rng(3)
+    rgb = numpy.concatenate([
+        rng.integers(0, 256, size=(60, 3)),
+        rng.choice([0, 51, 102, 153, 204, 255], size=(20, 3)),
+    ])
+    return base.ColorArray.from_packed(convert.pack_rgb(rgb))
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    """Make every search use the spatial index."""
+    monkeypatch.setattr(base, 'INDEX_THRESHOLD', 0)
+    monkeypatch.setattr(base, 'RADIUS_INDEX_THRESHOLD', 0)
+
+
+@pytest.mark.parametrize('metric', sorted(diff.METRICS))
+def test_indexed_closest(group, colors, indexed, metric):
+    """Indexed searches find the first member tied with the closest."""
+    distances = diff.metric(metric)(
+        group._lab_array(colors),
+        group._lab_matrix()
+    )
+    least = distances.min(axis=1, keepdims=True)
+    tied = distances <= least * (1 + base.TIE_TOLERANCE)
+    expected = group._positions()[tied.argmax(axis=1)]
+    numpy.testing.assert_array_equal(
+        group.closest_many(colors, indices=True, metric=metric),
+        expected
+    )
+    members = list(group)
+    for color, position in zip(colors[:10], expected):
+        assert group.closest(color, metric) is members[position]
+
+
+@pytest.mark.parametrize('metric', sorted(diff.METRICS))
+@pytest.mark.parametrize('k', [1, 4, 300, 301])
+def test_indexed_closest_k(group, colors, indexed, metric, k):
+    """Indexed k nearest searches match a full sort."""
+    distances = diff.metric(metric)(
+        group._lab_array(colors),
+        group._lab_matrix()
+    )
+    rows = numpy.arange(distances.shape[1])
+    positions, found = group.closest_k_many(
+        colors, k, indices=True, metric=metric
+    )
+    for row, row_positions, row_found in zip(distances, positions, found):
+        order = numpy.lexsort((rows, row))[:k]
+        numpy.testing.assert_array_equal(
+            row_positions,
+            group._positions()[order]
+        )
+        # The tree compares fewer members at once, which can change the
+        # last bits of the distances.
+        numpy.testing.assert_allclose(
+            row_found,
+            row[order],
+            rtol=1e-12,
+            atol=1e-12
+        )
+
+
+@pytest.mark.parametrize('metric', sorted(diff.METRICS))
+def test_indexed_within(group, colors, indexed, metric):
+    """Indexed radius searches keep members exactly at the radius."""
+    distances = diff.metric(metric)(
+        group._lab_array(colors),
+        group._lab_matrix()
+    )
+    rows = numpy.arange(distances.shape[1])
+    radius = numpy.sort(distances[0])[5]
+    found = group.within_many(colors, radius, indices=True, metric=metric)
+    for row, (positions, row_found) in zip(distances, found):
+        hit = row <= radius
+        order = numpy.lexsort((rows[hit], row[hit]))
+        numpy.testing.assert_array_equal(
+            positions,
+            group._positions()[rows[hit][order]]
+        )
+        numpy.testing.assert_allclose(
+            row_found,
+            row[hit][order],
+            rtol=1e-12,
+            atol=1e-12
+        )
+    assert len(found[0][0]) >= 6
@@ -0,0 +1,106 @@
+"""Tests for the lazily loaded package namespace."""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import pytest
+
+import colors
+
+IMPORT_FACTOR = 2
+"""
+Most times longer than a bare interpreter ``import colors`` may run.
+
+Starting the interpreter dominates both, so this only flags a clear
+regression, such as importing numpy or the groups eagerly.
+"""
+
+IMPORT_LIMIT = 0.2
+"""
+Most seconds ``import colors`` may take by its own ``-X importtime`` report.
+
+It takes a few milliseconds, and importing numpy and colormath alone takes
+several hundred, so this is far from any machine's noise.
+"""
+
+
+def run(code, *options):
+    """
+    Run ``code`` in a fresh interpreter and get its output streams.
+
+    The interpreter skips :py:mod:`site`, so that nothing it imports at
+    startup is mistaken for an import of the package.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environ = dict(os.environ)
+    environ['PYTHONPATH'] = os.pathsep.join(
+        [root] + ([environ['PYTHONPATH']] if 'PYTHONPATH' in environ else [])
+    )
+    return subprocess.run(
+        [sys.executable, '-S', *options, '-c', code],
+        check=True,
+        capture_output=True,
+        env=environ,
+        text=True
+    )
+
+
+def test_import_is_lazy():
+    """Importing the package imports neither the groups nor numpy."""
+    loaded = run(
+        'import colors, sys; print(" ".join(sys.modules))'
+    ).stdout.split()
+    for module in ('colors.base', 'numpy', 'colormath'):
+        assert module not in loaded
+
+
+def test_import_time_report():
+    """Importing the package imports no palette, and takes little time."""
+    report = run('import colors', '-X', 'importtime').stderr
+    modules = {}
+    for line in report.splitlines()[1:]:
+        _, cumulative, name = line.split('|')
+        modules[name.strip()] = int(cumulative) / 1e6
+    assert modules['colors'] <= IMPORT_LIMIT
+    imported = set(modules) - {'colors'}
+    assert not {
+        name for name in imported
+        if name.split('.')[0] in ('colormath', 'numpy')
+        or name.startswith('colors.')
+    }
+
+
+def wall_time(code, repeat=5):
+    """Get the median wall time of a fresh interpreter running ``code``."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(code)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+@pytest.mark.skipif(
+    not os.environ.get('COLORS_TIMING_TESTS'),
+    reason='wall-clock timing; set COLORS_TIMING_TESTS to run it'
+)
+def test_import_time():
+    """
+    Importing the package takes little more than starting Python.
+
+    Wall times vary with the load of the machine, so this only runs when
+    asked for; :py:func:`test_import_time_report` checks what the import
+    does with a generous bound, and ``python -m benchmarks.startup``
+    reports the times.
+    """
+    baseline = wall_time('pass')
+    assert wall_time('import colors') <= IMPORT_FACTOR * baseline
+
+
+def test_all_names_resolve():
+    """Every name in __all__ can be imported."""
+    for name in colors.__all__:
+        assert getattr(colors, name).__name__ == name
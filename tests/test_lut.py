@@ -0,0 +1,258 @@
+"""Tests for the lookup tables and the approximate search lattice."""
+
+import os
+
+import numpy
+import pytest
+
+from colors import base, convert, diff, lut
+from colors.wiki import Wiki
+from colors.x11 import X11
+from colors.xterm import Xterm
+
+SMALL = [(0, 0, 0), (255, 0, 0), (0, 128, 128), (255, 255, 255)]
+"""Colors of the small group lookup tables are built for."""
+
+
+@pytest.fixture(scope='module')
+def cache_dir(tmp_path_factory, make_group):
+    """Get a cache directory with a CIE76 table built for the small group."""
+    directory = str(tmp_path_factory.mktemp('cache'))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('COLORS_CACHE_DIR', directory)
+        make_group('Small', SMALL).build_lookup_table(metric='cie76')
+    return directory
+
+
+def test_lookup_table_matches_closest(cache_dir, monkeypatch, make_group):
+    """An attached table answers like the exact search."""
+    monkeypatch.setenv('COLORS_CACHE_DIR', cache_dir)
+    group = make_group('Small', SMALL)
+    table = group.use_lookup_table(metric='cie76')
+    assert os.path.dirname(table.path) == cache_dir
+    assert table.metric == diff.metric('cie76').key
+
+    rng = numpy.random.default_rng(4)
+    packed = rng.integers(0, 1 << 24, size=5000).astype(numpy.uint32)
+    distances = diff.metric('cie76')(
+        convert.rgb8_to_lab(convert.unpack_rgb(packed)),
+        group._lab_matrix()
+    )
+    least = distances.min(axis=1, keepdims=True)
+    expected = (distances <= least * (1 + base.TIE_TOLERANCE)).argmax(axis=1)
+    numpy.testing.assert_array_equal(table[packed], expected)
+    numpy.testing.assert_array_equal(
+        group.closest_many(
+            base.ColorArray.from_packed(packed),
+            indices=True,
+            metric='cie76'
+        ),
+        expected
+    )
+    members = list(group)
+    for value, position in zip(packed[:50].tolist(), expected):
+        assert group.closest(base.RGB24(value), 'cie76') is members[position]
+
+
+def test_lookup_table_digest(cache_dir, monkeypatch, make_group):
+    """Tables are only found for the same colors and delta E formula."""
+    monkeypatch.setenv('COLORS_CACHE_DIR', cache_dir)
+    make_group('Small', SMALL).use_lookup_table(metric='cie76')
+    changed = make_group('Small', SMALL[:-1] + [(250, 250, 250)])
+    with pytest.raises(FileNotFoundError):
+        changed.use_lookup_table(metric='cie76')
+    with pytest.raises(FileNotFoundError):
+        make_group('Small', SMALL).use_lookup_table(metric='cmc')
+
+
+def write_truncated(path):
+    """Write the header of a table with only half of its entries."""
+    table = numpy.lib.format.open_memmap(
+        path,
+        mode='w+',
+        dtype=numpy.uint8,
+        shape=(lut.SIZE,)
+    )
+    del table
+    with open(path, 'r+b') as stream:
+        stream.truncate(os.path.getsize(path) // 2)
+
+
+@pytest.mark.parametrize('write', [
+    write_truncated,
+    lambda path: open(path, 'wb').close(),
+    lambda path: open(path, 'wb').write(b'\x93NUMPY' + bytes(100)),
+    lambda path: numpy.save(path, numpy.zeros(1000, dtype=numpy.uint8)),
+], ids=['truncated', 'empty', 'corrupt', 'short'])
+def test_lookup_table_rejects_bad_files(tmp_path, write, make_group):
+    """Files that are not complete tables are rejected on first use."""
+    group = make_group('Small', SMALL)
+    path = group._lookup_table_path(str(tmp_path), group._metric)
+    write(path)
+    group.use_lookup_table(str(tmp_path))
+    with pytest.raises(ValueError, match='not a 24-bit lookup table'):
+        group.closest(base.RGB24(0x123456))
+
+
+@pytest.fixture(scope='module', params=[
+    (Xterm, 'cmc', 0.5),
+    (X11, 'cie76', 0.8),
+    (Wiki, 'cie76', 0.7),
+], ids=['xterm-cmc', 'x11-cie76', 'wiki-cie76'])
+def approx(request):
+    """Get a group with a lattice built, its formula and its largest error."""
+    group, metric, limit = request.param
+    group.build_approx_lattice(metric=metric)
+    yield group, diff.get_metric(metric), limit
+    del group._approx_lattices[diff.get_metric(metric).key]
+
+
+def approx_errors(group, metric, packed):
+    """Get how much further approximate answers are than exact ones."""
+    colors = base.ColorArray.from_packed(packed)
+    exact = group.closest_many(colors, indices=True, metric=metric)
+    approx = group.closest_many(
+        colors,
+        indices=True,
+        metric=metric,
+        mode='approx'
+    )
+    labs = convert.rgb8_to_lab(convert.unpack_rgb(packed))
+    matrix = group._lab_array(list(group))
+    return (
+        metric(labs, matrix[approx][:, None])[:, 0]
+        - metric(labs, matrix[exact][:, None])[:, 0]
+    )
+
+
+def cell_colors(lattice, cell):
+    """Get the packed 8-bit colors of a lattice cell."""
+    bits = lattice.bits
+    step = numpy.arange(256 >> bits)
+    offsets = numpy.stack(
+        numpy.meshgrid(step, step, step, indexing='ij'),
+        axis=-1
+    ).reshape(-1, 3)
+    corner = numpy.array([cell >> (2 * bits), cell >> bits, cell])
+    rgb = (corner % (1 << bits)) * len(step) + offsets
+    return convert.pack_rgb(rgb).astype(numpy.uint32)
+
+
+def test_approx_error_within_bound(approx):
+    """Approximate answers are never worse than their cell's bound."""
+    group, metric, limit = approx
+    lattice = group.approx_lattice(metric)
+    rng = numpy.random.default_rng(0)
+    packed = rng.integers(0, 1 << 24, size=20000).astype(numpy.uint32)
+    error = approx_errors(group, metric, packed)
+    assert (error > 0).any()
+    assert (error <= lattice.bounds[lattice.cells(packed)] + 1e-9).all()
+    assert error.max() <= lattice.error_bound + 1e-9
+    assert lattice.error_bound < limit
+
+
+def test_approx_bound_is_tight(approx):
+    """The bound of a cell is the largest error made in it."""
+    group, metric, _ = approx
+    lattice = group.approx_lattice(metric)
+    order = numpy.argsort(lattice.bounds)
+    for cell in [*order[-3:], *order[::len(order) // 4]]:
+        packed = cell_colors(lattice, cell)
+        assert (lattice.cells(packed) == cell).all()
+        error = approx_errors(group, metric, packed)
+        assert error.max() == pytest.approx(lattice.bounds[cell], abs=1e-9)
+
+
+def test_approx_closest(approx):
+    """Single approximate searches agree with batched ones."""
+    group, metric, _ = approx
+    rng = numpy.random.default_rng(1)
+    packed = rng.integers(0, 1 << 24, size=500).astype(numpy.uint32)
+    colors = base.ColorArray.from_packed(packed)
+    expected = group.closest_many(colors, metric=metric, mode='approx')
+    for value, member in zip(packed.tolist(), expected):
+        assert group.closest(base.RGB24(value), metric, 'approx') is member
+
+
+def test_approx_lattice_is_built_explicitly(make_group):
+    """Searches are exact until a lattice is built, and within tolerance."""
+    group = make_group('Small', SMALL)
+    colors = base.ColorArray.from_packed(
+        numpy.arange(0, 1 << 24, 4099, dtype=numpy.uint32)
+    )
+    exact = group.closest_many(colors, indices=True, metric='cie76')
+    assert group.approx_lattice('cie76') is None
+    numpy.testing.assert_array_equal(
+        group.closest_many(
+            colors,
+            indices=True,
+            metric='cie76',
+            mode='approx'
+        ),
+        exact
+    )
+
+    lattice = group.build_approx_lattice(metric='cie76', tolerance=0)
+    assert group.approx_lattice('cie76') is lattice
+    assert group.approx_lattice('cmc') is None
+    assert lattice.error_bound == 0
+    numpy.testing.assert_array_equal(
+        group.closest_many(
+            colors,
+            indices=True,
+            metric='cie76',
+            mode='approx'
+        ),
+        exact
+    )
+
+
+def test_approx_cie2000():
+    """CIEDE2000 has no lattice, so approximate searches are exact."""
+    rng = numpy.random.default_rng(1)
+    packed = rng.integers(0, 1 << 24, size=200).astype(numpy.uint32)
+    colors = base.ColorArray.from_packed(packed)
+    numpy.testing.assert_array_equal(
+        X11.closest_many(colors, indices=True, metric='cie2000'),
+        X11.closest_many(
+            colors,
+            indices=True,
+            metric='cie2000',
+            mode='approx'
+        )
+    )
+    assert X11.closest(colors[0], 'cie2000', 'approx') is X11.closest(
+        colors[0], 'cie2000'
+    )
+    with pytest.raises(ValueError):
+        X11.build_approx_lattice(metric='cie2000')
+
+
+def test_load_lab_cube(tmp_path, monkeypatch):
+    """A cube is only installed when loaded, from the given path or env."""
+    # Restore whatever cube is installed once the test is done.
+    monkeypatch.setattr(convert, '_lab_cube', None)
+    path = str(tmp_path / 'cube.npy')
+    monkeypatch.setenv('COLORS_LAB_CUBE', path)
+    with pytest.raises(FileNotFoundError):
+        lut.load_lab_cube()
+
+    table = numpy.lib.format.open_memmap(
+        path,
+        mode='w+',
+        dtype=numpy.float32,
+        shape=(lut.SIZE, 3)
+    )
+    table[0xff0000] = (1, 2, 3)
+    del table
+    assert convert.lab_cube() is None
+    cube = lut.load_lab_cube()
+    assert cube.path == path
+    assert convert.lab_cube() is cube
+    assert convert.rgb8_to_lab([[255, 0, 0]]).tolist() == [[1, 2, 3]]
+
+    convert.use_lab_cube(None)
+    monkeypatch.setenv('COLORS_LAB_CUBE', str(tmp_path / 'missing.npy'))
+    cube = lut.load_lab_cube(path)
+    assert cube.path == path
+    assert convert.lab_cube() is cube
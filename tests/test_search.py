@@ -0,0 +1,208 @@
+"""Tests for searching color groups for their closest members."""
+
+import random
+import weakref
+
+import colormath.color_diff_matrix
+import numpy
+import pytest
+from colormath import color_objects
+
+from colors import base, convert
+from colors.ansi import ANSI
+from colors.html import HTML
+from colors.md import MaterialDesign
+from colors.web import Web
+from colors.wiki import Wiki
+from colors.x11 import X11
+from colors.xterm import Xterm
+
+GROUPS = (ANSI, HTML, MaterialDesign, Web, Wiki, X11, Xterm)
+
+
+def scan_closest(group, color):
+    """
+    Find the closest member the way the original closest() did.
+
+    This calls colormath's matrix kernel on the Lab vectors directly, as its
+    scalar ``color_diff.delta_e_cmc`` wrapper uses ``numpy.asscalar``, which
+    NumPy 2 no longer has.
+    """
+    lab = numpy.array(color.lab._BaseColor__color.get_value_tuple())
+    members = [
+        member for member in reversed(group) if member.value is not None
+    ]
+    distances = colormath.color_diff_matrix.delta_e_cmc(
+        lab,
+        numpy.array([
+            member.lab._BaseColor__color.get_value_tuple()
+            for member in members
+        ])
+    )
+    distances = {
+        float(distance): member
+        for distance, member in zip(distances, members)
+    }
+    return distances[min(distances)]
+
+
+@pytest.fixture(scope='module')
+def colors():
+    """Get random colors, plus colors some groups have as members."""
+    rand = random.Random(0)
+    return [
+        base.RGBColor(*(rand.randrange(256) for _ in range(3)))
+        for _ in range(20)
+    ] + [member.value for member in list(HTML) + list(Xterm)[:16]]
+
+
+@pytest.mark.parametrize('group', GROUPS, ids=lambda group: group.__name__)
+def test_closest_matches_colormath(group, colors):
+    """Searches pick the member a colormath delta_e_cmc scan picks."""
+    expected = [scan_closest(group, color) for color in colors]
+    group.cache_clear()
+    assert [group.closest(color) for color in colors] == expected
+    assert list(group.closest_many(colors)) == expected
+    array = base.ColorArray.from_colors(colors)
+    assert list(group.closest_many(array)) == expected
+
+
+class SmallCache(base.ColorGroup, cache_size=2, cache_policy='fifo'):
+    """Group options shared by the groups derived from it."""
+
+
+class Primaries(SmallCache):
+    """Small group inheriting a small first-in, first-out cache."""
+
+    Red = base.RGBColor(255, 0, 0)
+    Green = base.RGBColor(0, 255, 0)
+    Blue = base.RGBColor(0, 0, 255)
+
+
+@pytest.fixture
+def primaries():
+    """Get the small group with an empty cache."""
+    Primaries.cache_clear()
+    yield Primaries
+    Primaries.configure_cache(2, 'fifo')
+
+
+def test_cache_options(primaries):
+    """Class keywords set the cache, and subclasses inherit them."""
+    assert SmallCache.cache_info() == (0, 0, 2, 0, 'fifo')
+    assert primaries.cache_info() == (0, 0, 2, 0, 'fifo')
+    assert X11.cache_info().maxsize == 4096
+    assert X11.cache_info().policy == 'lru'
+
+
+def test_cache_by_value(primaries):
+    """Equal colors share an entry, whatever their type."""
+    assert primaries.closest(base.RGBColor(250, 0, 0)) is primaries.Red
+    assert primaries.closest(base.RGB24(0xfa0000)) is primaries.Red
+    assert primaries.closest(base.sRGBColor.from_hex('#fa0000')) is (
+        primaries.Red
+    )
+    assert primaries.cache_info()[:2] == (2, 1)
+    primaries.closest(base.RGB24(0xfa0000), metric='cie76')
+    assert primaries.cache_info()[:2] == (2, 2)
+
+
+def test_cache_fifo_eviction(primaries):
+    """The oldest entry goes first, even if it was just used."""
+    red, green, blue = (
+        base.RGB24(value) for value in (0xfa0000, 0x00fa00, 0x0000fa)
+    )
+    primaries.closest(red)
+    primaries.closest(green)
+    primaries.closest(red)
+    primaries.closest(blue)
+    assert primaries.cache_info()[:4] == (1, 3, 2, 2)
+    primaries.closest(green)
+    assert primaries.cache_info()[:2] == (2, 3)
+    primaries.closest(red)
+    assert primaries.cache_info()[:2] == (2, 4)
+
+
+def test_cache_lru_eviction(primaries):
+    """The least recently used entry goes first."""
+    primaries.configure_cache(2, 'lru')
+    red, green, blue = (
+        base.RGB24(value) for value in (0xfa0000, 0x00fa00, 0x0000fa)
+    )
+    for color in (red, green, red, blue, red):
+        primaries.closest(color)
+    assert primaries.cache_info()[:2] == (2, 3)
+    primaries.closest(green)
+    assert primaries.cache_info()[:2] == (2, 4)
+
+
+@pytest.mark.parametrize('maxsize', [0, None])
+def test_cache_sizes(primaries, maxsize):
+    """A size of 0 disables the cache and None never evicts."""
+    primaries.configure_cache(maxsize)
+    for value in range(10):
+        primaries.closest(base.RGB24(value))
+    primaries.closest(base.RGB24(0))
+    info = primaries.cache_info()
+    assert info.maxsize == maxsize
+    if maxsize == 0:
+        assert info[:2] == (0, 11) and info.currsize == 0
+    else:
+        assert info[:2] == (1, 10) and info.currsize == 10
+
+
+def test_cache_clear(primaries):
+    """Clearing empties the cache and resets its statistics."""
+    primaries.closest(base.RGB24(0xfa0000))
+    primaries.closest(base.RGB24(0xfa0000))
+    primaries.cache_clear()
+    assert primaries.cache_info() == (0, 0, 2, 0, 'fifo')
+
+
+def test_cache_skips_lab(primaries):
+    """Hits on colors that are not 8-bit sRGB do not convert them."""
+    slot = base.LabColor._conversion_slot
+    color = base.HSVColor(color_objects.HSVColor(0.0, 0.9, 0.9))
+    assert primaries.closest(color) is primaries.Red
+    base.HSVColor.instances.clear()
+    twin = base.HSVColor(color_objects.HSVColor(0.0, 0.9, 0.9))
+    assert twin is not color
+    assert primaries.closest(twin) is primaries.Red
+    assert primaries.cache_info()[:2] == (1, 1)
+    assert slot >= len(twin.conversions) or twin.conversions[slot] is None
+
+
+class FixedCube:
+    """Lab cube giving every color the same Lab value."""
+
+    def __init__(self, lab):
+        self.lab = numpy.asarray(lab, dtype=float)
+
+    def __getitem__(self, packed):
+        return numpy.tile(self.lab, (numpy.size(packed), 1))
+
+
+def test_cache_keyed_by_lab_cube(primaries):
+    """Installing a Lab cube does not return results computed without it."""
+    red = base.RGB24(0xfa0000)
+    assert primaries.closest(red) is primaries.Red
+    convert.use_lab_cube(FixedCube(primaries._lab_matrix()[2]))
+    try:
+        assert primaries.closest(red) is primaries.Blue
+    finally:
+        convert.use_lab_cube(None)
+    assert primaries.closest(red) is primaries.Red
+    assert primaries.cache_info()[:2] == (1, 2)
+
+
+def test_cache_does_not_keep_lab_cube(primaries):
+    """Cached results do not keep a cube alive once it is replaced."""
+    cube = FixedCube(primaries._lab_matrix()[2])
+    convert.use_lab_cube(cube)
+    try:
+        assert primaries.closest(base.RGB24(0xfa0000)) is primaries.Blue
+    finally:
+        convert.use_lab_cube(None)
+    reference = weakref.ref(cube)
+    del cube
+    assert reference() is None
@@ -0,0 +1,110 @@
+"""Tests for the cross-group translation tables."""
+
+import os
+
+import numpy
+import pytest
+
+from colors.ansi import ANSI
+from colors.x11 import X11
+from colors.xterm import Xterm
+
+
+LEVELS = [(12, 200, 40), (250, 128, 114), (90, 90, 90), (0, 0, 255)]
+"""Colors of the groups translated to and from disk."""
+
+
+@pytest.mark.parametrize('source, target, metric', [
+    (X11, Xterm, None),
+    (Xterm, X11, None),
+    (X11, ANSI, 'cie76'),
+    (Xterm, ANSI, 'cie2000'),
+])
+def test_translation_matches_closest(source, target, metric):
+    """Every member maps to the member closest() finds for it."""
+    mapping = source.translation(target, metric)
+    members = list(target)
+    expected = [
+        members.index(target.closest(member, metric))
+        for member in source
+    ]
+    numpy.testing.assert_array_equal(mapping, expected)
+    for member, position in zip(source, mapping.tolist()):
+        assert member.to(target, metric) is members[position]
+
+
+def test_translation_is_kept():
+    """The mapping is computed once and cannot be changed."""
+    mapping = X11.translation(Xterm)
+    assert X11.translation(Xterm) is mapping
+    assert X11.translation(Xterm, 'cie76') is not mapping
+    with pytest.raises(ValueError):
+        mapping[0] = 0
+
+
+def test_translation_persist(tmp_path, monkeypatch, make_group):
+    """Persisted mappings are found again by groups with the same colors."""
+    monkeypatch.setenv('COLORS_CACHE_DIR', str(tmp_path))
+    mapping = make_group('Small', LEVELS).translation(Xterm, persist=True)
+    (path,) = tmp_path.iterdir()
+    numpy.testing.assert_array_equal(numpy.load(path), mapping)
+
+    # A changed file shows that the next group loads it.
+    numpy.save(path, mapping[::-1])
+    numpy.testing.assert_array_equal(
+        make_group('Small', LEVELS).translation(Xterm, persist=True),
+        mapping[::-1]
+    )
+    changed = make_group('Small', LEVELS[:-1] + [(0, 0, 250)])
+    expected = [
+        list(Xterm).index(Xterm.closest(member)) for member in changed
+    ]
+    numpy.testing.assert_array_equal(
+        changed.translation(Xterm, persist=True),
+        expected
+    )
+    assert len(os.listdir(tmp_path)) == 2
+
+
+@pytest.mark.parametrize('write', [
+    lambda path, mapping: path.write_bytes(path.read_bytes()[:-8]),
+    lambda path, mapping: numpy.save(path, mapping[:-1]),
+    lambda path, mapping: numpy.save(path, mapping.astype(float)),
+    lambda path, mapping: numpy.save(path, mapping + len(Xterm)),
+    lambda path, mapping: numpy.save(path, numpy.full_like(mapping, -2)),
+], ids=['truncated', 'short', 'float', 'too-large', 'negative'])
+def test_translation_rejects_bad_files(
+    tmp_path,
+    monkeypatch,
+    make_group,
+    write
+):
+    """Files that are not mappings between the groups are computed again."""
+    monkeypatch.setenv('COLORS_CACHE_DIR', str(tmp_path))
+    mapping = make_group('Small', LEVELS).translation(Xterm, persist=True)
+    (path,) = tmp_path.iterdir()
+    write(path, mapping)
+    group = make_group('Small', LEVELS)
+    numpy.testing.assert_array_equal(
+        group.translation(Xterm, persist=True),
+        mapping
+    )
+    numpy.testing.assert_array_equal(numpy.load(path), mapping)
+    assert group.Color0.to(Xterm) is Xterm.closest(group.Color0)
+
+
+def test_translation_directory(tmp_path, make_group):
+    """Mappings can be kept in a directory other than the cache."""
+    group = make_group('Small', LEVELS)
+    mapping = group.translation(X11, persist=True, directory=str(tmp_path))
+    (path,) = tmp_path.iterdir()
+    assert path.name.startswith(f'{group.__module__}.Small-to-X11-')
+    numpy.testing.assert_array_equal(numpy.load(path), mapping)
+    numpy.testing.assert_array_equal(
+        make_group('Small', LEVELS).translation(
+            X11,
+            persist=True,
+            directory=str(tmp_path)
+        ),
+        mapping
+    )
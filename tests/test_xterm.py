@@ -0,0 +1,86 @@
+"""Tests for the structure-aware xterm quantizer."""
+
+import numpy
+import pytest
+
+from colors import base, convert, diff, xterm
+
+
+def scan(labs, metric):
+    """Find the closest member positions by scoring every member."""
+    distances = diff.metric(metric)(labs, xterm.Xterm._lab_matrix())
+    least = distances.min(axis=1, keepdims=True)
+    rows = (distances <= least * (1 + base.TIE_TOLERANCE)).argmax(axis=1)
+    return xterm.Xterm._positions()[rows]
+
+
+@pytest.mark.parametrize('metric', sorted(diff.METRICS))
+def test_quantize_many_matches_closest_many(metric):
+    """Quantizing is exact: it picks the member a full scan picks."""
+    rng = numpy.random.default_rng(0)
+    cube = numpy.meshgrid(*[xterm.CUBE_LEVELS] * 3)
+    rgb = numpy.concatenate([
+        rng.integers(0, 256, size=(4000, 3)),
+        numpy.stack(cube, axis=-1).reshape(-1, 3),
+        numpy.repeat(xterm.GRAY_LEVELS, 3).reshape(-1, 3),
+    ])
+    colors = base.ColorArray.from_packed(convert.pack_rgb(rgb))
+    expected = scan(convert.rgb8_to_lab(rgb), metric)
+    numpy.testing.assert_array_equal(
+        xterm.Xterm.quantize_many(rgb, metric),
+        expected
+    )
+    numpy.testing.assert_array_equal(
+        xterm.Xterm.closest_many(colors, indices=True, metric=metric),
+        expected
+    )
+
+
+@pytest.mark.parametrize('metric', sorted(diff.METRICS))
+def test_quantize_matches_closest(metric):
+    """The single color form gives the member closest() and a scan give."""
+    rng = numpy.random.default_rng(1)
+    colors = [
+        base.RGB24(value)
+        for value in rng.integers(0, 1 << 24, size=200).tolist()
+    ]
+    colors.extend(member.value for member in xterm.Xterm)
+    colors.extend(
+        base.RGBColor(*levels)
+        for levels in rng.uniform(0, 255, size=(20, 3)).tolist()
+    )
+    members = list(xterm.Xterm)
+    expected = scan(base.ColorGroup._lab_array(colors), metric)
+    for color, position in zip(colors, expected):
+        assert xterm.Xterm.quantize(color, metric) is members[position]
+        assert xterm.Xterm.closest(color, metric) is members[position]
+
+
+@pytest.mark.parametrize('metric', ['cmc', 'cie76'])
+def test_closest_many_out_of_gamut(metric):
+    """Lab colors outside sRGB are searched exactly too."""
+    rng = numpy.random.default_rng(2)
+    labs = rng.uniform([-20, -200, -200], [120, 200, 200], size=(2000, 3))
+    colors = base.ColorArray(labs, 'lab')
+    numpy.testing.assert_array_equal(
+        xterm.Xterm.closest_many(colors, indices=True, metric=metric),
+        scan(base.ColorGroup._lab_array(colors), metric)
+    )
+
+
+def test_palette_rows():
+    """The cube and grayscale members are found by color."""
+    cube, gray, distinct, points, norms = xterm.Xterm._palette_rows()
+    matrix = xterm.Xterm._lab_matrix()
+    levels = numpy.meshgrid(*[xterm.CUBE_LEVELS] * 3, indexing='ij')
+    numpy.testing.assert_array_equal(
+        matrix[cube].reshape(-1, 3),
+        convert.rgb8_to_lab(numpy.stack(levels, axis=-1))
+    )
+    grays = numpy.repeat(xterm.GRAY_LEVELS, 3).reshape(-1, 3)
+    numpy.testing.assert_array_equal(
+        matrix[gray],
+        convert.rgb8_to_lab(grays)
+    )
+    numpy.testing.assert_array_equal(points, matrix[distinct])
+    assert len(numpy.unique(points, axis=0)) == len(distinct)